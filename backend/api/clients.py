@@ -0,0 +1,85 @@
+from flask import current_app
+
+from api.naver_geocoding import NaverGeocodingClient
+from api.naver_map import NaverMapClient
+from services.geocode_cache_service import GeocodeCacheService
+from services.query_variant_stats_service import QueryVariantStatsService
+from utils.async_http import AsyncUpstreamEngine
+from utils.hedging import Hedger
+from utils.rate_limiter import configure_rate_limiters
+
+_MAP_CLIENT_KEY = "naver_map_client"
+_GEOCODING_CLIENT_KEY = "naver_geocoding_client"
+
+
+def init_upstream_clients(app):
+    """
+    Create app-lifetime upstream clients.
+
+    Both clients own pooled keep-alive sessions, so they are built once per app
+    and shared by every request (and by the geocoding worker threads).
+    """
+    configure_rate_limiters(app.config.get("RATE_LIMIT_DB_PATH"))
+    hedger = Hedger.from_call_types(app.config.get("UPSTREAM_HEDGING") or ())
+    engine = None
+    if app.config.get("UPSTREAM_ASYNC_ENGINE"):
+        engine = AsyncUpstreamEngine(
+            default_host_limit=app.config.get("UPSTREAM_ASYNC_HOST_LIMIT"),
+            host_timeouts={**NaverMapClient.TIMEOUT_BOUNDS, **NaverGeocodingClient.TIMEOUT_BOUNDS},
+        )
+
+    geocoding_client = NaverGeocodingClient(
+        app.config.get("NAVER_CLOUD_ID") or "",
+        app.config.get("NAVER_CLOUD_SECRET") or "",
+        hedger=hedger,
+        engine=engine,
+    )
+    map_client = NaverMapClient(
+        app.config.get("NAVER_CLIENT_ID"),
+        app.config.get("NAVER_CLIENT_SECRET"),
+        geocoding_client_id=app.config.get("NAVER_CLOUD_ID"),
+        geocoding_client_secret=app.config.get("NAVER_CLOUD_SECRET"),
+        geocode_cache=GeocodeCacheService(),
+        variant_stats=QueryVariantStatsService(),
+        geocoder=geocoding_client,
+        hedger=hedger,
+        engine=engine,
+    )
+
+    app.extensions[_GEOCODING_CLIENT_KEY] = geocoding_client
+    app.extensions[_MAP_CLIENT_KEY] = map_client
+
+
+def get_naver_map_client() -> NaverMapClient:
+    return current_app.extensions[_MAP_CLIENT_KEY]
+
+
+def get_geocoding_client() -> NaverGeocodingClient:
+    return current_app.extensions[_GEOCODING_CLIENT_KEY]
+
+
+def upstream_pool_stats() -> dict:
+    # Imported lazily: api.restaurant imports this module.
+    from api.restaurant import menu_service
+
+    return {
+        "naver_local_search": get_naver_map_client().http.stats(),
+        "naver_geocoding": get_geocoding_client().http.stats(),
+        "naver_geocoding_endpoints": get_geocoding_client().endpoint_health(),
+        "hedging": get_naver_map_client().hedger.stats(),
+        "naver_place_crawler": menu_service.naver_crawler.timeouts.snapshot(),
+        "retries": {
+            "naver_local_search": _retry_stats(get_naver_map_client().http.retry_policy),
+            "naver_geocoding": _retry_stats(get_geocoding_client().http.retry_policy),
+            "naver_place_crawler": _retry_stats(menu_service.naver_crawler.retry_policy),
+        },
+        "async_engine": _engine_stats(get_naver_map_client().engine),
+    }
+
+
+def _retry_stats(retry_policy):
+    return retry_policy.stats() if retry_policy is not None else None
+
+
+def _engine_stats(engine):
+    return engine.stats() if engine is not None else None
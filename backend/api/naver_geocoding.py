@@ -1,8 +1,15 @@
 import logging
-from typing import Dict, Optional
+import threading
+from typing import Callable, Dict, List, Optional
 
 import requests
 
+from utils.async_http import AsyncUpstreamEngine
+from utils.circuit_breaker import CircuitBreaker
+from utils.hedging import Hedger
+from utils.http_client import PooledHttpClient
+from utils.retry import RetryPolicy
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,27 +28,61 @@ class NaverGeocodingClient:
     TIMEOUT_SECONDS = 10
     OSM_TIMEOUT_SECONDS = 15
     OSM_USER_AGENT = "FoodFinder/1.0 (dev_test)"
-
-    def __init__(self, client_id: str, client_secret: str):
+    OSM_REVERSE_URL = "https://nominatim.openstreetmap.org/reverse"
+    OSM_SEARCH_URL = "https://nominatim.openstreetmap.org/search"
+    # A 400 means our query was bad, not that the endpoint is unhealthy.
+    NON_FAILURE_STATUSES = {400}
+    GEOCODE_CALL_TYPE = "geocode"
+    REVERSE_GEOCODE_CALL_TYPE = "reverse_geocode"
+    POOL_SIZES = {
+        "maps.apigw.ntruss.com": 12,
+        "naveropenapi.apigw.ntruss.com": 12,
+        "nominatim.openstreetmap.org": 2,
+    }
+    # (default, floor, ceiling) seconds for the adaptive per-host timeout.
+    TIMEOUT_BOUNDS = {
+        "maps.apigw.ntruss.com": (TIMEOUT_SECONDS, 2.0, TIMEOUT_SECONDS),
+        "naveropenapi.apigw.ntruss.com": (TIMEOUT_SECONDS, 2.0, TIMEOUT_SECONDS),
+        "nominatim.openstreetmap.org": (OSM_TIMEOUT_SECONDS, 3.0, OSM_TIMEOUT_SECONDS),
+    }
+
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        http: Optional[PooledHttpClient] = None,
+        hedger: Optional[Hedger] = None,
+        engine: Optional[AsyncUpstreamEngine] = None,
+    ):
         self.client_id = client_id
         self.client_secret = client_secret
+        self.http = http or PooledHttpClient(
+            host_pool_sizes=self.POOL_SIZES,
+            host_timeouts=self.TIMEOUT_BOUNDS,
+            retry_policy=RetryPolicy(),
+        )
+        self.hedger = hedger or Hedger()
+        # Optional asyncio engine behind the *_async methods.
+        self.engine = engine
         self.headers = {
             "x-ncp-apigw-api-key-id": client_id,
             "x-ncp-apigw-api-key": client_secret,
         }
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        # URL tuple -> gateway that answered last, tried first next time.
+        self._preferred_urls: Dict[tuple, str] = {}
+        self._health_lock = threading.Lock()
 
         masked_id = f"{client_id[:4]}...{client_id[-4:]}" if client_id else "None"
         logger.debug("NaverGeocodingClient initialized with key id: %s", masked_id)
 
     def coord_to_address(self, longitude: float, latitude: float) -> Optional[str]:
         """Convert coordinates to address using Naver reverse geocoding."""
-        params = {
-            "coords": f"{longitude},{latitude}",
-            "orders": "roadaddr,addr",
-            "output": "json",
-        }
-
-        data = self._request_with_fallback(self.REVERSE_GEOCODING_URLS, params)
+        data = self._request_with_fallback(
+            self.REVERSE_GEOCODING_URLS,
+            self._reverse_params(longitude, latitude),
+            call_type=self.REVERSE_GEOCODE_CALL_TYPE,
+        )
         if data:
             address = self._extract_reverse_address(data)
             if address:
@@ -49,50 +90,208 @@ class NaverGeocodingClient:
 
         return self._fallback_reverse_nominatim(longitude, latitude)
 
-    def address_to_coord(self, query: str) -> Optional[Dict]:
-        """Convert address/place name to coordinates using Naver geocoding."""
-        params = {
-            "query": query,
-        }
+    def address_to_coord(self, query: str, outcome: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Convert address/place name to coordinates using Naver geocoding.
+
+        When an upstream answers, outcome["answered"] is set, which tells a
+        definitive "not found" apart from a lookup that failed.
+        """
+        data = self._request_with_fallback(
+            self.GEOCODING_URLS,
+            {"query": query},
+            call_type=self.GEOCODE_CALL_TYPE,
+        )
+        if data:
+            self._mark_answered(outcome)
+            coord = self._extract_geocoding_result(data)
+            if coord:
+                return coord
 
-        data = self._request_with_fallback(self.GEOCODING_URLS, params)
+        return self._fallback_search_nominatim(query, outcome)
+
+    async def coord_to_address_async(self, longitude: float, latitude: float) -> Optional[str]:
+        """coord_to_address on the asyncio engine (no hedging or retries)."""
+        data = await self._request_with_fallback_async(
+            self.REVERSE_GEOCODING_URLS,
+            self._reverse_params(longitude, latitude),
+        )
         if data:
+            address = self._extract_reverse_address(data)
+            if address:
+                return address
+
+        logger.info("Falling back to OSM Nominatim reverse geocoding")
+        return await self._request_nominatim_async(
+            self.OSM_REVERSE_URL,
+            self._nominatim_reverse_params(longitude, latitude),
+            self._parse_nominatim_reverse,
+        )
+
+    async def address_to_coord_async(self, query: str, outcome: Optional[Dict] = None) -> Optional[Dict]:
+        """address_to_coord on the asyncio engine (no hedging or retries)."""
+        data = await self._request_with_fallback_async(self.GEOCODING_URLS, {"query": query})
+        if data:
+            self._mark_answered(outcome)
             coord = self._extract_geocoding_result(data)
             if coord:
                 return coord
 
-        return self._fallback_search_nominatim(query)
+        logger.info("Falling back to OSM Nominatim geocoding for query=%s", query)
+        return await self._request_nominatim_async(
+            self.OSM_SEARCH_URL,
+            self._nominatim_search_params(query),
+            self._parse_nominatim_search,
+            outcome,
+        )
+
+    def _request_with_fallback(
+        self,
+        urls: tuple,
+        params: Dict,
+        call_type: Optional[str] = None,
+    ) -> Optional[Dict]:
+        if not self.client_id or not self.client_secret:
+            logger.warning(
+                "Naver Cloud API key is missing. Skip Naver Maps request and use fallback."
+            )
+            return None
+
+        ordered = self._ordered_urls(urls)
+        attempted = set()
+
+        if self.hedger.enabled(call_type):
+            # Race the preferred gateway against the next one (or itself again).
+            backup = ordered[1] if len(ordered) > 1 else ordered[0]
+            data = self.hedger.call(
+                call_type,
+                [
+                    lambda: self._request_endpoint(ordered[0], urls, params, attempted),
+                    lambda: self._request_endpoint(backup, urls, params, attempted),
+                ],
+            )
+            if data is not None:
+                return data
+
+        for url in ordered:
+            if url in attempted:
+                continue
+            data = self._request_endpoint(url, urls, params, attempted)
+            if data is not None:
+                return data
 
-    def _request_with_fallback(self, urls: tuple, params: Dict) -> Optional[Dict]:
+        return None
+
+    async def _request_with_fallback_async(self, urls: tuple, params: Dict) -> Optional[Dict]:
         if not self.client_id or not self.client_secret:
             logger.warning(
                 "Naver Cloud API key is missing. Skip Naver Maps request and use fallback."
             )
             return None
 
-        for url in urls:
+        for url in self._ordered_urls(urls):
+            breaker = self._breaker(url)
+            if not breaker.allow_request():
+                logger.debug("Skip Naver Maps endpoint with open circuit: %s", url)
+                continue
+
+            with breaker.attempt():
+                try:
+                    response = await self.engine.get(url, headers=self.headers, params=params)
+                except requests.exceptions.RequestException as exc:
+                    breaker.record_failure()
+                    logger.warning("Naver Maps API request error at %s: %s", url, exc)
+                    continue
+
+                data = self._handle_endpoint_response(url, urls, breaker, response)
+            if data is not None:
+                return data
+
+        return None
+
+    def _request_endpoint(
+        self,
+        url: str,
+        urls: tuple,
+        params: Dict,
+        attempted: set,
+    ) -> Optional[Dict]:
+        attempted.add(url)
+        breaker = self._breaker(url)
+        if not breaker.allow_request():
+            logger.debug("Skip Naver Maps endpoint with open circuit: %s", url)
+            return None
+
+        with breaker.attempt():
             try:
-                response = requests.get(
+                response = self.http.get(
                     url,
                     headers=self.headers,
                     params=params,
-                    timeout=self.TIMEOUT_SECONDS,
-                )
-
-                if response.status_code == 200:
-                    return response.json()
-
-                logger.warning(
-                    "Naver Maps API failed: status=%s url=%s body=%s",
-                    response.status_code,
-                    url,
-                    response.text[:300],
                 )
             except requests.exceptions.RequestException as exc:
+                breaker.record_failure()
                 logger.warning("Naver Maps API request error at %s: %s", url, exc)
+                return None
+
+            return self._handle_endpoint_response(url, urls, breaker, response)
 
+    def _handle_endpoint_response(
+        self,
+        url: str,
+        urls: tuple,
+        breaker: CircuitBreaker,
+        response,
+    ) -> Optional[Dict]:
+        if response.status_code == 200:
+            try:
+                data = response.json()
+            except ValueError as exc:
+                breaker.record_failure()
+                logger.warning("Naver Maps API returned invalid JSON at %s: %s", url, exc)
+                return None
+
+            breaker.record_success()
+            with self._health_lock:
+                self._preferred_urls[urls] = url
+            return data
+
+        self._record_status(breaker, response.status_code)
+        logger.warning(
+            "Naver Maps API failed: status=%s url=%s body=%s",
+            response.status_code,
+            url,
+            response.text[:300],
+        )
         return None
 
+    def endpoint_health(self) -> Dict[str, str]:
+        """Circuit state for every endpoint that has been called."""
+        with self._health_lock:
+            breakers = dict(self._breakers)
+        return {url: breaker.state for url, breaker in breakers.items()}
+
+    def _ordered_urls(self, urls: tuple) -> List[str]:
+        with self._health_lock:
+            preferred = self._preferred_urls.get(urls)
+        if preferred is None:
+            return list(urls)
+        return [preferred] + [url for url in urls if url != preferred]
+
+    def _breaker(self, url: str) -> CircuitBreaker:
+        with self._health_lock:
+            breaker = self._breakers.get(url)
+            if breaker is None:
+                breaker = CircuitBreaker()
+                self._breakers[url] = breaker
+            return breaker
+
+    def _record_status(self, breaker: CircuitBreaker, status_code: int):
+        if status_code == 200 or status_code in self.NON_FAILURE_STATUSES:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+
     def _extract_reverse_address(self, data: Dict) -> Optional[str]:
         results = data.get("results", [])
         if not results:
@@ -139,6 +338,7 @@ class NaverGeocodingClient:
             "address": address,
             "latitude": float(y),
             "longitude": float(x),
+            "source": "naver",
         }
 
     def _fallback_reverse_nominatim(
@@ -147,63 +347,133 @@ class NaverGeocodingClient:
         latitude: float,
     ) -> Optional[str]:
         logger.info("Falling back to OSM Nominatim reverse geocoding")
-        url = "https://nominatim.openstreetmap.org/reverse"
-        params = {
+        url = self.OSM_REVERSE_URL
+        breaker = self._breaker(url)
+        if not breaker.allow_request():
+            logger.warning("Skip OSM Nominatim with open circuit: %s", url)
+            return None
+
+        with breaker.attempt():
+            try:
+                response = self.http.get(
+                    url,
+                    params=self._nominatim_reverse_params(longitude, latitude),
+                    headers={"User-Agent": self.OSM_USER_AGENT},
+                )
+                result = None
+                if response.status_code == 200:
+                    result = self._parse_nominatim_reverse(response.json())
+            except (requests.exceptions.RequestException, ValueError) as exc:
+                breaker.record_failure()
+                logger.error("OSM reverse geocoding failed: %s", exc)
+                return None
+
+            self._record_status(breaker, response.status_code)
+            return result
+
+    def _fallback_search_nominatim(self, query: str, outcome: Optional[Dict] = None) -> Optional[Dict]:
+        logger.info("Falling back to OSM Nominatim geocoding for query=%s", query)
+        url = self.OSM_SEARCH_URL
+        breaker = self._breaker(url)
+        if not breaker.allow_request():
+            logger.warning("Skip OSM Nominatim with open circuit: %s", url)
+            return None
+
+        with breaker.attempt():
+            try:
+                response = self.http.get(
+                    url,
+                    params=self._nominatim_search_params(query),
+                    headers={"User-Agent": self.OSM_USER_AGENT},
+                )
+                result = None
+                if response.status_code == 200:
+                    result = self._parse_nominatim_search(response.json())
+                    self._mark_answered(outcome)
+            except (requests.exceptions.RequestException, ValueError) as exc:
+                breaker.record_failure()
+                logger.error("OSM geocoding fallback failed: %s", exc)
+                return None
+
+            self._record_status(breaker, response.status_code)
+            return result
+
+    async def _request_nominatim_async(
+        self,
+        url: str,
+        params: Dict,
+        parse: Callable[[object], object],
+        outcome: Optional[Dict] = None,
+    ):
+        breaker = self._breaker(url)
+        if not breaker.allow_request():
+            logger.warning("Skip OSM Nominatim with open circuit: %s", url)
+            return None
+
+        with breaker.attempt():
+            try:
+                response = await self.engine.get(
+                    url,
+                    params=params,
+                    headers={"User-Agent": self.OSM_USER_AGENT},
+                )
+                result = None
+                if response.status_code == 200:
+                    result = parse(response.json())
+                    self._mark_answered(outcome)
+            except (requests.exceptions.RequestException, ValueError) as exc:
+                breaker.record_failure()
+                logger.error("OSM Nominatim request failed: %s", exc)
+                return None
+
+            self._record_status(breaker, response.status_code)
+            return result
+
+    @staticmethod
+    def _mark_answered(outcome: Optional[Dict]):
+        if outcome is not None:
+            outcome["answered"] = True
+
+    @staticmethod
+    def _reverse_params(longitude: float, latitude: float) -> Dict:
+        return {
+            "coords": f"{longitude},{latitude}",
+            "orders": "roadaddr,addr",
+            "output": "json",
+        }
+
+    @staticmethod
+    def _nominatim_reverse_params(longitude: float, latitude: float) -> Dict:
+        return {
             "lat": latitude,
             "lon": longitude,
             "format": "json",
             "zoom": 18,
             "addressdetails": 1,
         }
-        headers = {
-            "User-Agent": self.OSM_USER_AGENT,
-        }
-
-        try:
-            response = requests.get(
-                url,
-                params=params,
-                headers=headers,
-                timeout=self.OSM_TIMEOUT_SECONDS,
-            )
-            if response.status_code == 200:
-                data = response.json()
-                address = data.get("display_name", "")
-                return address if address else None
-        except requests.exceptions.RequestException as exc:
-            logger.error("OSM reverse geocoding failed: %s", exc)
-
-        return None
 
-    def _fallback_search_nominatim(self, query: str) -> Optional[Dict]:
-        logger.info("Falling back to OSM Nominatim geocoding for query=%s", query)
-        url = "https://nominatim.openstreetmap.org/search"
-        params = {
+    @staticmethod
+    def _nominatim_search_params(query: str) -> Dict:
+        return {
             "q": query,
             "format": "json",
             "limit": 1,
         }
-        headers = {
-            "User-Agent": self.OSM_USER_AGENT,
-        }
 
-        try:
-            response = requests.get(
-                url,
-                params=params,
-                headers=headers,
-                timeout=self.OSM_TIMEOUT_SECONDS,
-            )
-            if response.status_code == 200:
-                data = response.json()
-                if data:
-                    first = data[0]
-                    return {
-                        "address": first.get("display_name"),
-                        "latitude": float(first.get("lat")),
-                        "longitude": float(first.get("lon")),
-                    }
-        except requests.exceptions.RequestException as exc:
-            logger.error("OSM geocoding fallback failed: %s", exc)
+    @staticmethod
+    def _parse_nominatim_reverse(data: Dict) -> Optional[str]:
+        address = data.get("display_name", "")
+        return address if address else None
 
-        return None
+    @staticmethod
+    def _parse_nominatim_search(data: List[Dict]) -> Optional[Dict]:
+        if not data:
+            return None
+
+        first = data[0]
+        return {
+            "address": first.get("display_name"),
+            "latitude": float(first.get("lat")),
+            "longitude": float(first.get("lon")),
+            "source": "nominatim",
+        }
@@ -2,12 +2,29 @@ import concurrent.futures
 import logging
 import math
 import re
-from typing import Dict, List, Optional
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
 import requests
 
+from utils.async_http import AsyncUpstreamEngine
+from utils.categories import QUERY_SYNONYMS
+from utils.coordinates import decode_naver_map_coordinates
+from utils.hedging import Hedger
+from utils.http_client import PooledHttpClient
+from utils.retry import RetryPolicy
+from utils.ttl_cache import CACHE_HIT, CACHE_MISS, CACHE_STALE, TTLCache
+
 logger = logging.getLogger(__name__)
 
+# Raw local-search pages, shared by every client instance in the process.
+_shared_page_cache = TTLCache(ttl=10 * 60, stale_ttl=50 * 60, max_entries=5000)
+
+_PAGE_CACHE_DIAGNOSTIC_KEYS = {
+    CACHE_HIT: "page_cache_hits",
+    CACHE_STALE: "page_cache_stale",
+}
+
 
 class NaverMapClient:
     """Client for Naver local search API with geocoding enrichment."""
@@ -16,6 +33,26 @@ class NaverMapClient:
     PAGE_SIZE = 5
     MAX_PAGE_STEPS = 20  # 5 * 20 = up to 100 items per query
     MAX_QUERY_VARIANTS = 8
+    FETCH_WORKERS = 8
+    PREFETCH_PAGES = 2
+    # Stop paging a variant after this many consecutive pages with nothing in radius.
+    MAX_OUT_OF_RADIUS_PAGES = 2
+    # Upstream page requests one search may spend across all variants. Fresh
+    # cache hits and prefetches cancelled before they ran are free.
+    MAX_UPSTREAM_CALLS = 24
+    # A variant whose first page is mostly results we already have is not paged further.
+    DUPLICATE_SKIP_RATIO = 0.8
+    # Prior for the learned yield: as if each kind had returned 2 useful items in 2 calls.
+    YIELD_PRIOR_CALLS = 2
+    YIELD_PRIOR_ITEMS = 2
+    # Learned yields are kept per kind and per kind within a grid area of this size.
+    YIELD_AREA_DEGREES = 0.1
+    GEOCODE_WORKERS = 6
+    POOL_SIZES = {"openapi.naver.com": 16}
+    TIMEOUT_SECONDS = 7
+    # (default, floor, ceiling) seconds for the adaptive per-host timeout.
+    TIMEOUT_BOUNDS = {"openapi.naver.com": (TIMEOUT_SECONDS, 1.5, TIMEOUT_SECONDS)}
+    HEDGE_CALL_TYPE = "local_search"
 
     def __init__(
         self,
@@ -23,11 +60,38 @@ class NaverMapClient:
         client_secret: str,
         geocoding_client_id: Optional[str] = None,
         geocoding_client_secret: Optional[str] = None,
+        use_map_coordinates: bool = True,
+        geocode_cache=None,
+        variant_stats=None,
+        page_cache: Optional[TTLCache] = None,
+        http: Optional[PooledHttpClient] = None,
+        geocoder=None,
+        hedger: Optional[Hedger] = None,
+        engine: Optional[AsyncUpstreamEngine] = None,
     ):
         self.client_id = client_id
         self.client_secret = client_secret
         self.geocoding_client_id = geocoding_client_id
         self.geocoding_client_secret = geocoding_client_secret
+        # Prefer mapx/mapy from search results; geocode only when they are unusable.
+        self.use_map_coordinates = use_map_coordinates
+        # Optional durable cache with get_many(addresses)/set_many(results).
+        self.geocode_cache = geocode_cache
+        # Optional learned yields with get_yields(kinds)/record(observations).
+        self.variant_stats = variant_stats
+        self.page_cache = page_cache if page_cache is not None else _shared_page_cache
+        self._diagnostics_lock = threading.Lock()
+        self.http = http or PooledHttpClient(
+            host_pool_sizes=self.POOL_SIZES,
+            host_timeouts=self.TIMEOUT_BOUNDS,
+            retry_policy=RetryPolicy(),
+        )
+        self._geocoder = geocoder
+        # Hedging is opt-in per call type; the default hedger never hedges.
+        self.hedger = hedger or Hedger()
+        # With an asyncio engine, pages and geocodes run as coroutines on its
+        # loop instead of on worker threads.
+        self.engine = engine
         self.headers = {
             "X-Naver-Client-Id": client_id,
             "X-Naver-Client-Secret": client_secret,
@@ -42,139 +106,643 @@ class NaverMapClient:
         display: int = 20,
         location_hint: Optional[str] = None,
         categories: Optional[List[str]] = None,
+        diagnostics: Optional[Dict] = None,
     ) -> List[Dict]:
-        """Search places and enrich them with lat/lng via geocoding."""
+        """
+        Search places and attach lat/lng.
+
+        Coordinates come from the mapx/mapy fields of each result when they decode
+        to a valid location; geocoding is only used for the remaining items.
+        Page cache counters are added to `diagnostics` when it is given.
+        """
+        resolved = list(
+            self.iter_search_local(
+                query,
+                latitude=latitude,
+                longitude=longitude,
+                radius=radius,
+                display=display,
+                location_hint=location_hint,
+                categories=categories,
+                diagnostics=diagnostics,
+            )
+        )
+        # Geocoded items finish out of order; restore the paging order.
+        resolved.sort(key=lambda row: row[0])
+        results = [parsed for _, parsed in resolved]
+
+        if latitude is None or longitude is None:
+            return results
+
+        nearby = []
+        fallback = []
+
+        for result in results:
+            distance = result.get("distance")
+
+            if distance is None:
+                fallback.append(result)
+                continue
+
+            if distance <= radius:
+                nearby.append(result)
+            else:
+                fallback.append(result)
+
+        if nearby:
+            nearby.sort(key=lambda x: x.get("distance", 999999))
+            return nearby
+
+        # If radius filtering yields no candidates, return best-effort for caller-side filtering.
+        fallback.sort(key=lambda x: x.get("distance", 999999))
+        return fallback
+
+    def iter_search_local(
+        self,
+        query: str,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        radius: Optional[int] = None,
+        display: int = 20,
+        location_hint: Optional[str] = None,
+        categories: Optional[List[str]] = None,
+        diagnostics: Optional[Dict] = None,
+    ) -> Iterator[Tuple[int, Dict]]:
+        """
+        Yield (position, item) pairs as soon as each item's coordinates are settled.
+
+        Items with usable mapx/mapy are yielded the moment their page is parsed;
+        the rest are geocoded in the background while paging continues. `position`
+        is the item's index in paging order. When latitude/longitude are given,
+        items with coordinates carry a `distance` in meters, and with a `radius`
+        a variant stops paging once its pages keep landing outside it.
+        """
         if not self.client_id or not self.client_secret:
             logger.warning("Naver client credentials are missing")
-            return []
+            return
 
         normalized_query = (query or "음식점").strip() or "음식점"
-        queries = self._build_queries(normalized_query, location_hint, categories)
+        stats_area = self._stats_area(latitude, longitude, location_hint)
+        plan = self._order_query_plan(
+            self._build_query_plan(normalized_query, location_hint, categories),
+            stats_area,
+        )
+        queries = [variant_query for _, variant_query in plan]
         max_items = max(self.PAGE_SIZE, min(display, self.PAGE_SIZE * self.MAX_PAGE_STEPS))
-        page_starts = range(1, self.PAGE_SIZE * self.MAX_PAGE_STEPS + 1, self.PAGE_SIZE)
-
-        all_items: List[Dict] = []
-        seen_keys = set()
 
-        for query_text in queries:
-            for start in page_starts:
-                if len(all_items) >= max_items:
-                    break
+        if diagnostics is not None:
+            for key in ("page_cache_hits", "page_cache_stale", "page_cache_misses"):
+                diagnostics.setdefault(key, 0)
 
-                items = self._search_page(
-                    query_text,
-                    start=start,
-                    display=min(self.PAGE_SIZE, max_items - len(all_items)),
+        geocoder = self.geocoder
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.GEOCODE_WORKERS)
+        coord_cache: Dict[str, Optional[Dict]] = {}
+        resolved_coords: Dict[str, Optional[Dict]] = {}
+        # Whether an upstream answered each lookup; failed ones are not cached.
+        geocode_outcomes: Dict[str, Dict] = {}
+        address_futures: Dict[str, concurrent.futures.Future] = {}
+        future_addresses: Dict[concurrent.futures.Future, str] = {}
+        waiting: Dict[concurrent.futures.Future, List[Tuple[int, Dict]]] = {}
+        radius_aware = latitude is not None and longitude is not None and radius is not None
+        # Variant index of every item position, and per-variant items that landed in radius.
+        item_variants: List[int] = []
+        in_radius_items: Dict[int, int] = {}
+
+        def finish(position: int, parsed: Dict, coord: Optional[Dict]) -> Tuple[int, Dict]:
+            if coord:
+                parsed["latitude"] = coord.get("latitude")
+                parsed["longitude"] = coord.get("longitude")
+            if (
+                latitude is not None
+                and longitude is not None
+                and parsed.get("latitude") is not None
+                and parsed.get("longitude") is not None
+            ):
+                parsed["distance"] = int(
+                    self._distance_meters(
+                        latitude, longitude, parsed["latitude"], parsed["longitude"]
+                    )
                 )
-                if not items:
-                    break
+                if radius_aware and parsed["distance"] <= radius:
+                    variant_index = item_variants[position]
+                    in_radius_items[variant_index] = in_radius_items.get(variant_index, 0) + 1
+            return position, parsed
+
+        def drain(block: bool) -> Iterator[Tuple[int, Dict]]:
+            while waiting:
+                done, _ = concurrent.futures.wait(
+                    list(waiting),
+                    timeout=None if block else 0,
+                    return_when=concurrent.futures.FIRST_COMPLETED,
+                )
+                if not done:
+                    return
+
+                for future in done:
+                    address = future_addresses[future]
+                    try:
+                        coord = future.result()
+                        coord_cache[address] = coord
+                        if coord or geocode_outcomes[address].get("answered"):
+                            resolved_coords[address] = coord
+                    except Exception as exc:
+                        logger.error("Failed to geocode search item: %s", exc)
+                        coord = None
 
-                for item in items:
-                    clean_title = self._clean_title(item.get("title", ""))
-                    dedupe_key = (
-                        f"{clean_title}_{item.get('address', '')}_{item.get('roadAddress', '')}"
+                    for position, parsed in waiting.pop(future):
+                        yield finish(position, parsed, coord)
+
+        # Whether the page being consumed had anything in radius (or still geocoding).
+        page_state = {"in_radius": True}
+
+        variant_report: Dict[int, Dict] = {}
+
+        position = 0
+        try:
+            for page_items in self._iter_search_pages(
+                queries,
+                max_items,
+                diagnostics,
+                page_contributed=(lambda: page_state["in_radius"]) if radius_aware else None,
+                report=variant_report,
+                item_variants=item_variants,
+            ):
+                parsed_page = []
+                for item in page_items:
+                    parsed_page.append((position, self._parse_item(item)))
+                    position += 1
+
+                coord_cache.update(
+                    self._load_cached_coords(
+                        [
+                            parsed
+                            for _, parsed in parsed_page
+                            if self._geocoding_address(parsed) not in coord_cache
+                        ]
                     )
-                    if dedupe_key in seen_keys:
+                )
+
+                page_state["in_radius"] = False
+                for item_position, parsed in parsed_page:
+                    if parsed.get("latitude") is not None and parsed.get("longitude") is not None:
+                        row = finish(item_position, parsed, None)
+                        self._track_radius(row, radius, page_state)
+                        yield row
                         continue
-                    seen_keys.add(dedupe_key)
-                    all_items.append(item)
 
-            if len(all_items) >= max_items:
-                break
+                    address = self._geocoding_address(parsed)
+                    if not address or address in coord_cache:
+                        row = finish(item_position, parsed, coord_cache.get(address))
+                        self._track_radius(row, radius, page_state)
+                        yield row
+                        continue
 
-        if not all_items:
-            return []
+                    page_state["in_radius"] = True
+
+                    future = address_futures.get(address)
+                    if future is None:
+                        geocode_outcomes[address] = {}
+                        future = self._submit_geocode(
+                            executor, geocoder, address, geocode_outcomes[address]
+                        )
+                        address_futures[address] = future
+                        future_addresses[future] = address
+                    waiting.setdefault(future, []).append((item_position, parsed))
+
+                yield from drain(block=False)
+
+            yield from drain(block=True)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._store_cached_coords(resolved_coords)
+            self._finish_query_plan(
+                plan,
+                variant_report,
+                diagnostics,
+                in_radius_items=in_radius_items if radius_aware else None,
+                stats_area=stats_area,
+            )
+
+    @property
+    def geocoder(self):
+        """Geocoding client, created lazily unless one was injected."""
+        if self._geocoder is None:
+            from api.naver_geocoding import NaverGeocodingClient
 
-        from api.naver_geocoding import NaverGeocodingClient
+            self._geocoder = NaverGeocodingClient(
+                self.geocoding_client_id or "",
+                self.geocoding_client_secret or "",
+                engine=self.engine,
+            )
+        return self._geocoder
+
+    @staticmethod
+    def _track_radius(row: Tuple[int, Dict], radius: Optional[int], page_state: Dict):
+        distance = row[1].get("distance")
+        if radius is not None and distance is not None and distance <= radius:
+            page_state["in_radius"] = True
 
-        geocoder = NaverGeocodingClient(
-            self.geocoding_client_id or "",
-            self.geocoding_client_secret or "",
+    def _iter_search_pages(
+        self,
+        queries: List[str],
+        max_items: int,
+        diagnostics: Optional[Dict] = None,
+        page_contributed: Optional[Callable[[], bool]] = None,
+        report: Optional[Dict[int, Dict]] = None,
+        max_calls: Optional[int] = None,
+        item_variants: Optional[List[int]] = None,
+    ) -> Iterator[List[Dict]]:
+        """
+        Yield each page's new (deduplicated) raw items in serial-walk order.
+
+        The first page of every query variant is requested up front and later pages
+        of the variant being consumed are prefetched, so round trips overlap while
+        the merge below stays strictly ordered by (variant, page).
+
+        `page_contributed` is asked after the consumer has handled each yielded
+        page; a variant stops once MAX_OUT_OF_RADIUS_PAGES pages in a row returned
+        False. A variant also stops when its first page is mostly duplicates, and
+        no upstream request is made past `max_calls` (MAX_UPSTREAM_CALLS by
+        default); fresh cached pages are served without touching that budget.
+        `report` is filled with {variant_index: {"calls", "upstream_calls",
+        "new_items", "stop"}}, where calls counts pages read from cache or
+        upstream, and `item_variants` gets the variant index of every yielded item.
+        """
+        max_calls = self.MAX_UPSTREAM_CALLS if max_calls is None else max_calls
+        report = {} if report is None else report
+        for variant_index in range(len(queries)):
+            report[variant_index] = {"calls": 0, "upstream_calls": 0, "new_items": 0, "stop": None}
+
+        page_starts = list(range(1, self.PAGE_SIZE * self.MAX_PAGE_STEPS + 1, self.PAGE_SIZE))
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, min(self.FETCH_WORKERS, len(queries) + self.PREFETCH_PAGES))
         )
-        coord_cache: Dict[str, Optional[Dict]] = {}
+        futures: Dict[Tuple[int, int], concurrent.futures.Future] = {}
+        # Pages charged to the upstream budget.
+        charged: List[Tuple[int, int]] = []
+
+        def schedule(variant_index: int, page_index: int) -> bool:
+            key = (variant_index, page_index)
+            if key in futures:
+                return True
+            if page_index >= len(page_starts):
+                return False
+
+            cached = self._cached_page(queries[variant_index], page_starts[page_index], diagnostics)
+            if cached is not None:
+                future = concurrent.futures.Future()
+                future.set_result(cached)
+                futures[key] = future
+                report[variant_index]["calls"] += 1
+                return True
+
+            if len(charged) >= max_calls:
+                return False
+            charged.append(key)
+            report[variant_index]["calls"] += 1
+            report[variant_index]["upstream_calls"] += 1
+            futures[key] = self._submit_page(
+                executor,
+                queries[variant_index],
+                page_starts[page_index],
+                diagnostics,
+            )
+            return True
 
-        def convert_item(item: Dict) -> Dict:
-            parsed = self._parse_item(item)
-            address = parsed.get("road_address") or parsed.get("address")
+        seen_keys = set()
+        emitted = 0
 
-            if address:
-                coord = coord_cache.get(address)
-                if coord is None and address not in coord_cache:
-                    coord = geocoder.address_to_coord(address)
-                    coord_cache[address] = coord
+        try:
+            for variant_index in range(len(queries)):
+                schedule(variant_index, 0)
+
+            for variant_index in range(len(queries)):
+                stop_reason = "page_limit"
+                out_of_radius_pages = 0
+                for page_index in range(len(page_starts)):
+                    if emitted >= max_items:
+                        report[variant_index]["stop"] = "max_items"
+                        return
+
+                    if not schedule(variant_index, page_index):
+                        stop_reason = "budget"
+                        break
+                    try:
+                        items = futures[(variant_index, page_index)].result()
+                    except Exception as exc:
+                        logger.error("Naver local search page failed: %s", exc)
+                        items = []
+
+                    if not items:
+                        stop_reason = "exhausted"
+                        break
+
+                    # A short page means the variant is exhausted.
+                    is_full_page = len(items) >= self.PAGE_SIZE
+                    if is_full_page:
+                        pages_needed = math.ceil((max_items - emitted) / self.PAGE_SIZE) - 1
+                        for offset in range(1, min(self.PREFETCH_PAGES, pages_needed) + 1):
+                            schedule(variant_index, page_index + offset)
+
+                    page_items = []
+                    duplicates = 0
+                    for item in items:
+                        clean_title = self._clean_title(item.get("title", ""))
+                        dedupe_key = (
+                            f"{clean_title}_{item.get('address', '')}_{item.get('roadAddress', '')}"
+                        )
+                        if dedupe_key in seen_keys:
+                            duplicates += 1
+                            continue
+                        seen_keys.add(dedupe_key)
+                        page_items.append(item)
+                        if emitted + len(page_items) >= max_items:
+                            break
+
+                    if page_items:
+                        emitted += len(page_items)
+                        report[variant_index]["new_items"] += len(page_items)
+                        if item_variants is not None:
+                            item_variants.extend([variant_index] * len(page_items))
+                        yield page_items
+
+                        if page_contributed is not None:
+                            if page_contributed():
+                                out_of_radius_pages = 0
+                            else:
+                                out_of_radius_pages += 1
+
+                    if not is_full_page:
+                        stop_reason = "exhausted"
+                        break
+                    if page_index == 0 and duplicates >= self.DUPLICATE_SKIP_RATIO * len(items):
+                        stop_reason = "duplicates"
+                        break
+                    if out_of_radius_pages >= self.MAX_OUT_OF_RADIUS_PAGES:
+                        stop_reason = "out_of_radius"
+                        break
+
+                report[variant_index]["stop"] = stop_reason
+        finally:
+            # Drop speculative pages nobody is going to read. cancel() only succeeds
+            # before the request begins, so those never reached upstream.
+            for key in charged:
+                if futures[key].cancel():
+                    report[key[0]]["calls"] -= 1
+                    report[key[0]]["upstream_calls"] -= 1
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _finish_query_plan(
+        self,
+        plan: List[Tuple[str, str]],
+        report: Dict[int, Dict],
+        diagnostics: Optional[Dict],
+        in_radius_items: Optional[Dict[int, int]] = None,
+        stats_area: Optional[str] = None,
+    ):
+        """
+        Publish per-variant diagnostics and feed the learned yields.
+
+        With `in_radius_items` (radius searches) a variant's yield counts only
+        the items it found inside the radius; otherwise every new item counts.
+        """
+        observations: Dict[str, List[int]] = {}
+        variants = []
+        for variant_index, (kind, variant_query) in enumerate(plan):
+            row = report.get(variant_index)
+            if row is None or not row["calls"]:
+                continue
+            variant = {
+                "query": variant_query,
+                "kind": kind,
+                "calls": row["calls"],
+                "upstream_calls": row["upstream_calls"],
+                "new_items": row["new_items"],
+                "stop": row["stop"],
+            }
+            useful_items = row["new_items"]
+            if in_radius_items is not None:
+                useful_items = variant["in_radius_items"] = in_radius_items.get(variant_index, 0)
+            variants.append(variant)
+
+            for key in self._stats_keys(kind, stats_area):
+                counts = observations.setdefault(key, [0, 0])
+                counts[0] += row["calls"]
+                counts[1] += useful_items
+
+        if diagnostics is not None:
+            with self._diagnostics_lock:
+                diagnostics["variants"] = variants
+                diagnostics["upstream_calls"] = sum(row["upstream_calls"] for row in variants)
+                diagnostics["variant_stops"] = {
+                    row["query"]: row["stop"] for row in variants if row["stop"]
+                }
+
+        if self.variant_stats is not None and observations:
+            try:
+                self.variant_stats.record(
+                    {kind: tuple(counts) for kind, counts in observations.items()}
+                )
+            except Exception as exc:
+                logger.warning("Query variant stats update failed: %s", exc)
 
-                if coord:
-                    parsed["latitude"] = coord.get("latitude")
-                    parsed["longitude"] = coord.get("longitude")
+    @staticmethod
+    def _geocoding_address(parsed: Dict) -> str:
+        return parsed.get("road_address") or parsed.get("address") or ""
 
-            return parsed
+    def _load_cached_coords(self, parsed_items: List[Dict]) -> Dict[str, Optional[Dict]]:
+        if self.geocode_cache is None:
+            return {}
 
-        results: List[Dict] = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=6) as executor:
-            future_to_item = {executor.submit(convert_item, item): item for item in all_items}
-            for future in concurrent.futures.as_completed(future_to_item):
-                try:
-                    results.append(future.result())
-                except Exception as exc:
-                    logger.error("Failed to parse search item: %s", exc)
+        addresses = {
+            self._geocoding_address(parsed)
+            for parsed in parsed_items
+            if parsed.get("latitude") is None or parsed.get("longitude") is None
+        }
+        addresses.discard("")
+        if not addresses:
+            return {}
 
-        if latitude is None or longitude is None:
-            return results
+        try:
+            return dict(self.geocode_cache.get_many(addresses))
+        except Exception as exc:
+            logger.warning("Geocode cache lookup failed: %s", exc)
+            return {}
 
-        nearby = []
-        fallback = []
+    def _store_cached_coords(self, resolved_coords: Dict[str, Optional[Dict]]):
+        if self.geocode_cache is None or not resolved_coords:
+            return
 
-        for result in results:
-            lat = result.get("latitude")
-            lng = result.get("longitude")
+        try:
+            self.geocode_cache.set_many(resolved_coords)
+        except Exception as exc:
+            logger.warning("Geocode cache update failed: %s", exc)
 
-            if lat is None or lng is None:
-                fallback.append(result)
-                continue
+    def _submit_page(
+        self,
+        executor: concurrent.futures.Executor,
+        query: str,
+        start: int,
+        diagnostics: Optional[Dict],
+    ) -> concurrent.futures.Future:
+        """
+        Fetch one page in the background.
+
+        Like an executor future, the returned one can only be cancelled before
+        its request begins.
+        """
+        if self.engine is None:
+            return executor.submit(
+                self._search_page, query, start=start, display=self.PAGE_SIZE, diagnostics=diagnostics
+            )
 
-            distance = self._distance_meters(latitude, longitude, lat, lng)
-            result["distance"] = int(distance)
+        page = concurrent.futures.Future()
 
-            if distance <= radius:
-                nearby.append(result)
-            else:
-                fallback.append(result)
+        async def run_async():
+            if not page.set_running_or_notify_cancel():
+                return None
+            return await self._search_page_async(query, start, self.PAGE_SIZE, diagnostics)
 
-        if nearby:
-            nearby.sort(key=lambda x: x.get("distance", 999999))
-            return nearby
+        def copy_result(done: concurrent.futures.Future):
+            if page.cancelled():
+                return
+            try:
+                page.set_result(done.result())
+            except BaseException as exc:
+                page.set_exception(exc)
 
-        # If radius filtering yields no candidates, return best-effort for caller-side filtering.
-        fallback.sort(key=lambda x: x.get("distance", 999999))
-        return fallback
+        self.engine.submit(run_async()).add_done_callback(copy_result)
+        return page
+
+    def _cached_page(self, query: str, start: int, diagnostics: Optional[Dict]) -> Optional[List[Dict]]:
+        """A fresh cached page (counted as a hit), or None when upstream must be asked."""
+        status, items = self.page_cache.get((self._canonical_query(query), start, self.PAGE_SIZE))
+        if status != CACHE_HIT:
+            return None
+
+        self._count_page_cache(status, diagnostics)
+        return items or []
+
+    def _submit_geocode(
+        self,
+        executor: concurrent.futures.Executor,
+        geocoder,
+        address: str,
+        outcome: Dict,
+    ) -> concurrent.futures.Future:
+        if self.engine is not None and getattr(geocoder, "engine", None) is self.engine:
+            return self.engine.submit(geocoder.address_to_coord_async(address, outcome=outcome))
+        return executor.submit(geocoder.address_to_coord, address, outcome=outcome)
+
+    def _search_page(
+        self,
+        query: str,
+        start: int,
+        display: int,
+        diagnostics: Optional[Dict] = None,
+    ) -> List[Dict]:
+        display = max(1, min(display, self.PAGE_SIZE))
+        cache_key = (self._canonical_query(query), start, display)
+
+        def request():
+            return self._request_page(query, start, display)
+
+        items, status = self.page_cache.get_or_load(
+            cache_key,
+            # The hedge repeats the same idempotent request on another pooled connection.
+            lambda: self.hedger.call(self.HEDGE_CALL_TYPE, [request, request]),
+        )
+        self._count_page_cache(status, diagnostics)
+        return items or []
+
+    async def _search_page_async(
+        self,
+        query: str,
+        start: int,
+        display: int,
+        diagnostics: Optional[Dict] = None,
+    ) -> List[Dict]:
+        display = max(1, min(display, self.PAGE_SIZE))
+        cache_key = (self._canonical_query(query), start, display)
+
+        status, items = self.page_cache.get(cache_key)
+        if status == CACHE_STALE:
+            # Serve stale and let the cache refresh it in the background as usual.
+            items, status = self.page_cache.get_or_load(
+                cache_key,
+                lambda: self._request_page(query, start, display),
+            )
+        elif status == CACHE_MISS:
+            items = await self._request_page_async(query, start, display)
+            if items is not None:
+                self.page_cache.set(cache_key, items)
+
+        self._count_page_cache(status, diagnostics)
+        return items or []
 
-    def _search_page(self, query: str, start: int, display: int) -> List[Dict]:
+    def _count_page_cache(self, status: str, diagnostics: Optional[Dict]):
+        if diagnostics is None:
+            return
+
+        counter = _PAGE_CACHE_DIAGNOSTIC_KEYS.get(status, "page_cache_misses")
+        with self._diagnostics_lock:
+            diagnostics[counter] = diagnostics.get(counter, 0) + 1
+
+    def _request_page(self, query: str, start: int, display: int) -> Optional[List[Dict]]:
+        """Fetch one page; None signals a failure that must not be cached."""
         params = {
             "query": query,
-            "display": max(1, min(display, self.PAGE_SIZE)),
+            "display": display,
             "start": start,
             "sort": "sim",
         }
 
         try:
-            response = requests.get(
+            response = self.http.get(
                 self.BASE_URL,
                 headers=self.headers,
                 params=params,
-                timeout=7,
             )
-            if response.status_code != 200:
-                logger.warning(
-                    "Naver local search failed: status=%s query=%s",
-                    response.status_code,
-                    query,
-                )
-                return []
+            return self._page_items(response, query)
+        except requests.exceptions.RequestException as exc:
+            logger.error("Naver local search request failed: %s", exc)
+            return None
 
-            return response.json().get("items", [])
+    async def _request_page_async(self, query: str, start: int, display: int) -> Optional[List[Dict]]:
+        params = {
+            "query": query,
+            "display": display,
+            "start": start,
+            "sort": "sim",
+        }
+
+        try:
+            response = await self.engine.get(
+                self.BASE_URL,
+                headers=self.headers,
+                params=params,
+            )
+            return self._page_items(response, query)
         except requests.exceptions.RequestException as exc:
             logger.error("Naver local search request failed: %s", exc)
-            return []
+            return None
+
+    @staticmethod
+    def _page_items(response, query: str) -> Optional[List[Dict]]:
+        if response.status_code != 200:
+            logger.warning(
+                "Naver local search failed: status=%s query=%s",
+                response.status_code,
+                query,
+            )
+            return None
+
+        return response.json().get("items", [])
+
+    @staticmethod
+    def _canonical_query(query: str) -> str:
+        """Cache key form of a query: case/whitespace folded, spelling synonyms merged."""
+        return " ".join(QUERY_SYNONYMS.get(token, token) for token in (query or "").lower().split())
 
     @staticmethod
     def _clean_title(title: str) -> str:
@@ -207,45 +775,98 @@ class NaverMapClient:
             normalized.append(value)
         return normalized
 
-    @classmethod
-    def _append_query(cls, rows: List[str], value: str):
+    @staticmethod
+    def _append_query(rows: List[Tuple[str, str]], value: str, kind: str):
         query = " ".join(value.split()).strip()
         if not query:
             return
-        if query in rows:
+        if any(existing == query for _, existing in rows):
             return
-        rows.append(query)
+        rows.append((kind, query))
 
-    def _build_queries(
+    def _build_query_plan(
         self,
         query: str,
         location_hint: Optional[str],
         categories: Optional[List[str]],
-    ) -> List[str]:
+    ) -> List[Tuple[str, str]]:
+        """Candidate (kind, query) variants in their default order."""
         normalized_hint = self._normalize_location_hint(location_hint)
         normalized_categories = self._normalize_categories(categories)
 
-        rows: List[str] = []
+        rows: List[Tuple[str, str]] = []
 
         if normalized_hint:
-            self._append_query(rows, f"{normalized_hint} {query}")
-        self._append_query(rows, query)
+            self._append_query(rows, f"{normalized_hint} {query}", "hint+query")
+        self._append_query(rows, query, "query")
 
         for category in normalized_categories:
             if normalized_hint:
-                self._append_query(rows, f"{normalized_hint} {category}")
+                self._append_query(rows, f"{normalized_hint} {category}", "hint+category")
 
-            self._append_query(rows, category)
+            self._append_query(rows, category, "category")
 
             if query != category:
-                self._append_query(rows, f"{query} {category}")
+                self._append_query(rows, f"{query} {category}", "query+category")
                 if normalized_hint:
-                    self._append_query(rows, f"{normalized_hint} {query} {category}")
+                    self._append_query(
+                        rows, f"{normalized_hint} {query} {category}", "hint+query+category"
+                    )
 
             if len(rows) >= self.MAX_QUERY_VARIANTS:
                 break
 
-        return rows[: self.MAX_QUERY_VARIANTS] or [query]
+        return rows[: self.MAX_QUERY_VARIANTS] or [("query", query)]
+
+    def _order_query_plan(
+        self,
+        plan: List[Tuple[str, str]],
+        stats_area: Optional[str] = None,
+    ) -> List[Tuple[str, str]]:
+        """
+        Order variants by learned useful items per call; unknown kinds keep their place.
+
+        Stats from similar searches (same kind in the same area) win over the
+        kind's overall stats once they exist.
+        """
+        if self.variant_stats is None or len(plan) < 2:
+            return plan
+
+        keys = {key for kind, _ in plan for key in self._stats_keys(kind, stats_area)}
+        try:
+            observed = self.variant_stats.get_yields(keys)
+        except Exception as exc:
+            logger.warning("Query variant stats lookup failed: %s", exc)
+            return plan
+
+        def learned_yield(kind: str) -> float:
+            calls, useful_items = next(
+                (observed[key] for key in self._stats_keys(kind, stats_area) if key in observed),
+                (0, 0),
+            )
+            return (useful_items + self.YIELD_PRIOR_ITEMS) / (calls + self.YIELD_PRIOR_CALLS)
+
+        return sorted(plan, key=lambda row: -learned_yield(row[0]))
+
+    def _stats_area(
+        self,
+        latitude: Optional[float],
+        longitude: Optional[float],
+        location_hint: Optional[str],
+    ) -> Optional[str]:
+        """Coarse bucket of where a search looks, grouping similar searches' stats."""
+        if latitude is not None and longitude is not None:
+            size = self.YIELD_AREA_DEGREES
+            return f"{math.floor(latitude / size) * size:.1f},{math.floor(longitude / size) * size:.1f}"
+        hint = self._normalize_location_hint(location_hint)
+        return hint.split()[0] if hint else None
+
+    @staticmethod
+    def _stats_keys(kind: str, stats_area: Optional[str]) -> List[str]:
+        """Stats keys for a kind, most specific first."""
+        if not stats_area:
+            return [kind]
+        return [f"{kind}@{stats_area}"[:50], kind]
 
     @staticmethod
     def _distance_meters(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
@@ -268,6 +889,10 @@ class NaverMapClient:
         title = self._clean_title(item.get("title", ""))
         category_full = item.get("category", "")
 
+        coord = None
+        if self.use_map_coordinates:
+            coord = decode_naver_map_coordinates(item.get("mapx"), item.get("mapy"))
+
         return {
             "title": title,
             "category": category_full,
@@ -275,6 +900,6 @@ class NaverMapClient:
             "road_address": item.get("roadAddress", ""),
             "telephone": item.get("telephone", ""),
             "link": item.get("link", ""),
-            "latitude": None,
-            "longitude": None,
+            "latitude": coord[0] if coord else None,
+            "longitude": coord[1] if coord else None,
         }
@@ -1,55 +1,53 @@
 import hashlib
+import json
 import logging
-import math
+import time
+from datetime import datetime, timezone
 from typing import Dict, List
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
 
-from api.naver_geocoding import NaverGeocodingClient
+from api.clients import get_geocoding_client, get_naver_map_client
 from api.naver_map import NaverMapClient
 from config import Config
 from database import db
 from models.restaurant import Restaurant
+from services.geocode_cache_service import GeocodeCacheService
+from services.marker_cluster_service import MarkerClusterService
 from services.menu_service import MenuService
+from services.pending_search_service import PendingSearchService
+from services.restaurant_index_service import RESTAURANT_INDEX_KEY
+from services.reverse_geocode_cache_service import ReverseGeocodeCacheService
+from services.spatial_index_service import SpatialIndexService
+from utils.categories import category_matcher
+from utils.coordinates import haversine_distance
 from utils.text_normalizer import normalize_menu_name
+from utils.tiles import is_valid_tile, tile_bounds
 
 logger = logging.getLogger(__name__)
 
 restaurant_bp = Blueprint("restaurant", __name__)
 menu_service = MenuService()
-
-_CATEGORY_ALIASES = {
-    "한식": {"한식", "국밥", "찌개", "백반", "분식"},
-    "중식": {"중식", "중국", "중국집", "짬뽕", "짜장", "마라"},
-    "일식": {"일식", "일본식", "초밥", "스시", "라멘", "돈카츠", "돈까스"},
-    "양식": {"양식", "파스타", "스테이크", "브런치"},
-    "아시안": {"아시안", "동남아", "태국", "베트남", "인도", "쌀국수"},
-    "치킨": {"치킨", "닭", "통닭", "후라이드"},
-    "피자": {"피자"},
-    "카페": {"카페", "디저트", "베이커리", "커피"},
-    "회": {"회", "해산물", "초밥", "스시"},
-    "고기": {"고기", "구이", "삼겹살", "갈비", "곱창"},
-    "패스트푸드": {"패스트푸드", "햄버거", "버거", "샌드위치"},
-    "족발": {"족발", "보쌈"},
+geocode_cache = GeocodeCacheService()
+pending_searches = PendingSearchService()
+reverse_geocode_cache = ReverseGeocodeCacheService(
+    cell_meters=Config.REVERSE_GEOCODE_CELL_METERS,
+    ttl_hours=Config.REVERSE_GEOCODE_TTL_HOURS,
+)
+spatial_index = SpatialIndexService()
+marker_clusters = MarkerClusterService()
+
+_MENU_MODES = {"blocking", "deferred"}
+_STREAM_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
 }
-
-
-def haversine_distance(lat1, lon1, lat2, lon2):
-    """Return distance in meters between two WGS84 coordinates."""
-    earth_radius = 6371000
-
-    phi1 = math.radians(lat1)
-    phi2 = math.radians(lat2)
-    delta_phi = math.radians(lat2 - lat1)
-    delta_lambda = math.radians(lon2 - lon1)
-
-    a = (
-        math.sin(delta_phi / 2) ** 2
-        + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2) ** 2
-    )
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-
-    return earth_radius * c
+# Streamed candidates are resolved in small batches: one insert/commit and one
+# concurrent menu crawl per batch instead of per item.
+_STREAM_BATCH_SIZE = 5
+_STREAM_BATCH_SECONDS = 0.1
 
 
 def _build_place_id(item: dict) -> str:
@@ -60,38 +58,11 @@ def _build_place_id(item: dict) -> str:
     return hashlib.sha256(source_key.encode("utf-8", errors="ignore")).hexdigest()[:20]
 
 
-def _normalize_text(value: str) -> str:
-    return "".join((value or "").lower().split())
-
-
-def _expand_category_terms(category: str) -> List[str]:
-    value = (category or "").strip().lower()
-    if not value:
-        return []
-
-    terms = {value}
-    for alias_key, alias_values in _CATEGORY_ALIASES.items():
-        if value in {alias_key.lower(), *{a.lower() for a in alias_values}}:
-            terms |= {alias_key.lower(), *{a.lower() for a in alias_values}}
-            break
-    return list(terms)
-
-
 def _matches_categories(item: Dict, categories: List[str]) -> bool:
     if not categories:
         return True
 
-    category_text = _normalize_text(item.get("category", ""))
-    title_text = _normalize_text(item.get("title", ""))
-    haystack = f"{category_text} {title_text}"
-
-    for selected in categories:
-        for term in _expand_category_terms(selected):
-            needle = _normalize_text(term)
-            if needle and needle in haystack:
-                return True
-
-    return False
+    return category_matcher(categories).matches_any(item.get("category", ""), item.get("title", ""))
 
 
 @restaurant_bp.route("/geocode/reverse", methods=["GET"])
@@ -102,12 +73,7 @@ def reverse_geocode():
     if latitude is None or longitude is None:
         return jsonify({"error": "lat and lng are required"}), 400
 
-    geocoding_client = NaverGeocodingClient(
-        Config.NAVER_CLOUD_ID,
-        Config.NAVER_CLOUD_SECRET,
-    )
-
-    address = geocoding_client.coord_to_address(longitude, latitude)
+    address, _ = reverse_geocode_cache.resolve(latitude, longitude, get_geocoding_client())
 
     if address:
         return jsonify(
@@ -133,12 +99,14 @@ def geocode_address():
     if not query:
         return jsonify({"error": "query is required"}), 400
 
-    geocoding_client = NaverGeocodingClient(
-        Config.NAVER_CLOUD_ID,
-        Config.NAVER_CLOUD_SECRET,
-    )
+    cache_hit, result = geocode_cache.get(query)
+    if not cache_hit:
+        outcome = {}
+        result = get_geocoding_client().address_to_coord(query, outcome=outcome)
+        # A failed lookup is not a "not found"; leave it uncached so it is retried.
+        if result or outcome.get("answered"):
+            geocode_cache.set(query, result)
 
-    result = geocoding_client.address_to_coord(query)
     if not result:
         return jsonify({"error": "Address not found"}), 404
 
@@ -179,9 +147,18 @@ def search_restaurants():
             or data.get("address")
             or ""
         )
-    except (TypeError, ValueError):
+        menu_mode = (data.get("menu_mode") or data.get("menuMode") or "blocking").strip().lower()
+    except (TypeError, ValueError, AttributeError):
         return jsonify({"error": "Invalid parameter values"}), 400
 
+    if menu_mode not in _MENU_MODES:
+        return jsonify({"error": "menu_mode must be 'blocking' or 'deferred'"}), 400
+    defer_menus = menu_mode == "deferred" and budget is not None
+
+    stream_format = _requested_stream_format(data)
+    if stream_format is not None and stream_format not in _STREAM_FORMATS:
+        return jsonify({"error": "stream must be 'ndjson' or 'sse'"}), 400
+
     logger.info(
         "Search restaurants query=%s lat=%s lng=%s radius=%s budget=%s categories=%s",
         query,
@@ -192,118 +169,316 @@ def search_restaurants():
         categories,
     )
 
-    naver_client = NaverMapClient(
-        Config.NAVER_CLIENT_ID,
-        Config.NAVER_CLIENT_SECRET,
-        geocoding_client_id=Config.NAVER_CLOUD_ID,
-        geocoding_client_secret=Config.NAVER_CLOUD_SECRET,
-    )
+    naver_client = get_naver_map_client()
 
-    raw_results = naver_client.search_local(
-        query=query,
-        latitude=lat,
-        longitude=lng,
-        radius=radius,
-        display=Config.MAX_SEARCH_RESULTS,
-        location_hint=location_hint,
-        categories=categories,
-    )
+    location_hint_source = "client" if location_hint else None
+    if not location_hint:
+        # Saves the client a /geocode/reverse round trip before every search.
+        # Only the cache is read here; misses are filled in the background.
+        location_hint, location_hint_source = reverse_geocode_cache.lookup(
+            current_app._get_current_object(), lat, lng, get_geocoding_client()
+        )
+        location_hint = location_hint or ""
 
     diagnostics = {
-        "raw_candidates": len(raw_results),
+        "raw_candidates": 0,
         "within_radius": 0,
         "after_category": 0,
         "after_budget": 0,
         "missing_menu": 0,
+        "pending_menu": 0,
+        "location_hint_source": location_hint_source,
+    }
+    filters_applied = {
+        "radius": radius,
+        "budget": budget,
+        "budget_type": budget_type if budget is not None else None,
+        "categories": categories,
+    }
+    search_kwargs = {
+        "query": query,
+        "latitude": lat,
+        "longitude": lng,
+        "display": Config.MAX_SEARCH_RESULTS,
+        "location_hint": location_hint,
+        "categories": categories,
+        "diagnostics": diagnostics,
     }
 
-    results = []
-    for item in raw_results:
-        item_lat = item.get("latitude")
-        item_lng = item.get("longitude")
-
-        # Radius filtering is strict: unknown coordinates are excluded.
-        if item_lat is None or item_lng is None:
-            continue
+    if stream_format:
+        return _stream_search(
+            naver_client,
+            search_kwargs,
+            stream_format,
+            lat,
+            lng,
+            radius,
+            categories,
+            budget,
+            budget_type,
+            defer_menus,
+            diagnostics,
+            filters_applied,
+        )
 
-        distance = haversine_distance(lat, lng, item_lat, item_lng)
-        if distance > radius:
-            continue
+    raw_results = naver_client.search_local(radius=radius, **search_kwargs)
+    diagnostics["raw_candidates"] = len(raw_results)
 
-        item["distance"] = int(distance)
-        diagnostics["within_radius"] += 1
+    candidates = [
+        item
+        for item in raw_results
+        if _accept_candidate(item, lat, lng, radius, categories, diagnostics)
+    ]
+    results, pending, pending_jobs = _resolve_candidates(
+        candidates, budget, budget_type, defer_menus, diagnostics
+    )
 
-        if not _matches_categories(item, categories):
-            continue
-        diagnostics["after_category"] += 1
+    results.sort(key=lambda row: row.get("distance", 999999))
 
-        restaurant = get_or_create_restaurant(item)
+    _log_search_diagnostics(query, radius, budget, categories, diagnostics)
 
-        should_crawl_menus = budget is not None
-        menus = menu_service.get_menus(
-            restaurant,
-            item.get("link"),
-            allow_crawl=should_crawl_menus,
+    payload = {
+        "results": results,
+        "total": len(results),
+        "count": len(results),
+        "filters_applied": filters_applied,
+        "diagnostics": diagnostics,
+    }
+    if defer_menus:
+        pending.sort(key=lambda row: row.get("distance", 999999))
+        payload["pending"] = pending
+        payload["search_token"] = _submit_pending_jobs(pending_jobs)
+
+    return jsonify(payload), 200
+
+
+def _stream_search(
+    naver_client: NaverMapClient,
+    search_kwargs: dict,
+    stream_format: str,
+    lat: float,
+    lng: float,
+    radius: int,
+    categories: List[str],
+    budget,
+    budget_type: str,
+    defer_menus: bool,
+    diagnostics: dict,
+    filters_applied: dict,
+) -> Response:
+    """
+    Stream search results as NDJSON or server-sent events.
+
+    Each candidate is filtered as soon as its coordinates are known, so rows come
+    out in arrival order rather than sorted by distance. Accepted candidates are
+    resolved in batches of up to _STREAM_BATCH_SIZE, flushed early once the
+    oldest has waited _STREAM_BATCH_SECONDS. A final "summary" record carries
+    the count, filters and diagnostics.
+    """
+
+    def generate():
+        count = 0
+        pending_jobs = []
+        batch = []
+        batch_started_at = 0.0
+
+        def flush():
+            nonlocal count
+            candidates = list(batch)
+            batch.clear()
+            results, pending, jobs = _resolve_candidates(
+                candidates, budget, budget_type, defer_menus, diagnostics
+            )
+            pending_jobs.extend(jobs)
+            records = []
+            for row in results:
+                count += 1
+                records.append(_encode_stream_record(stream_format, "result", row))
+            for row in pending:
+                records.append(_encode_stream_record(stream_format, "pending", row))
+            return records
+
+        for _, item in naver_client.iter_search_local(radius=radius, **search_kwargs):
+            diagnostics["raw_candidates"] += 1
+            if _accept_candidate(item, lat, lng, radius, categories, diagnostics):
+                if not batch:
+                    batch_started_at = time.monotonic()
+                batch.append(item)
+
+            if batch and (
+                len(batch) >= _STREAM_BATCH_SIZE
+                or time.monotonic() - batch_started_at >= _STREAM_BATCH_SECONDS
+            ):
+                yield from flush()
+
+        if batch:
+            yield from flush()
+
+        _log_search_diagnostics(
+            search_kwargs["query"], radius, budget, categories, diagnostics
         )
 
+        summary = {
+            "total": count,
+            "count": count,
+            "filters_applied": filters_applied,
+            "diagnostics": diagnostics,
+        }
+        if defer_menus:
+            summary["search_token"] = _submit_pending_jobs(pending_jobs)
+        yield _encode_stream_record(stream_format, "summary", summary)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=_STREAM_FORMATS[stream_format],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _encode_stream_record(stream_format: str, record_type: str, data: dict) -> str:
+    if stream_format == "sse":
+        return f"event: {record_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    return json.dumps({"type": record_type, "data": data}, ensure_ascii=False) + "\n"
+
+
+def _requested_stream_format(data: dict):
+    value = data.get("stream")
+    if value is True:
+        return "ndjson"
+    if isinstance(value, str) and value.strip():
+        return value.strip().lower()
+
+    accepted = request.accept_mimetypes
+    for stream_format, mimetype in _STREAM_FORMATS.items():
+        if accepted.best == mimetype:
+            return stream_format
+    return None
+
+
+def _accept_candidate(
+    item: dict,
+    lat: float,
+    lng: float,
+    radius: int,
+    categories: List[str],
+    diagnostics: dict,
+) -> bool:
+    """
+    Apply the radius and category filters to one raw search item.
+
+    Candidates come from the upstream search rather than the restaurants
+    table, so the restaurant index has nothing to answer here.
+    """
+    item_lat = item.get("latitude")
+    item_lng = item.get("longitude")
+
+    # Radius filtering is strict: unknown coordinates are excluded.
+    if item_lat is None or item_lng is None:
+        return False
+
+    distance = haversine_distance(lat, lng, item_lat, item_lng)
+    if distance > radius:
+        return False
+
+    item["distance"] = int(distance)
+    diagnostics["within_radius"] += 1
+
+    if not _matches_categories(item, categories):
+        return False
+    diagnostics["after_category"] += 1
+    return True
+
+
+def _resolve_candidates(
+    candidates: List[dict],
+    budget,
+    budget_type: str,
+    defer_menus: bool,
+    diagnostics: dict,
+):
+    """
+    Attach restaurants and menus to filtered candidates and apply the budget.
+
+    Returns (results, pending, pending_jobs).
+    """
+    created_ids: List[int] = []
+    restaurants_by_place_id = get_or_create_restaurants(candidates, created=created_ids)
+    marker_clusters.mark_restaurant_ids(created_ids)
+    matched = [
+        (item, restaurants_by_place_id[_build_place_id(item)])
+        for item in candidates
+        if _build_place_id(item) in restaurants_by_place_id
+    ]
+
+    if budget is not None:
+        # Skip loading menus for restaurants whose cached prices are already over budget.
+        now = datetime.now(timezone.utc)
+        matched = [
+            (item, restaurant)
+            for item, restaurant in matched
+            if not _known_over_budget(restaurant, budget, budget_type, now)
+        ]
+
+    # Deferred mode answers from cached menus now and crawls the rest in the background.
+    should_crawl_menus = budget is not None and not defer_menus
+    menus_by_restaurant_id = menu_service.get_menus_bulk(
+        [restaurant for _, restaurant in matched],
+        naver_links={restaurant.id: item.get("link") for item, restaurant in matched},
+        allow_crawl=should_crawl_menus,
+    )
+
+    results = []
+    pending = []
+    pending_jobs = []
+    for item, restaurant in matched:
+        menus = menus_by_restaurant_id.get(restaurant.id) or []
+
         if budget is not None:
-            if not menus:
-                diagnostics["missing_menu"] += 1
+            if not menus and defer_menus:
+                diagnostics["pending_menu"] += 1
+                pending.append(_build_search_result(item, restaurant, [], menu_status="pending"))
+                pending_jobs.append(
+                    {
+                        "restaurant_id": restaurant.id,
+                        "item": dict(item),
+                        "budget": budget,
+                        "budget_type": budget_type,
+                    }
+                )
                 continue
 
-            if budget_type == "average":
-                prices = [menu.price for menu in menus if menu.price is not None]
-                if not prices:
-                    diagnostics["missing_menu"] += 1
-                    continue
-                average_price = sum(prices) / len(prices)
-                if average_price > budget:
-                    continue
-            else:
-                has_affordable = any(
-                    menu.price is not None and menu.price <= budget for menu in menus
-                )
-                if not has_affordable:
-                    continue
+            verdict = _evaluate_budget(menus, budget, budget_type)
+            if verdict == "missing":
+                diagnostics["missing_menu"] += 1
+                continue
+            if verdict == "over":
+                continue
 
         diagnostics["after_budget"] += 1
-
-        representative_menus = [
-            {"name": normalize_menu_name(menu.name), "price": menu.price}
-            for menu in menus
-            if menu.is_representative
-        ][:2]
-
-        if not representative_menus and menus:
-            priced_menus = sorted(
-                [menu for menu in menus if menu.price is not None],
-                key=lambda menu: menu.price,
-            )
-            representative_menus = [
-                {"name": normalize_menu_name(menu.name), "price": menu.price}
-                for menu in priced_menus[:2]
-            ]
-
         results.append(
-            {
-                "place_id": restaurant.place_id,
-                "name": item.get("title", restaurant.name),
-                "title": item.get("title", restaurant.name),
-                "category": item.get("category", ""),
-                "address": item.get("address", ""),
-                "road_address": item.get("road_address", ""),
-                "latitude": item_lat,
-                "longitude": item_lng,
-                "distance": item.get("distance"),
-                "phone": item.get("telephone", ""),
-                "rating": restaurant.rating,
-                "representative_menus": representative_menus,
-                "link": item.get("link", ""),
-            }
+            _build_search_result(
+                item,
+                restaurant,
+                menus,
+                menu_status="ready" if defer_menus else None,
+            )
         )
 
-    results.sort(key=lambda row: row.get("distance", 999999))
+    return results, pending, pending_jobs
 
+
+def _submit_pending_jobs(pending_jobs: List[dict]):
+    if not pending_jobs:
+        return None
+
+    return pending_searches.submit(
+        current_app._get_current_object(),
+        pending_jobs,
+        _resolve_pending_candidate,
+    )
+
+
+def _log_search_diagnostics(query, radius, budget, categories, diagnostics):
     logger.warning(
         "Search diagnostics: query=%s radius=%s budget=%s categories=%s raw=%s within_radius=%s after_category=%s after_budget=%s missing_menu=%s",
         query,
@@ -317,47 +492,212 @@ def search_restaurants():
         diagnostics["missing_menu"],
     )
 
-    return jsonify(
-        {
-            "results": results,
-            "total": len(results),
-            "count": len(results),
-            "filters_applied": {
-                "radius": radius,
-                "budget": budget,
-                "budget_type": budget_type if budget is not None else None,
-                "categories": categories,
-            },
-            "diagnostics": diagnostics,
-        }
-    ), 200
 
+@restaurant_bp.route("/restaurants/search/<search_token>", methods=["GET"])
+def poll_search(search_token):
+    since = request.args.get("since", default=0, type=int)
+    status = pending_searches.poll(search_token, since=since)
+    if status is None:
+        return jsonify({"error": "Search token not found or expired"}), 404
 
-def get_or_create_restaurant(item: dict) -> Restaurant:
-    place_id = _build_place_id(item)
+    status["search_token"] = search_token
+    return jsonify(status), 200
 
-    restaurant = Restaurant.query.filter_by(place_id=place_id).first()
-    if restaurant:
-        return restaurant
-
-    restaurant = Restaurant(
-        place_id=place_id,
-        name=item.get("title") or "Unknown",
-        category=item.get("category", ""),
-        address=item.get("address", ""),
-        road_address=item.get("road_address", ""),
-        latitude=item.get("latitude") or 0.0,
-        longitude=item.get("longitude") or 0.0,
-        phone=item.get("telephone", ""),
+
+def _evaluate_budget(menus: list, budget: int, budget_type: str) -> str:
+    """Return 'ok', 'over' or 'missing' for a budget check against menus."""
+    if not menus:
+        return "missing"
+
+    if budget_type == "average":
+        prices = [menu.price for menu in menus if menu.price is not None]
+        if not prices:
+            return "missing"
+        average_price = sum(prices) / len(prices)
+        return "ok" if average_price <= budget else "over"
+
+    has_affordable = any(menu.price is not None and menu.price <= budget for menu in menus)
+    return "ok" if has_affordable else "over"
+
+
+def _budget_predicate(budget: int, budget_type: str, now: datetime):
+    """
+    SQL form of _evaluate_budget over the denormalized price columns.
+
+    Prices only exclude a restaurant while its menus are still fresh; stale
+    ones are kept so their menus get re-checked. NULL prices never match.
+    """
+    price = Restaurant.avg_price if budget_type == "average" else Restaurant.min_price
+    return or_(
+        price <= budget,
+        and_(price.isnot(None), Restaurant.menus_fresh_until <= now),
     )
-    db.session.add(restaurant)
+
+
+def _known_over_budget(restaurant: Restaurant, budget: int, budget_type: str, now: datetime) -> bool:
+    """
+    True when the stored price stats already prove a menu-budget miss.
+
+    The stats cover every stored menu, a superset of the fresh ones the budget
+    check reads, so a cheapest price above the budget means "over" for sure.
+    Averages over that superset prove nothing, so they are not used here.
+    """
+    if budget_type == "average" or not restaurant.priced_menu_count:
+        return False
+    if restaurant.min_price is None or restaurant.menus_fresh_until is None:
+        return False
+
+    fresh_until = restaurant.menus_fresh_until
+    if fresh_until.tzinfo is None:
+        fresh_until = fresh_until.replace(tzinfo=timezone.utc)
+    return fresh_until > now and restaurant.min_price > budget
+
+
+def _representative_menus(menus: list) -> list:
+    representative_menus = [
+        {"name": normalize_menu_name(menu.name), "price": menu.price}
+        for menu in menus
+        if menu.is_representative
+    ][:2]
+
+    if not representative_menus and menus:
+        priced_menus = sorted(
+            [menu for menu in menus if menu.price is not None],
+            key=lambda menu: menu.price,
+        )
+        representative_menus = [
+            {"name": normalize_menu_name(menu.name), "price": menu.price}
+            for menu in priced_menus[:2]
+        ]
+
+    return representative_menus
+
+
+def _build_search_result(item: dict, restaurant: Restaurant, menus: list, menu_status: str = None) -> dict:
+    row = {
+        "place_id": restaurant.place_id,
+        "name": item.get("title", restaurant.name),
+        "title": item.get("title", restaurant.name),
+        "category": item.get("category", ""),
+        "address": item.get("address", ""),
+        "road_address": item.get("road_address", ""),
+        "latitude": item.get("latitude"),
+        "longitude": item.get("longitude"),
+        "distance": item.get("distance"),
+        "phone": item.get("telephone", ""),
+        "rating": restaurant.rating,
+        "representative_menus": _representative_menus(menus),
+        "link": item.get("link", ""),
+    }
+    if menu_status:
+        row["menu_status"] = menu_status
+    return row
+
+
+def _resolve_pending_candidate(job: dict):
+    """Crawl menus for a deferred candidate; return its result row if it fits the budget."""
+    restaurant = db.session.get(Restaurant, job["restaurant_id"])
+    if restaurant is None:
+        return None
+
+    item = job["item"]
+    menus = menu_service.get_menus_bulk(
+        [restaurant],
+        naver_links={restaurant.id: item.get("link")},
+        allow_crawl=True,
+    ).get(restaurant.id)
+
+    if _evaluate_budget(menus, job["budget"], job["budget_type"]) != "ok":
+        return None
+
+    return _build_search_result(item, restaurant, menus, menu_status="ready")
+
+
+def get_or_create_restaurant(item: dict) -> Restaurant:
+    return get_or_create_restaurants([item]).get(_build_place_id(item))
+
+
+def _restaurant_row(place_id: str, item: dict) -> dict:
+    return {
+        "place_id": place_id,
+        "name": item.get("title") or "Unknown",
+        "category": item.get("category", ""),
+        "address": item.get("address", ""),
+        "road_address": item.get("road_address", ""),
+        "latitude": item.get("latitude") or 0.0,
+        "longitude": item.get("longitude") or 0.0,
+        "phone": item.get("telephone", ""),
+    }
+
+
+def _insert_missing_restaurants(rows: List[dict]):
+    dialect = db.engine.dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        dialect_insert = None
+
+    if dialect_insert is not None:
+        # Concurrent searches may insert the same place; the loser simply skips it.
+        statement = (
+            dialect_insert(Restaurant.__table__)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["place_id"])
+        )
+        db.session.execute(statement)
+        return
+
+    for row in rows:
+        try:
+            with db.session.begin_nested():
+                db.session.add(Restaurant(**row))
+        except IntegrityError:
+            continue
+
+
+def get_or_create_restaurants(items: List[dict], created: List[int] = None) -> Dict[str, Restaurant]:
+    """
+    Return restaurants for search items keyed by place id, creating missing rows.
+
+    Costs one lookup query when every place is known, otherwise one insert,
+    one commit and one re-select for the whole batch. Ids of newly inserted
+    rows are appended to `created` when given.
+    """
+    items_by_place_id: Dict[str, dict] = {}
+    for item in items:
+        items_by_place_id.setdefault(_build_place_id(item), item)
+    if not items_by_place_id:
+        return {}
+
+    place_ids = list(items_by_place_id)
+    restaurants = {
+        row.place_id: row
+        for row in Restaurant.query.filter(Restaurant.place_id.in_(place_ids)).all()
+    }
+
+    missing = [place_id for place_id in place_ids if place_id not in restaurants]
+    if not missing:
+        return restaurants
 
     try:
+        _insert_missing_restaurants(
+            [_restaurant_row(place_id, items_by_place_id[place_id]) for place_id in missing]
+        )
         db.session.commit()
-        return restaurant
-    except Exception:
+    except Exception as exc:
         db.session.rollback()
-        return Restaurant.query.filter_by(place_id=place_id).first()
+        logger.error("Failed to create restaurants: %s", exc)
+
+    # Re-select everything so rows loaded before the commit are not expired.
+    restaurants = {
+        row.place_id: row
+        for row in Restaurant.query.filter(Restaurant.place_id.in_(place_ids)).all()
+    }
+    if created is not None:
+        created.extend(restaurants[place_id].id for place_id in missing if place_id in restaurants)
+    return restaurants
 
 
 @restaurant_bp.route("/restaurants/<place_id>", methods=["GET"])
@@ -423,6 +763,7 @@ def update_delivery_info(place_id):
 
     try:
         restaurant = Restaurant.query.filter_by(place_id=place_id).first()
+        previous_points = [] if restaurant is None else [(restaurant.latitude, restaurant.longitude)]
 
         if not restaurant:
             restaurant = Restaurant(
@@ -441,6 +782,7 @@ def update_delivery_info(place_id):
             restaurant.minimum_order = data["minimum_order"]
 
         db.session.commit()
+        marker_clusters.mark_restaurant_ids([restaurant.id], previous_points=previous_points)
         return jsonify(restaurant.to_dict()), 200
 
     except Exception as exc:
@@ -461,34 +803,94 @@ def nearby_restaurants():
     radius = max(Config.MIN_SEARCH_RADIUS, min(radius, Config.MAX_SEARCH_RADIUS))
 
     max_delivery_fee = request.args.get("max_delivery_fee", type=int)
-
-    query = Restaurant.query
-    if max_delivery_fee is not None:
-        query = query.filter(
-            Restaurant.delivery_fee.isnot(None),
-            Restaurant.delivery_fee <= max_delivery_fee,
+    budget = request.args.get("budget", type=int)
+    budget_type = request.args.get("budget_type", default="menu")
+
+    restaurant_index = current_app.extensions.get(RESTAURANT_INDEX_KEY)
+    if restaurant_index is not None:
+        restaurant_index.refresh()
+        matches = restaurant_index.restaurants(
+            restaurant_index.query(
+                lat,
+                lng,
+                radius,
+                max_delivery_fee=max_delivery_fee,
+                budget=budget,
+                budget_type=budget_type,
+            )
         )
+    else:
+        query = Restaurant.query
+        if max_delivery_fee is not None:
+            query = query.filter(
+                Restaurant.delivery_fee.isnot(None),
+                Restaurant.delivery_fee <= max_delivery_fee,
+            )
+        if budget is not None:
+            query = query.filter(_budget_predicate(budget, budget_type, datetime.now(timezone.utc)))
+        matches = spatial_index.nearby(lat, lng, radius, query=query)
 
     rows = []
-    for restaurant in query.all():
-        if restaurant.latitude is None or restaurant.longitude is None:
-            continue
-
-        distance = haversine_distance(lat, lng, restaurant.latitude, restaurant.longitude)
-        if distance > radius:
-            continue
-
+    for restaurant, distance in matches:
         payload = restaurant.to_dict()
         payload["distance"] = int(distance)
         rows.append(payload)
 
-    rows.sort(key=lambda row: row.get("distance", 999999))
-
     return jsonify(
         {
             "results": rows,
             "count": len(rows),
             "radius": radius,
             "max_delivery_fee": max_delivery_fee,
+            "budget": budget,
+            "budget_type": budget_type if budget is not None else None,
         }
     ), 200
+
+
+@restaurant_bp.route("/tiles/<int:z>/<int:x>/<int:y>", methods=["GET"])
+def map_tile(z, x, y):
+    """
+    Stored restaurants for one slippy-map tile.
+
+    Up to the cluster zoom the tile holds grid clusters, re-aggregated first
+    where writes marked them dirty; above it, at most MAX_TILE_RESTAURANTS
+    restaurants, with "truncated" set when the tile holds more. Tile URLs are
+    stable, so responses carry an ETag and Cache-Control for HTTP caches in
+    front of the app.
+    """
+    if not is_valid_tile(z, x, y, Config.MAX_TILE_ZOOM):
+        return jsonify({"error": "Invalid tile coordinates"}), 400
+
+    payload = {"z": z, "x": x, "y": y}
+    if z <= marker_clusters.max_cluster_zoom:
+        marker_clusters.flush_dirty()
+        payload["type"] = "clusters"
+        payload["clusters"] = marker_clusters.clusters_for_tile(z, x, y)
+    else:
+        south, north, west, east = tile_bounds(z, x, y)
+        query = spatial_index.filter_bounds(Restaurant.query, south, north, west, east)
+        limit = Config.MAX_TILE_RESTAURANTS
+        restaurants = [
+            {
+                "id": restaurant.id,
+                "place_id": restaurant.place_id,
+                "name": restaurant.name,
+                "category": restaurant.category,
+                "latitude": restaurant.latitude,
+                "longitude": restaurant.longitude,
+                "delivery_fee": restaurant.delivery_fee,
+            }
+            for restaurant in query.order_by(Restaurant.id).limit(limit + 1).all()
+            # R*Tree boxes are stored as float32; drop rows just outside the tile.
+            if south <= restaurant.latitude <= north and west <= restaurant.longitude <= east
+        ]
+        payload["type"] = "restaurants"
+        payload["restaurants"] = restaurants[:limit]
+        payload["truncated"] = len(restaurants) > limit
+
+    response = jsonify(payload)
+    response.cache_control.public = True
+    response.cache_control.max_age = Config.TILE_CACHE_SECONDS
+    response.add_etag()
+    return response.make_conditional(request)
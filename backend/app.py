@@ -4,7 +4,7 @@ from flask import Flask, jsonify
 from flask_cors import CORS
 
 from config import Config
-from database import db, ensure_sqlite_schema_compatibility, init_db
+from database import db, ensure_sqlite_schema_compatibility, ensure_sqlite_spatial_index, init_db
 
 
 def create_app(config_override=None):
@@ -19,9 +19,11 @@ def create_app(config_override=None):
 
     init_db(app)
 
+    from api.clients import init_upstream_clients
     from api.restaurant import restaurant_bp
 
     app.register_blueprint(restaurant_bp, url_prefix="/api")
+    init_upstream_clients(app)
 
     # Ensure all models are imported before create_all.
     with app.app_context():
@@ -29,14 +31,33 @@ def create_app(config_override=None):
 
         db.create_all()
         ensure_sqlite_schema_compatibility()
+        ensure_sqlite_spatial_index()
+
         try:
             from services.menu_service import MenuService
 
-            repaired = MenuService().repair_recent_menu_names(limit=5000)
+            menu_service = MenuService()
+            repaired = menu_service.repair_recent_menu_names(limit=5000)
             if repaired:
                 app.logger.warning("Repaired %s mojibake menu names on startup", repaired)
+            backfilled = menu_service.backfill_price_stats(limit=5000)
+            if backfilled:
+                app.logger.info("Backfilled menu price stats for %s restaurants", backfilled)
+        except Exception as exc:
+            app.logger.warning("Startup menu maintenance skipped: %s", exc)
+
+        from services.restaurant_index_service import init_restaurant_index
+
+        init_restaurant_index(app)
+        try:
+            from services.marker_cluster_service import MarkerClusterService
+
+            built = MarkerClusterService().rebuild_if_empty()
+            if built:
+                app.logger.info("Built %s map tile clusters on startup", built)
         except Exception as exc:
-            app.logger.warning("Startup menu-name repair skipped: %s", exc)
+            db.session.rollback()
+            app.logger.warning("Startup marker-cluster build skipped: %s", exc)
 
     @app.route("/api/health")
     def health():
@@ -64,6 +85,12 @@ def create_app(config_override=None):
                 }
             )
 
+        @app.route("/api/debug/upstream")
+        def debug_upstream():
+            from api.clients import upstream_pool_stats
+
+            return jsonify(upstream_pool_stats())
+
     return app
 
 
@@ -53,3 +53,41 @@ class Config:
     DEFAULT_SEARCH_RADIUS = 1000
     MAX_SEARCH_RADIUS = 5000
     MAX_SEARCH_RESULTS = int(os.getenv("MAX_SEARCH_RESULTS", "60"))
+
+    # Reverse-geocode cache cell size and lifetime (used to derive location_hint).
+    REVERSE_GEOCODE_CELL_METERS = float(os.getenv("REVERSE_GEOCODE_CELL_METERS", "100"))
+    REVERSE_GEOCODE_TTL_HOURS = float(os.getenv("REVERSE_GEOCODE_TTL_HOURS", "168"))
+
+    # Optional SQLite file that shares upstream rate limits across worker processes.
+    RATE_LIMIT_DB_PATH = os.getenv("RATE_LIMIT_DB_PATH")
+
+    # Call types that send a hedged backup request when the primary is slow:
+    # any of local_search, geocode, reverse_geocode (comma separated).
+    UPSTREAM_HEDGING = [
+        name.strip() for name in os.getenv("UPSTREAM_HEDGING", "").split(",") if name.strip()
+    ]
+    # Run local search and geocoding calls on one asyncio event loop instead of
+    # worker threads (per-host concurrency is capped by UPSTREAM_ASYNC_HOST_LIMIT).
+    UPSTREAM_ASYNC_ENGINE = os.getenv("UPSTREAM_ASYNC_ENGINE", "0").strip().lower() in {
+        "1",
+        "true",
+        "yes",
+        "on",
+    }
+    UPSTREAM_ASYNC_HOST_LIMIT = int(os.getenv("UPSTREAM_ASYNC_HOST_LIMIT", "32"))
+
+    # In-process NumPy index for /nearby (needs numpy). With a path, the arrays
+    # are saved there and later workers map that copy instead of reloading.
+    RESTAURANT_INDEX = os.getenv("RESTAURANT_INDEX", "0").strip().lower() in {
+        "1",
+        "true",
+        "yes",
+        "on",
+    }
+    RESTAURANT_INDEX_PATH = os.getenv("RESTAURANT_INDEX_PATH")
+    RESTAURANT_INDEX_REFRESH_SECONDS = float(os.getenv("RESTAURANT_INDEX_REFRESH_SECONDS", "5"))
+
+    # /api/tiles: zoom levels above the cluster zoom return individual restaurants.
+    MAX_TILE_ZOOM = 20
+    MAX_TILE_RESTAURANTS = int(os.getenv("MAX_TILE_RESTAURANTS", "500"))
+    TILE_CACHE_SECONDS = int(os.getenv("TILE_CACHE_SECONDS", "60"))
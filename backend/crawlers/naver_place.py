@@ -1,11 +1,16 @@
 import json
 import logging
 import re
+import threading
 import time
+from contextlib import contextmanager
 from html import unescape
-from urllib.parse import quote
+from urllib.parse import quote, urlsplit
 
 import requests
+from utils.latency import AdaptiveTimeouts
+from utils.rate_limiter import acquire_for_host
+from utils.retry import RetryPolicy
 from utils.text_normalizer import normalize_menu_name
 
 logger = logging.getLogger(__name__)
@@ -42,10 +47,60 @@ class NaverPlaceCrawler:
         "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
     }
 
-    def __init__(self, delay: float = 0.4):
+    # Concurrent requests allowed per host when crawls run on a worker pool.
+    MAX_CONCURRENCY_PER_HOST = 2
+    TIMEOUT_SECONDS = 10
+    # (default, floor, ceiling) seconds for the adaptive per-host timeout.
+    TIMEOUT_BOUNDS = (TIMEOUT_SECONDS, 2.0, TIMEOUT_SECONDS)
+
+    def __init__(
+        self,
+        delay: float = 0.4,
+        max_concurrency_per_host: int = None,
+        rate_limit: bool = True,
+    ):
         self.delay = delay
+        self.rate_limit = rate_limit
+        self.max_concurrency_per_host = max_concurrency_per_host or self.MAX_CONCURRENCY_PER_HOST
         self.session = requests.Session()
         self.session.headers.update(self.HEADERS)
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+        self.timeouts = AdaptiveTimeouts(default_bounds=self.TIMEOUT_BOUNDS)
+        self.retry_policy = RetryPolicy()
+
+    @contextmanager
+    def _host_slot(self, url: str):
+        host = urlsplit(url).netloc
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.max_concurrency_per_host)
+                self._host_slots[host] = slot
+
+        with slot:
+            yield
+
+    def _get(self, url: str, delay: float):
+        # The politeness delay and retry backoff are taken inside the slot so
+        # they throttle per host.
+        host = urlsplit(url).hostname
+        with self._host_slot(url):
+            time.sleep(delay)
+            return self.retry_policy.run(lambda: self._send(url, host))
+
+    def _send(self, url: str, host: str):
+        if self.rate_limit:
+            acquire_for_host(host)
+        timeout = self.timeouts.timeout_for(host)
+        started_at = time.monotonic()
+        try:
+            response = self.session.get(url, timeout=timeout)
+        except requests.exceptions.Timeout:
+            self.timeouts.observe_timeout(host, timeout)
+            raise
+        self.timeouts.observe(host, time.monotonic() - started_at)
+        return response
 
     def get_menus(self, place_id: str) -> list:
         """
@@ -64,8 +119,7 @@ class NaverPlaceCrawler:
 
         for url in urls:
             try:
-                time.sleep(self.delay)
-                response = self.session.get(url, timeout=10)
+                response = self._get(url, self.delay)
                 if response.status_code != 200:
                     logger.warning("Naver Place returned %s for %s", response.status_code, place_id)
                     continue
@@ -89,8 +143,7 @@ class NaverPlaceCrawler:
             for template in self.SEARCH_URL_TEMPLATES:
                 url = template.format(query=encoded)
                 try:
-                    time.sleep(self.delay / 2)
-                    response = self.session.get(url, timeout=10)
+                    response = self._get(url, self.delay / 2)
                     if response.status_code != 200:
                         continue
 
@@ -2,6 +2,7 @@ import logging
 
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError
 
 db = SQLAlchemy()
 logger = logging.getLogger(__name__)
@@ -11,9 +12,67 @@ _LEGACY_SQLITE_COLUMNS = {
     "restaurants": {
         "road_address": "VARCHAR(300)",
         "review_count": "INTEGER",
+        "min_price": "INTEGER",
+        "avg_price": "FLOAT",
+        "max_price": "INTEGER",
+        "priced_menu_count": "INTEGER",
+        "menus_fresh_until": "DATETIME",
     }
 }
 
+# Indexes on legacy columns; create_all only indexes tables it creates.
+_LEGACY_SQLITE_INDEXES = {
+    "restaurants": {
+        "ix_restaurants_lat_lng": ("latitude", "longitude"),
+        "ix_restaurants_min_price": ("min_price",),
+        "ix_restaurants_avg_price": ("avg_price",),
+        "ix_restaurants_max_price": ("max_price",),
+        "ix_restaurants_menus_fresh_until": ("menus_fresh_until",),
+    }
+}
+
+
+# SQLite R*Tree over restaurant coordinates, kept in sync by triggers.
+RESTAURANT_RTREE_TABLE = "restaurants_rtree"
+
+_RESTAURANT_RTREE_STATEMENTS = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {RESTAURANT_RTREE_TABLE}
+    USING rtree(id, min_lat, max_lat, min_lng, max_lng)
+    """,
+    # Triggers are recreated on every start so existing databases pick up
+    # changes to their bodies.
+    "DROP TRIGGER IF EXISTS restaurants_rtree_insert",
+    "DROP TRIGGER IF EXISTS restaurants_rtree_update",
+    # R*Tree stores NULL as 0, so rows without coordinates must stay out of it.
+    f"""
+    CREATE TRIGGER restaurants_rtree_insert
+    AFTER INSERT ON restaurants
+    WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL
+    BEGIN
+        INSERT OR REPLACE INTO {RESTAURANT_RTREE_TABLE}
+        VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+    END
+    """,
+    f"""
+    CREATE TRIGGER restaurants_rtree_update
+    AFTER UPDATE OF id, latitude, longitude ON restaurants
+    BEGIN
+        DELETE FROM {RESTAURANT_RTREE_TABLE} WHERE id = old.id;
+        INSERT OR REPLACE INTO {RESTAURANT_RTREE_TABLE}
+        SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude
+        WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS restaurants_rtree_delete
+    AFTER DELETE ON restaurants
+    BEGIN
+        DELETE FROM {RESTAURANT_RTREE_TABLE} WHERE id = old.id;
+    END
+    """,
+)
+
 
 def init_db(app):
     """Initialize SQLAlchemy for the Flask app."""
@@ -54,3 +113,67 @@ def ensure_sqlite_schema_compatibility():
                     column_name,
                     column_type,
                 )
+
+        for table_name, indexes in _LEGACY_SQLITE_INDEXES.items():
+            if table_name not in table_names:
+                continue
+
+            for index_name, columns in indexes.items():
+                connection.execute(
+                    text(
+                        f"CREATE INDEX IF NOT EXISTS {index_name} "
+                        f"ON {table_name} ({', '.join(columns)})"
+                    )
+                )
+
+
+def ensure_sqlite_spatial_index():
+    """
+    Create the restaurant R*Tree and its sync triggers on SQLite.
+
+    Existing rows with coordinates are backfilled the first time the index is
+    created; rows without them are never indexed. SQLite
+    builds without the rtree module keep working on the plain lat/lng index.
+    """
+    engine = db.engine
+    if engine.dialect.name != "sqlite":
+        return
+
+    if "restaurants" not in set(inspect(engine).get_table_names()):
+        return
+
+    try:
+        with engine.begin() as connection:
+            exists = connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": RESTAURANT_RTREE_TABLE},
+            ).first()
+            for statement in _RESTAURANT_RTREE_STATEMENTS:
+                connection.execute(text(statement))
+            if not exists:
+                connection.execute(
+                    text(
+                        f"""
+                        INSERT INTO {RESTAURANT_RTREE_TABLE}
+                        SELECT id, latitude, latitude, longitude, longitude
+                        FROM restaurants
+                        WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+                        """
+                    )
+                )
+                logger.info("Created SQLite spatial index: %s", RESTAURANT_RTREE_TABLE)
+            else:
+                # Older triggers indexed rows without coordinates at (0, 0).
+                connection.execute(
+                    text(
+                        f"""
+                        DELETE FROM {RESTAURANT_RTREE_TABLE}
+                        WHERE id IN (
+                            SELECT id FROM restaurants
+                            WHERE latitude IS NULL OR longitude IS NULL
+                        )
+                        """
+                    )
+                )
+    except OperationalError as exc:
+        logger.warning("SQLite spatial index unavailable: %s", exc)
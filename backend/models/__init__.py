@@ -1,5 +1,10 @@
 from models.restaurant import Restaurant
 from models.menu import Menu
 from models.user_contribution import UserMenuContribution
+from models.geocode_cache import GeocodeCache
+from models.query_variant_stat import QueryVariantStat
+from models.reverse_geocode_cache import ReverseGeocodeCache
+from models.marker_cluster import MarkerCluster
+from models.marker_cluster_dirty_cell import MarkerClusterDirtyCell
 
-__all__ = ['Restaurant', 'Menu', 'UserMenuContribution']
+__all__ = ['Restaurant', 'Menu', 'UserMenuContribution', 'GeocodeCache', 'QueryVariantStat', 'ReverseGeocodeCache', 'MarkerCluster', 'MarkerClusterDirtyCell']
@@ -0,0 +1,34 @@
+from datetime import datetime, timezone
+from database import db
+
+
+class GeocodeCache(db.Model):
+    """주소 -> 좌표 변환 결과 캐시 (실패 결과 포함)"""
+    __tablename__ = 'geocode_cache'
+
+    id = db.Column(db.Integer, primary_key=True)
+    address_key = db.Column(db.String(64), unique=True, nullable=False, index=True)
+    address = db.Column(db.String(300), nullable=False)  # 정규화된 주소
+    found = db.Column(db.Boolean, nullable=False, default=True)
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+    resolved_address = db.Column(db.String(300))
+    source = db.Column(db.String(20))  # 'naver', 'nominatim'
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    def to_coord(self):
+        """좌표 딕셔너리로 변환 (캐시된 실패 결과는 None)"""
+        if not self.found:
+            return None
+        return {
+            'address': self.resolved_address or '',
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'source': self.source,
+        }
+
+    def __repr__(self):
+        return f'<GeocodeCache {self.address} found={self.found}>'
@@ -0,0 +1,29 @@
+from datetime import datetime, timezone
+from database import db
+
+
+class MarkerCluster(db.Model):
+    """지도 타일용 격자 클러스터 (줌 레벨별 셀 단위 집계)"""
+    __tablename__ = 'marker_clusters'
+
+    id = db.Column(db.Integer, primary_key=True)
+    zoom = db.Column(db.Integer, nullable=False)
+    cell_x = db.Column(db.Integer, nullable=False)  # 줌 + 2 레벨 타일 좌표 (타일당 4x4 셀)
+    cell_y = db.Column(db.Integer, nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    latitude_sum = db.Column(db.Float, nullable=False, default=0.0)
+    longitude_sum = db.Column(db.Float, nullable=False, default=0.0)
+    priced_count = db.Column(db.Integer, nullable=False, default=0)  # 메뉴 가격이 있는 음식점 수
+    min_price_sum = db.Column(db.Integer, nullable=False, default=0)  # 음식점별 최저 메뉴 가격 합
+    category_counts = db.Column(db.Text, nullable=False, default='{}')  # JSON {카테고리: 개수}
+    price_band_counts = db.Column(db.Text, nullable=False, default='{}')  # JSON {가격대: 개수}
+
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        db.UniqueConstraint('zoom', 'cell_x', 'cell_y', name='uq_marker_cluster_cell'),
+    )
+
+    def __repr__(self):
+        return f'<MarkerCluster z={self.zoom} ({self.cell_x}, {self.cell_y}) count={self.count}>'
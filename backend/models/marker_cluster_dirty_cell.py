@@ -0,0 +1,13 @@
+from database import db
+
+
+class MarkerClusterDirtyCell(db.Model):
+    """재집계가 필요한 최하위 클러스터 셀 (타일 조회 시 일괄 반영)"""
+    __tablename__ = 'marker_cluster_dirty_cells'
+
+    id = db.Column(db.Integer, primary_key=True)
+    cell_x = db.Column(db.Integer, nullable=False)  # 최대 클러스터 줌 + 2 레벨 타일 좌표
+    cell_y = db.Column(db.Integer, nullable=False)
+
+    def __repr__(self):
+        return f'<MarkerClusterDirtyCell ({self.cell_x}, {self.cell_y})>'
@@ -0,0 +1,18 @@
+from datetime import datetime, timezone
+from database import db
+
+
+class QueryVariantStat(db.Model):
+    """검색어 변형(variant) 종류별 누적 호출 수와 신규 결과 수"""
+    __tablename__ = 'query_variant_stats'
+
+    id = db.Column(db.Integer, primary_key=True)
+    variant_kind = db.Column(db.String(50), unique=True, nullable=False, index=True)  # 'hint+query', 'category' 등
+    calls = db.Column(db.Integer, nullable=False, default=0)
+    new_items = db.Column(db.Integer, nullable=False, default=0)
+
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f'<QueryVariantStat {self.variant_kind} {self.new_items}/{self.calls}>'
@@ -24,6 +24,13 @@ class Restaurant(db.Model):
     delivery_fee = db.Column(db.Integer)  # 원 단위
     minimum_order = db.Column(db.Integer)  # 원 단위
 
+    # 메뉴 가격 통계 (MenuService가 메뉴 저장 시 갱신, SQL 예산 필터용)
+    min_price = db.Column(db.Integer, index=True)
+    avg_price = db.Column(db.Float, index=True)
+    max_price = db.Column(db.Integer, index=True)
+    priced_menu_count = db.Column(db.Integer, default=0)
+    menus_fresh_until = db.Column(db.DateTime, index=True)  # 이 시각까지 메뉴 캐시가 유효
+
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
@@ -34,6 +41,9 @@ class Restaurant(db.Model):
         CheckConstraint('rating IS NULL OR (rating >= 0 AND rating <= 5)', name='check_rating_range'),
         CheckConstraint('delivery_fee IS NULL OR delivery_fee >= 0', name='check_delivery_fee_positive'),
         CheckConstraint('minimum_order IS NULL OR minimum_order >= 0', name='check_minimum_order_positive'),
+        CheckConstraint('min_price IS NULL OR min_price >= 0', name='check_min_price_positive'),
+        # 좌표 범위 조회용 (SQLite는 R*Tree를 우선 사용)
+        db.Index('ix_restaurants_lat_lng', 'latitude', 'longitude'),
     )
 
     def to_dict(self):
@@ -53,6 +63,10 @@ class Restaurant(db.Model):
             'delivery_available': self.delivery_available,
             'delivery_fee': self.delivery_fee,
             'minimum_order': self.minimum_order,
+            'min_price': self.min_price,
+            'avg_price': self.avg_price,
+            'max_price': self.max_price,
+            'priced_menu_count': self.priced_menu_count,
         }
 
     def __repr__(self):
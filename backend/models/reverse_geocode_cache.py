@@ -0,0 +1,20 @@
+from datetime import datetime, timezone
+from database import db
+
+
+class ReverseGeocodeCache(db.Model):
+    """격자(셀) 단위 좌표 -> 주소 역지오코딩 결과 캐시"""
+    __tablename__ = 'reverse_geocode_cache'
+
+    id = db.Column(db.Integer, primary_key=True)
+    cell_key = db.Column(db.String(64), unique=True, nullable=False, index=True)  # '<셀 크기>:<행>:<열>'
+    latitude = db.Column(db.Float, nullable=False)  # 최초 조회 좌표
+    longitude = db.Column(db.Float, nullable=False)
+    address = db.Column(db.String(300), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f'<ReverseGeocodeCache {self.cell_key} {self.address}>'
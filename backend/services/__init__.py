@@ -1,3 +1,9 @@
+from services.geocode_cache_service import GeocodeCacheService
+from services.marker_cluster_service import MarkerClusterService
 from services.menu_service import MenuService
+from services.query_variant_stats_service import QueryVariantStatsService
+from services.restaurant_index_service import RestaurantIndexService
+from services.reverse_geocode_cache_service import ReverseGeocodeCacheService
+from services.spatial_index_service import SpatialIndexService
 
-__all__ = ['MenuService']
+__all__ = ['GeocodeCacheService', 'MarkerClusterService', 'MenuService', 'QueryVariantStatsService', 'RestaurantIndexService', 'ReverseGeocodeCacheService', 'SpatialIndexService']
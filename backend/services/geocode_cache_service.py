@@ -0,0 +1,164 @@
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from database import db
+from models.geocode_cache import GeocodeCache
+
+logger = logging.getLogger(__name__)
+
+# Columns an upsert overwrites when the address is already cached.
+_UPSERT_COLUMNS = (
+    "found",
+    "latitude",
+    "longitude",
+    "resolved_address",
+    "source",
+    "expires_at",
+    "updated_at",
+)
+
+
+class GeocodeCacheService:
+    """Durable address -> coordinate cache shared by every request and worker."""
+
+    POSITIVE_TTL_DAYS = 30
+    # Upstream address data changes, so "not found" is re-checked sooner.
+    NEGATIVE_TTL_MINUTES = 60
+
+    @staticmethod
+    def normalize_address(address: str) -> str:
+        return " ".join((address or "").lower().split())
+
+    @classmethod
+    def build_key(cls, address: str) -> str:
+        normalized = cls.normalize_address(address)
+        return hashlib.sha256(normalized.encode("utf-8", errors="ignore")).hexdigest()
+
+    def get(self, address: str):
+        """
+        Return (hit, coord). A hit with coord=None is a cached "not found".
+        """
+        rows = self.get_many([address])
+        if address in rows:
+            return True, rows[address]
+        return False, None
+
+    def get_many(self, addresses: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Look up several addresses with one query.
+
+        Only cache hits are returned; negative hits map to None.
+        """
+        keys_by_address = {
+            address: self.build_key(address)
+            for address in addresses
+            if self.normalize_address(address)
+        }
+        if not keys_by_address:
+            return {}
+
+        now = datetime.now(timezone.utc)
+        try:
+            rows = GeocodeCache.query.filter(
+                GeocodeCache.address_key.in_(set(keys_by_address.values())),
+                GeocodeCache.expires_at > now,
+            ).all()
+        except Exception as exc:
+            logger.error("Geocode cache lookup failed: %s", exc)
+            return {}
+
+        rows_by_key = {row.address_key: row for row in rows}
+        hits = {}
+        for address, key in keys_by_address.items():
+            row = rows_by_key.get(key)
+            if row is not None:
+                hits[address] = row.to_coord()
+        return hits
+
+    def set(self, address: str, coord: Optional[Dict]):
+        self.set_many({address: coord})
+
+    def set_many(self, results: Dict[str, Optional[Dict]]):
+        """
+        Store geocoding results; None values are cached as "not found".
+
+        Only pass None for a definitive empty answer. Leave out lookups that
+        failed (timeouts, 5xx, rate limits) so they are retried. Each address
+        is upserted, so one that another worker stored meanwhile does not
+        discard the rest of the batch.
+        """
+        now = datetime.now(timezone.utc)
+        rows = {}
+        for address, coord in results.items():
+            normalized = self.normalize_address(address)
+            if normalized:
+                key = self.build_key(address)
+                rows[key] = self._row(key, normalized, coord, now)
+        if not rows:
+            return
+
+        try:
+            self._upsert(list(rows.values()))
+            db.session.commit()
+        except Exception as exc:
+            db.session.rollback()
+            logger.warning("Failed to store geocode cache entries: %s", exc)
+
+    def _row(self, key: str, normalized: str, coord: Optional[Dict], now: datetime) -> Dict:
+        row = {
+            "address_key": key,
+            "address": normalized[:300],
+            "found": False,
+            "latitude": None,
+            "longitude": None,
+            "resolved_address": None,
+            "source": None,
+            "expires_at": now + timedelta(minutes=self.NEGATIVE_TTL_MINUTES),
+            "updated_at": now,
+        }
+        if coord and coord.get("latitude") is not None:
+            row.update(
+                found=True,
+                latitude=coord.get("latitude"),
+                longitude=coord.get("longitude"),
+                resolved_address=(coord.get("address") or "")[:300],
+                source=coord.get("source"),
+                expires_at=now + timedelta(days=self.POSITIVE_TTL_DAYS),
+            )
+        return row
+
+    @staticmethod
+    def _upsert(rows: List[Dict]):
+        dialect = db.engine.dialect.name
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        elif dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            dialect_insert = None
+
+        if dialect_insert is not None:
+            statement = dialect_insert(GeocodeCache.__table__).values(rows)
+            statement = statement.on_conflict_do_update(
+                index_elements=["address_key"],
+                set_={name: statement.excluded[name] for name in _UPSERT_COLUMNS},
+            )
+            db.session.execute(statement)
+            return
+
+        for row in rows:
+            try:
+                with db.session.begin_nested():
+                    cached = GeocodeCache.query.filter_by(address_key=row["address_key"]).first()
+                    if cached is None:
+                        db.session.add(GeocodeCache(**row))
+                    else:
+                        for name in _UPSERT_COLUMNS:
+                            setattr(cached, name, row[name])
+            except IntegrityError as exc:
+                # Another worker stored this address first; keep its entry.
+                logger.debug("Skipped concurrent geocode cache insert: %s", exc)
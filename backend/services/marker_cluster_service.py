@@ -0,0 +1,346 @@
+import json
+import logging
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from database import db
+from models.marker_cluster import MarkerCluster
+from models.marker_cluster_dirty_cell import MarkerClusterDirtyCell
+from models.restaurant import Restaurant
+from utils.categories import category_group
+from utils.tiles import tile_bounds, world_position
+
+logger = logging.getLogger(__name__)
+
+Cell = Tuple[int, int]
+
+
+class MarkerClusterService:
+    """
+    Grid clusters of stored restaurants for the map tile endpoint.
+
+    Every tile at zoom z is split into 4x4 cells, i.e. a cell is a tile at
+    zoom z + 2, so a cell's parent at z - 1 is simply (x // 2, y // 2). Each
+    cell keeps a count, a coordinate sum for the centroid, and category and
+    cheapest-menu price summaries.
+
+    Updates are incremental: the finest cells of the changed restaurants are
+    re-aggregated from the restaurants table, then every coarser level is
+    recomputed from its (at most four) child cells. Writers only mark those
+    cells dirty; `flush_dirty()` re-aggregates everything marked in one pass
+    when a cluster tile is read.
+    """
+
+    MAX_CLUSTER_ZOOM = 14
+    GRID_BITS = 2
+    PRICE_BANDS = (10000, 20000, 30000)
+    # Cells are fetched in blocks of 2^BLOCK_BITS x 2^BLOCK_BITS per query.
+    BLOCK_BITS = 4
+    TOP_CATEGORIES = 3
+    # Dirty marks handled per flush; the rest wait for the next tile read.
+    MAX_FLUSH_MARKS = 5000
+    DELETE_CHUNK_SIZE = 900
+
+    def __init__(self, max_cluster_zoom: int = None):
+        self.max_cluster_zoom = (
+            self.MAX_CLUSTER_ZOOM if max_cluster_zoom is None else max_cluster_zoom
+        )
+
+    def cell_for(self, latitude: float, longitude: float, zoom: int) -> Cell:
+        x, y = world_position(latitude, longitude, zoom + self.GRID_BITS)
+        return int(x), int(y)
+
+    def mark_restaurant_ids(
+        self,
+        restaurant_ids: Iterable[int],
+        previous_points: Iterable[Tuple[float, float]] = (),
+    ):
+        """
+        Mark the clusters containing these restaurants dirty. Best effort.
+
+        Pass the coordinates they had before an update as `previous_points`
+        so the clusters they moved out of are fixed too.
+        """
+        restaurant_ids = list(set(restaurant_ids))
+        previous_points = list(previous_points)
+        if not restaurant_ids and not previous_points:
+            return
+
+        try:
+            points = previous_points
+            if restaurant_ids:
+                points += (
+                    db.session.query(Restaurant.latitude, Restaurant.longitude)
+                    .filter(Restaurant.id.in_(restaurant_ids))
+                    .all()
+                )
+            cells = self._finest_cells(points)
+            if not cells:
+                return
+            db.session.add_all(
+                MarkerClusterDirtyCell(cell_x=x, cell_y=y) for x, y in cells
+            )
+            db.session.commit()
+        except Exception as exc:
+            db.session.rollback()
+            logger.warning("Marking marker clusters dirty failed: %s", exc)
+
+    def flush_dirty(self) -> int:
+        """Re-aggregate the clusters marked dirty. Returns the marks handled."""
+        try:
+            marks = (
+                db.session.query(
+                    MarkerClusterDirtyCell.id,
+                    MarkerClusterDirtyCell.cell_x,
+                    MarkerClusterDirtyCell.cell_y,
+                )
+                .order_by(MarkerClusterDirtyCell.id)
+                .limit(self.MAX_FLUSH_MARKS)
+                .all()
+            )
+            if not marks:
+                return 0
+
+            self._refresh_cells({(mark.cell_x, mark.cell_y) for mark in marks})
+            # Delete by id: cells marked again meanwhile keep their newer mark.
+            mark_ids = [mark.id for mark in marks]
+            for start in range(0, len(mark_ids), self.DELETE_CHUNK_SIZE):
+                MarkerClusterDirtyCell.query.filter(
+                    MarkerClusterDirtyCell.id.in_(mark_ids[start:start + self.DELETE_CHUNK_SIZE])
+                ).delete(synchronize_session=False)
+            db.session.commit()
+            return len(marks)
+        except Exception as exc:
+            db.session.rollback()
+            logger.warning("Marker cluster refresh failed: %s", exc)
+            return 0
+
+    def refresh_points(self, points: Iterable[Tuple[float, float]]):
+        """Re-aggregate the clusters containing these coordinates (old or new) now."""
+        cells = self._finest_cells(points)
+        if not cells:
+            return
+
+        self._refresh_cells(cells)
+        db.session.commit()
+
+    def _finest_cells(self, points: Iterable[Tuple[float, float]]) -> Set[Cell]:
+        return {
+            self.cell_for(latitude, longitude, self.max_cluster_zoom)
+            for latitude, longitude in points
+            if latitude is not None and longitude is not None
+        }
+
+    def _refresh_cells(self, cells: Set[Cell]):
+        zoom = self.max_cluster_zoom
+        self._store(zoom, cells, self._aggregate_restaurants(zoom, cells))
+        while zoom > 0:
+            parents = {(x // 2, y // 2) for x, y in cells}
+            aggregates = self._aggregate_children(zoom, parents)
+            zoom -= 1
+            self._store(zoom, parents, aggregates)
+            cells = parents
+
+    def rebuild(self) -> int:
+        """Recompute every cluster from scratch. Returns the number of clusters."""
+        levels: Dict[int, Dict[Cell, Dict]] = {self.max_cluster_zoom: {}}
+        finest = levels[self.max_cluster_zoom]
+        for row in self._restaurant_rows().yield_per(1000):
+            cell = self.cell_for(row.latitude, row.longitude, self.max_cluster_zoom)
+            self._add_restaurant(finest.setdefault(cell, self._empty()), row)
+
+        for zoom in range(self.max_cluster_zoom, 0, -1):
+            parents = levels.setdefault(zoom - 1, {})
+            for (x, y), summary in levels[zoom].items():
+                self._merge(parents.setdefault((x // 2, y // 2), self._empty()), summary)
+
+        MarkerCluster.query.delete()
+        MarkerClusterDirtyCell.query.delete()
+        total = 0
+        for zoom, cells in levels.items():
+            for (x, y), summary in cells.items():
+                cluster = MarkerCluster(zoom=zoom, cell_x=x, cell_y=y)
+                self._apply(cluster, summary)
+                db.session.add(cluster)
+                total += 1
+        db.session.commit()
+        return total
+
+    def rebuild_if_empty(self) -> int:
+        if db.session.query(MarkerCluster.id).first() is not None:
+            return 0
+        if db.session.query(Restaurant.id).first() is None:
+            return 0
+        return self.rebuild()
+
+    def clusters_for_tile(self, zoom: int, x: int, y: int) -> List[Dict]:
+        size = 1 << self.GRID_BITS
+        rows = MarkerCluster.query.filter(
+            MarkerCluster.zoom == zoom,
+            MarkerCluster.cell_x.between(x * size, x * size + size - 1),
+            MarkerCluster.cell_y.between(y * size, y * size + size - 1),
+        ).all()
+        rows.sort(key=lambda row: (row.cell_y, row.cell_x))
+        return [self._cluster_payload(row) for row in rows]
+
+    def _restaurant_rows(self, bounds: Optional[Tuple[float, float, float, float]] = None):
+        query = db.session.query(
+            Restaurant.latitude,
+            Restaurant.longitude,
+            Restaurant.category,
+            Restaurant.min_price,
+        )
+
+        if bounds is not None:
+            south, north, west, east = bounds
+            query = query.filter(
+                Restaurant.latitude.between(south, north),
+                Restaurant.longitude.between(west, east),
+            )
+        return query
+
+    def _aggregate_restaurants(self, zoom: int, cells: Set[Cell]) -> Dict[Cell, Dict]:
+        aggregates: Dict[Cell, Dict] = {}
+        for block in self._blocks(cells):
+            for row in self._restaurant_rows(self._block_bounds(zoom, block)):
+                if row.latitude is None or row.longitude is None:
+                    continue
+                cell = self.cell_for(row.latitude, row.longitude, zoom)
+                # The bounds query is inclusive; keep each row in exactly one cell.
+                if cell in cells:
+                    self._add_restaurant(aggregates.setdefault(cell, self._empty()), row)
+        return aggregates
+
+    def _aggregate_children(self, child_zoom: int, parents: Set[Cell]) -> Dict[Cell, Dict]:
+        children = {(2 * x + dx, 2 * y + dy) for x, y in parents for dx in (0, 1) for dy in (0, 1)}
+        aggregates: Dict[Cell, Dict] = {}
+        for (x, y), cluster in self._load_clusters(child_zoom, children).items():
+            self._merge(aggregates.setdefault((x // 2, y // 2), self._empty()), self._summary(cluster))
+        return aggregates
+
+    def _store(self, zoom: int, cells: Set[Cell], aggregates: Dict[Cell, Dict]):
+        existing = self._load_clusters(zoom, cells)
+        for cell in cells:
+            summary = aggregates.get(cell)
+            cluster = existing.get(cell)
+            if not summary or not summary["count"]:
+                if cluster is not None:
+                    db.session.delete(cluster)
+                continue
+
+            if cluster is None:
+                cluster = MarkerCluster(zoom=zoom, cell_x=cell[0], cell_y=cell[1])
+                db.session.add(cluster)
+            self._apply(cluster, summary)
+        db.session.flush()
+
+    def _load_clusters(self, zoom: int, cells: Set[Cell]) -> Dict[Cell, MarkerCluster]:
+        loaded = {}
+        for block in self._blocks(cells):
+            xs = [x for x, _ in block]
+            ys = [y for _, y in block]
+            rows = MarkerCluster.query.filter(
+                MarkerCluster.zoom == zoom,
+                MarkerCluster.cell_x.between(min(xs), max(xs)),
+                MarkerCluster.cell_y.between(min(ys), max(ys)),
+            ).all()
+            loaded.update(
+                ((row.cell_x, row.cell_y), row) for row in rows if (row.cell_x, row.cell_y) in cells
+            )
+        return loaded
+
+    def _blocks(self, cells: Set[Cell]) -> List[List[Cell]]:
+        blocks: Dict[Cell, List[Cell]] = {}
+        for x, y in cells:
+            blocks.setdefault((x >> self.BLOCK_BITS, y >> self.BLOCK_BITS), []).append((x, y))
+        return list(blocks.values())
+
+    def _block_bounds(self, zoom: int, block: List[Cell]) -> Tuple[float, float, float, float]:
+        cell_zoom = zoom + self.GRID_BITS
+        xs = [x for x, _ in block]
+        ys = [y for _, y in block]
+        _, north, west, _ = tile_bounds(cell_zoom, min(xs), min(ys))
+        south, _, _, east = tile_bounds(cell_zoom, max(xs), max(ys))
+        return south, north, west, east
+
+    def _empty(self) -> Dict:
+        return {
+            "count": 0,
+            "latitude_sum": 0.0,
+            "longitude_sum": 0.0,
+            "priced_count": 0,
+            "min_price_sum": 0,
+            "categories": Counter(),
+            "price_bands": Counter(),
+        }
+
+    def _add_restaurant(self, summary: Dict, row):
+        summary["count"] += 1
+        summary["latitude_sum"] += row.latitude
+        summary["longitude_sum"] += row.longitude
+        group = category_group(row.category)
+        if group:
+            summary["categories"][group] += 1
+        if row.min_price is not None:
+            summary["priced_count"] += 1
+            summary["min_price_sum"] += row.min_price
+            summary["price_bands"][self._price_band(row.min_price)] += 1
+
+    @staticmethod
+    def _merge(target: Dict, summary: Dict):
+        for key in ("count", "latitude_sum", "longitude_sum", "priced_count", "min_price_sum"):
+            target[key] += summary[key]
+        target["categories"].update(summary["categories"])
+        target["price_bands"].update(summary["price_bands"])
+
+    @staticmethod
+    def _summary(cluster: MarkerCluster) -> Dict:
+        return {
+            "count": cluster.count,
+            "latitude_sum": cluster.latitude_sum,
+            "longitude_sum": cluster.longitude_sum,
+            "priced_count": cluster.priced_count,
+            "min_price_sum": cluster.min_price_sum,
+            "categories": Counter(json.loads(cluster.category_counts or "{}")),
+            "price_bands": Counter(json.loads(cluster.price_band_counts or "{}")),
+        }
+
+    @staticmethod
+    def _apply(cluster: MarkerCluster, summary: Dict):
+        cluster.count = summary["count"]
+        cluster.latitude_sum = summary["latitude_sum"]
+        cluster.longitude_sum = summary["longitude_sum"]
+        cluster.priced_count = summary["priced_count"]
+        cluster.min_price_sum = summary["min_price_sum"]
+        cluster.category_counts = json.dumps(dict(summary["categories"]), ensure_ascii=False, sort_keys=True)
+        cluster.price_band_counts = json.dumps(dict(summary["price_bands"]), sort_keys=True)
+
+    def _price_band(self, price: int) -> str:
+        lower = 0
+        for upper in self.PRICE_BANDS:
+            if price < upper:
+                return f"{lower}-{upper}"
+            lower = upper
+        return f"{lower}+"
+
+    def _cluster_payload(self, cluster: MarkerCluster) -> Dict:
+        summary = self._summary(cluster)
+        south, north, west, east = tile_bounds(
+            cluster.zoom + self.GRID_BITS, cluster.cell_x, cluster.cell_y
+        )
+        average_min_price = None
+        if summary["priced_count"]:
+            average_min_price = int(round(summary["min_price_sum"] / summary["priced_count"]))
+
+        return {
+            "latitude": summary["latitude_sum"] / summary["count"],
+            "longitude": summary["longitude_sum"] / summary["count"],
+            "count": summary["count"],
+            "bounds": {"south": south, "north": north, "west": west, "east": east},
+            "top_categories": dict(summary["categories"].most_common(self.TOP_CATEGORIES)),
+            "price": {
+                "priced_count": summary["priced_count"],
+                "average_min_price": average_min_price,
+                "bands": dict(summary["price_bands"]),
+            },
+        }
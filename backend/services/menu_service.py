@@ -1,11 +1,16 @@
+import concurrent.futures
 import logging
 from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import func
 
 from crawlers.delivery_apps import DeliveryAppCrawler
 from crawlers.naver_place import NaverPlaceCrawler
 from database import db
 from models.menu import Menu
 from models.restaurant import Restaurant
+from services.marker_cluster_service import MarkerClusterService
 from utils.text_normalizer import normalize_menu_name
 
 logger = logging.getLogger(__name__)
@@ -15,10 +20,13 @@ class MenuService:
     """Menu retrieval and caching service."""
 
     CACHE_DURATION_HOURS = 24
+    # Parallel crawls per search; per-host limits are enforced by the crawler.
+    CRAWL_WORKERS = 6
 
     def __init__(self):
         self.naver_crawler = NaverPlaceCrawler()
         self.delivery_crawler = DeliveryAppCrawler()
+        self.marker_clusters = MarkerClusterService()
 
     def get_menus(
         self,
@@ -47,17 +55,61 @@ class MenuService:
 
         return []
 
+    def get_menus_bulk(
+        self,
+        restaurants: list,
+        naver_links: dict = None,
+        allow_crawl: bool = True,
+    ) -> dict:
+        """
+        Return {restaurant_id: menus} for many restaurants.
+
+        Fresh cached menus for every restaurant are loaded with one query; only
+        cache misses are crawled (when allowed). Restaurants without menus map to [].
+        """
+        restaurant_ids = [restaurant.id for restaurant in restaurants]
+        menus_by_id = self._get_cached_menus_bulk(restaurant_ids)
+
+        misses = [restaurant for restaurant in restaurants if not menus_by_id.get(restaurant.id)]
+        if misses and allow_crawl:
+            crawled = self._crawl_menus_concurrently(misses, naver_links or {})
+
+            # Persist on the calling thread, which owns the scoped DB session.
+            saved_ids = [
+                restaurant_id
+                for restaurant_id, menu_data in crawled.items()
+                if self._save_menus(restaurant_id, menu_data, mark_clusters=False)
+            ]
+            # Mark the whole batch at once instead of one commit per restaurant.
+            self.marker_clusters.mark_restaurant_ids(saved_ids)
+
+            if crawled:
+                menus_by_id.update(self._get_cached_menus_bulk(list(crawled)))
+
+        return {restaurant_id: menus_by_id.get(restaurant_id) or [] for restaurant_id in restaurant_ids}
+
     def _get_cached_menus(self, restaurant_id: int) -> list:
         """Get fresh menus from cache."""
+        return self._get_cached_menus_bulk([restaurant_id]).get(restaurant_id)
+
+    def _get_cached_menus_bulk(self, restaurant_ids: list) -> dict:
+        """Get fresh menus for several restaurants with one query, grouped by id."""
+        if not restaurant_ids:
+            return {}
+
         cutoff_time = datetime.now(timezone.utc) - timedelta(hours=self.CACHE_DURATION_HOURS)
 
         menus = Menu.query.filter(
-            Menu.restaurant_id == restaurant_id,
+            Menu.restaurant_id.in_(set(restaurant_ids)),
             Menu.updated_at >= cutoff_time,
-        ).all()
+        ).order_by(Menu.id).all()
 
         self._normalize_cached_menu_names(menus)
-        return menus if menus else None
+
+        grouped = {}
+        for menu in menus:
+            grouped.setdefault(menu.restaurant_id, []).append(menu)
+        return grouped
 
     def _normalize_cached_menu_names(self, menus: list):
         if not menus:
@@ -78,6 +130,44 @@ class MenuService:
                 db.session.rollback()
                 logger.error("Failed to normalize cached menu names: %s", exc)
 
+    def _crawl_menus_concurrently(self, restaurants: list, naver_links: dict) -> dict:
+        """
+        Crawl menus for several restaurants on a bounded worker pool.
+
+        Workers only do network I/O on detached snapshots of the rows, so no ORM
+        object or DB session crosses threads. Returns {restaurant_id: menu_data}
+        for restaurants that produced menus.
+        """
+        snapshots = [
+            SimpleNamespace(
+                id=restaurant.id,
+                name=restaurant.name,
+                address=restaurant.address,
+                road_address=restaurant.road_address,
+            )
+            for restaurant in restaurants
+        ]
+
+        crawled = {}
+        workers = max(1, min(self.CRAWL_WORKERS, len(snapshots)))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            for snapshot in snapshots:
+                logger.info("Cache miss, crawling menus for %s", snapshot.name)
+                future = executor.submit(self._crawl_menus, snapshot, naver_links.get(snapshot.id))
+                futures[future] = snapshot.id
+
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    menu_data = future.result()
+                except Exception as exc:
+                    logger.error("Menu crawl failed for restaurant %s: %s", futures[future], exc)
+                    continue
+                if menu_data:
+                    crawled[futures[future]] = menu_data
+
+        return crawled
+
     def _crawl_menus(self, restaurant: Restaurant, naver_link: str = None) -> list:
         """
         Crawl menus with source priority:
@@ -107,8 +197,8 @@ class MenuService:
 
         return menu_data
 
-    def _save_menus(self, restaurant_id: int, menu_data: list):
-        """Persist crawled menus."""
+    def _save_menus(self, restaurant_id: int, menu_data: list, mark_clusters: bool = True) -> bool:
+        """Persist crawled menus. Returns False when nothing was saved."""
         try:
             Menu.query.filter(
                 Menu.restaurant_id == restaurant_id,
@@ -126,12 +216,17 @@ class MenuService:
                 )
                 db.session.add(menu)
 
+            self._update_price_stats(restaurant_id)
             db.session.commit()
             logger.info("Saved %s menus for restaurant %s", len(menu_data), restaurant_id)
-
         except Exception as exc:
             db.session.rollback()
             logger.error("Failed to save menus: %s", exc)
+            return False
+
+        if mark_clusters:
+            self.marker_clusters.mark_restaurant_ids([restaurant_id])
+        return True
 
     def add_user_contribution(self, restaurant_id: int, menu_name: str, price: int) -> Menu:
         """Store user-contributed menu data."""
@@ -145,13 +240,70 @@ class MenuService:
                 source="user",
             )
             db.session.add(menu)
+            self._update_price_stats(restaurant_id)
             db.session.commit()
+            self.marker_clusters.mark_restaurant_ids([restaurant_id])
             return menu
         except Exception as exc:
             db.session.rollback()
             logger.error("Failed to add user contribution: %s", exc)
             return None
 
+    def _update_price_stats(self, restaurant_id: int):
+        """
+        Refresh the denormalized price columns on the restaurant from its menus.
+
+        Runs inside the caller's transaction; the caller commits.
+        """
+        db.session.flush()
+        min_price, avg_price, max_price, priced_count, last_updated = db.session.query(
+            func.min(Menu.price),
+            func.avg(Menu.price),
+            func.max(Menu.price),
+            func.count(Menu.price),
+            func.max(Menu.updated_at),
+        ).filter(Menu.restaurant_id == restaurant_id).one()
+
+        restaurant = db.session.get(Restaurant, restaurant_id)
+        if restaurant is None:
+            return
+
+        restaurant.min_price = min_price
+        restaurant.avg_price = round(float(avg_price), 1) if avg_price is not None else None
+        restaurant.max_price = max_price
+        restaurant.priced_menu_count = priced_count or 0
+        # Mirrors _get_cached_menus_bulk: menus count as cached for CACHE_DURATION_HOURS.
+        restaurant.menus_fresh_until = (
+            last_updated + timedelta(hours=self.CACHE_DURATION_HOURS) if last_updated else None
+        )
+
+    def backfill_price_stats(self, limit: int = 5000) -> int:
+        """Fill price columns for restaurants stored before they existed."""
+        restaurant_ids = [
+            row[0]
+            for row in db.session.query(Menu.restaurant_id)
+            .join(Restaurant, Restaurant.id == Menu.restaurant_id)
+            .filter(Restaurant.priced_menu_count.is_(None))
+            .distinct()
+            .limit(limit)
+            .all()
+        ]
+        if not restaurant_ids:
+            return 0
+
+        try:
+            for restaurant_id in restaurant_ids:
+                self._update_price_stats(restaurant_id)
+            db.session.commit()
+        except Exception as exc:
+            db.session.rollback()
+            logger.error("Failed to backfill menu price stats: %s", exc)
+            return 0
+
+        # Cluster price bands read min_price.
+        self.marker_clusters.mark_restaurant_ids(restaurant_ids)
+        return len(restaurant_ids)
+
     def repair_recent_menu_names(self, limit: int = 5000) -> int:
         """
         Repair mojibake menu names in DB and return the number of updated rows.
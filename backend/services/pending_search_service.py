@@ -0,0 +1,110 @@
+import concurrent.futures
+import logging
+import secrets
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from database import db
+
+logger = logging.getLogger(__name__)
+
+
+class PendingSearchService:
+    """
+    Resolve search candidates in the background and expose them by search token.
+
+    Each job is handed to `resolver` inside an app context on a worker thread. The
+    resolver returns a result row, or None when the candidate was filtered out.
+    Tokens live in process memory, so clients must poll the worker that issued
+    them (sticky sessions) when several WSGI workers are running.
+    """
+
+    MAX_WORKERS = 4
+    TOKEN_TTL_SECONDS = 10 * 60
+
+    def __init__(self, max_workers: int = None, token_ttl_seconds: int = None):
+        self.max_workers = max_workers or self.MAX_WORKERS
+        self.token_ttl_seconds = token_ttl_seconds or self.TOKEN_TTL_SECONDS
+        self._searches: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+    def submit(self, app, jobs: List[Dict], resolver: Callable[[Dict], Optional[Dict]]) -> str:
+        """Queue jobs for background resolution and return the search token."""
+        token = secrets.token_urlsafe(16)
+        now = time.monotonic()
+
+        with self._lock:
+            self._expire_locked(now)
+            self._searches[token] = {
+                "created_at": now,
+                "pending": len(jobs),
+                "excluded": 0,
+                "failed": 0,
+                "results": [],
+            }
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="pending-search",
+                )
+            executor = self._executor
+
+        for job in jobs:
+            executor.submit(self._run_job, app, token, job, resolver)
+
+        return token
+
+    def poll(self, token: str, since: int = 0) -> Optional[Dict]:
+        """Return results resolved after index `since`, or None for unknown tokens."""
+        with self._lock:
+            self._expire_locked(time.monotonic())
+            search = self._searches.get(token)
+            if search is None:
+                return None
+
+            since = max(0, since)
+            return {
+                "results": list(search["results"][since:]),
+                "next": len(search["results"]),
+                "pending": search["pending"],
+                "excluded": search["excluded"],
+                "failed": search["failed"],
+                "done": search["pending"] == 0,
+            }
+
+    def _run_job(self, app, token: str, job: Dict, resolver: Callable[[Dict], Optional[Dict]]):
+        row = None
+        failed = False
+        try:
+            with app.app_context():
+                try:
+                    row = resolver(job)
+                finally:
+                    db.session.remove()
+        except Exception as exc:
+            failed = True
+            logger.error("Pending search job failed for token %s: %s", token, exc)
+
+        with self._lock:
+            search = self._searches.get(token)
+            if search is None:
+                return
+
+            search["pending"] -= 1
+            if failed:
+                search["failed"] += 1
+            elif row is None:
+                search["excluded"] += 1
+            else:
+                search["results"].append(row)
+
+    def _expire_locked(self, now: float):
+        expired = [
+            token
+            for token, search in self._searches.items()
+            if now - search["created_at"] > self.token_ttl_seconds
+        ]
+        for token in expired:
+            del self._searches[token]
@@ -0,0 +1,66 @@
+import logging
+from typing import Dict, Iterable, Tuple
+
+from database import db
+from models.query_variant_stat import QueryVariantStat
+
+logger = logging.getLogger(__name__)
+
+
+class QueryVariantStatsService:
+    """
+    Learned useful-result yield per query-variant kind ("hint+query", "category",
+    ...), both overall and per search area ("hint+query@37.5,126.9"). Radius
+    searches count only results inside the radius as useful.
+
+    Counts are halved once a kind passes DECAY_AFTER_CALLS, so the yield follows
+    recent behaviour instead of the whole history.
+    """
+
+    DECAY_AFTER_CALLS = 1000
+
+    def get_yields(self, kinds: Iterable[str]) -> Dict[str, Tuple[int, int]]:
+        """Return {kind: (calls, new_items)} for kinds that have been observed."""
+        kinds = set(kinds)
+        if not kinds:
+            return {}
+
+        try:
+            rows = QueryVariantStat.query.filter(QueryVariantStat.variant_kind.in_(kinds)).all()
+        except Exception as exc:
+            logger.error("Query variant stats lookup failed: %s", exc)
+            return {}
+
+        return {row.variant_kind: (row.calls, row.new_items) for row in rows}
+
+    def record(self, observations: Dict[str, Tuple[int, int]]):
+        """Add {kind: (calls, new_items)} from one search."""
+        observations = {kind: counts for kind, counts in observations.items() if counts[0] > 0}
+        if not observations:
+            return
+
+        try:
+            existing = {
+                row.variant_kind: row
+                for row in QueryVariantStat.query.filter(
+                    QueryVariantStat.variant_kind.in_(set(observations.keys()))
+                ).all()
+            }
+
+            for kind, (calls, new_items) in observations.items():
+                row = existing.get(kind)
+                if row is None:
+                    row = QueryVariantStat(variant_kind=kind[:50], calls=0, new_items=0)
+                    db.session.add(row)
+
+                row.calls = (row.calls or 0) + calls
+                row.new_items = (row.new_items or 0) + new_items
+                if row.calls > self.DECAY_AFTER_CALLS:
+                    row.calls //= 2
+                    row.new_items //= 2
+
+            db.session.commit()
+        except Exception as exc:
+            # Concurrent first inserts can collide; the stats are best-effort.
+            db.session.rollback()
+            logger.warning("Failed to store query variant stats: %s", exc)
@@ -0,0 +1,486 @@
+import json
+import logging
+import math
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+
+from database import db
+from models.restaurant import Restaurant
+from utils.categories import CATEGORY_ALIASES, category_group
+from utils.coordinates import EARTH_RADIUS_METERS, bounding_box
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+logger = logging.getLogger(__name__)
+
+RESTAURANT_INDEX_KEY = "restaurant_index"
+
+_COLUMNS = (
+    "id",
+    "lat",
+    "lng",
+    "category",
+    "min_price",
+    "avg_price",
+    "fresh_until",
+    "delivery_fee",
+    "cell",
+)
+_CATEGORY_CODES = {name: code for code, name in enumerate(CATEGORY_ALIASES)}
+
+
+class RestaurantIndexService:
+    """
+    In-process, column-oriented copy of the restaurant coordinates and filters.
+
+    Rows are kept as parallel NumPy arrays sorted by a lat/lng grid cell, so a
+    radius query reads one contiguous slice per grid row of its bounding box
+    and then applies distance, delivery-fee, budget and category filters in a
+    single vectorized pass. Only matching ids leave the index.
+
+    Prices come from the denormalized columns MenuService keeps on Restaurant,
+    so `refresh()` only has to pick up restaurants whose updated_at changed.
+    updated_at is set by the application clock before commit, so rows are
+    re-checked `lookback` seconds behind the newest one seen and merged when
+    their updated_at differs from the last merge; deleted rows disappear on
+    the next full `load()`.
+    `save()` writes a snapshot with one .npy file per column so other workers
+    can `open()` the same copy with mmap.
+    """
+
+    CELL_DEGREES = 0.01
+    REFRESH_INTERVAL_SECONDS = 5.0
+    LOOKBACK_SECONDS = 300.0
+    # Replaced snapshots stay this long for workers still mapping them.
+    SNAPSHOT_RETENTION_SECONDS = 60.0
+    CHUNK_SIZE = 900
+
+    def __init__(
+        self,
+        cell_degrees: float = None,
+        refresh_interval: float = None,
+        lookback: float = None,
+        clock=time.monotonic,
+    ):
+        self.cell_degrees = cell_degrees or self.CELL_DEGREES
+        self.refresh_interval = (
+            self.REFRESH_INTERVAL_SECONDS if refresh_interval is None else refresh_interval
+        )
+        self.lookback = self.LOOKBACK_SECONDS if lookback is None else lookback
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._arrays: Optional[Dict[str, "np.ndarray"]] = None
+        self._watermark: Optional[datetime] = None
+        # updated_at of every merged row inside the lookback window.
+        self._recent: Dict[int, datetime] = {}
+        self._path: Optional[str] = None
+        self._version: Optional[str] = None
+        self._refreshed_at: Optional[float] = None
+
+    @staticmethod
+    def available() -> bool:
+        return np is not None
+
+    @property
+    def ready(self) -> bool:
+        return self._arrays is not None
+
+    def __len__(self):
+        arrays = self._arrays
+        return 0 if arrays is None else len(arrays["id"])
+
+    def load(self):
+        """Build the arrays from the whole restaurants table."""
+        # Read the window first: a row changed in between is merged again.
+        recent, watermark = self._recent_changes(None)
+        rows = self._fetch_rows()
+        with self._lock:
+            self._arrays = self._build(rows)
+            self._watermark, self._recent = watermark, recent
+            self._refreshed_at = self._clock()
+        logger.info("Loaded restaurant index with %s rows", len(self))
+
+    def refresh(self, force: bool = False) -> int:
+        """Merge rows changed since the last load/refresh. Returns rows updated."""
+        if not self.ready:
+            self.load()
+            return len(self)
+
+        now = self._clock()
+        if not force and now - (self._refreshed_at or 0) < self.refresh_interval:
+            return 0
+
+        with self._lock:
+            self._refreshed_at = now
+
+        if self._path:
+            self._adopt_newer_snapshot()
+
+        with self._lock:
+            watermark, merged_recent = self._watermark, self._recent
+        recent, newest = self._recent_changes(watermark)
+        changed_ids = {
+            restaurant_id
+            for restaurant_id, updated_at in recent.items()
+            if merged_recent.get(restaurant_id) != updated_at
+        }
+
+        rows = self._fetch_rows(changed_ids) if changed_ids else []
+        with self._lock:
+            if changed_ids:
+                current = self._arrays
+                keep = ~np.isin(current["id"], np.fromiter(changed_ids, dtype=np.int64))
+                fresh = self._build(rows, sort=False)
+                merged = {
+                    name: np.concatenate([current[name][keep], fresh[name]]) for name in _COLUMNS
+                }
+                self._arrays = self._sorted(merged)
+            self._watermark, self._recent = newest, recent
+
+        if changed_ids and self._path:
+            # Publish the merge so workers keep sharing one mapped copy.
+            try:
+                self.save(self._path)
+            except OSError as exc:
+                logger.warning("Failed to save restaurant index to %s: %s", self._path, exc)
+        return len(rows)
+
+    def query(
+        self,
+        latitude: float,
+        longitude: float,
+        radius: float,
+        max_delivery_fee: Optional[int] = None,
+        budget: Optional[int] = None,
+        budget_type: str = "menu",
+        categories: Optional[Iterable[str]] = None,
+        now: Optional[float] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Return (restaurant_id, distance) within `radius` meters, nearest first.
+
+        The budget compares the cheapest menu, or the average with
+        budget_type="average"; restaurants without prices never match it, and
+        ones whose menus went stale (as of `now`, epoch seconds) always do so
+        their menus get re-checked.
+        """
+        arrays = self._arrays
+        if arrays is None or not len(arrays["id"]):
+            return []
+
+        candidates = self._candidate_positions(arrays["cell"], latitude, longitude, radius)
+        if not len(candidates):
+            return []
+
+        lat = arrays["lat"][candidates]
+        lng = arrays["lng"][candidates]
+        distances = self._haversine(latitude, longitude, lat, lng)
+
+        mask = distances <= radius
+        if max_delivery_fee is not None:
+            # NaN (unknown fee) compares False, matching the SQL "IS NOT NULL" filter.
+            mask &= arrays["delivery_fee"][candidates] <= max_delivery_fee
+        if budget is not None:
+            prices = arrays["avg_price" if budget_type == "average" else "min_price"][candidates]
+            stale = arrays["fresh_until"][candidates] <= (time.time() if now is None else now)
+            mask &= (prices <= budget) | (~np.isnan(prices) & stale)
+        if categories:
+            codes = [_CATEGORY_CODES[name] for name in categories if name in _CATEGORY_CODES]
+            mask &= np.isin(arrays["category"][candidates], codes)
+
+        positions = candidates[mask]
+        distances = distances[mask]
+        order = np.argsort(distances, kind="stable")
+        return [
+            (int(restaurant_id), float(distance))
+            for restaurant_id, distance in zip(arrays["id"][positions[order]], distances[order])
+        ]
+
+    def restaurants(self, matches: List[Tuple[int, float]]) -> List[Tuple[Restaurant, float]]:
+        """Load ORM rows for query() matches only, preserving their order."""
+        ids = [restaurant_id for restaurant_id, _ in matches]
+        loaded = {}
+        for start in range(0, len(ids), self.CHUNK_SIZE):
+            chunk = ids[start:start + self.CHUNK_SIZE]
+            loaded.update(
+                (row.id, row) for row in Restaurant.query.filter(Restaurant.id.in_(chunk)).all()
+            )
+        return [
+            (loaded[restaurant_id], distance)
+            for restaurant_id, distance in matches
+            if restaurant_id in loaded
+        ]
+
+    def save(self, path: str):
+        """
+        Write the arrays as a new snapshot under `path` and map it.
+
+        Each snapshot is a <path>/<version>/ directory with one .npy file per
+        column. metadata.json names the current version and is swapped in with
+        a single rename, so readers never mix columns from two snapshots.
+        """
+        with self._lock:
+            arrays = self._arrays
+            metadata = {
+                "cell_degrees": self.cell_degrees,
+                "watermark": _isoformat(self._watermark),
+                "recent": [
+                    [restaurant_id, _isoformat(updated_at)]
+                    for restaurant_id, updated_at in self._recent.items()
+                ],
+            }
+        if arrays is None:
+            raise ValueError("restaurant index is not loaded")
+
+        version = f"{time.time_ns()}-{os.getpid()}"
+        os.makedirs(os.path.join(path, version))
+        for name in _COLUMNS:
+            np.save(os.path.join(path, version, f"{name}.npy"), arrays[name])
+        metadata.update(version=version, rows=len(arrays["id"]))
+
+        temp_path = os.path.join(path, f".metadata.{version}.json")
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            json.dump(metadata, handle)
+        os.replace(temp_path, os.path.join(path, "metadata.json"))
+
+        mapped = _map_snapshot(path, metadata)
+        with self._lock:
+            if self._arrays is arrays:
+                self._arrays = mapped
+            self._path, self._version = path, version
+        _remove_old_snapshots(path, version, self.SNAPSHOT_RETENTION_SECONDS)
+
+    @classmethod
+    def open(cls, path: str, refresh_interval: float = None) -> "RestaurantIndexService":
+        """Map the current saved snapshot read-only; refreshes publish new ones."""
+        metadata = _read_metadata(path)
+        index = cls(cell_degrees=metadata["cell_degrees"], refresh_interval=refresh_interval)
+        index._adopt(path, metadata)
+        index._refreshed_at = index._clock()
+        return index
+
+    def _adopt_newer_snapshot(self):
+        """Switch to a snapshot another worker saved past our watermark."""
+        try:
+            metadata = _read_metadata(self._path)
+            if metadata["version"] == self._version:
+                return
+            watermark = _parse_datetime(metadata.get("watermark"))
+            if self._watermark is not None and (watermark is None or watermark < self._watermark):
+                return
+            self._adopt(self._path, metadata)
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("Saved restaurant index at %s is unusable: %s", self._path, exc)
+
+    def _adopt(self, path: str, metadata: dict):
+        arrays = _map_snapshot(path, metadata)
+        recent = {
+            restaurant_id: _parse_datetime(updated_at)
+            for restaurant_id, updated_at in metadata.get("recent") or ()
+        }
+        with self._lock:
+            self._arrays = arrays
+            self._watermark = _parse_datetime(metadata.get("watermark"))
+            self._recent = recent
+            self._path, self._version = path, metadata["version"]
+
+    def _fetch_rows(self, restaurant_ids: Optional[Iterable[int]] = None) -> List[Tuple]:
+        query = db.session.query(
+            Restaurant.id,
+            Restaurant.latitude,
+            Restaurant.longitude,
+            Restaurant.category,
+            Restaurant.min_price,
+            Restaurant.avg_price,
+            Restaurant.menus_fresh_until,
+            Restaurant.delivery_fee,
+        )
+
+        if restaurant_ids is None:
+            return query.all()
+
+        restaurant_ids = list(restaurant_ids)
+        rows = []
+        for start in range(0, len(restaurant_ids), self.CHUNK_SIZE):
+            chunk = restaurant_ids[start:start + self.CHUNK_SIZE]
+            rows.extend(query.filter(Restaurant.id.in_(chunk)).all())
+        return rows
+
+    def _build(self, rows: List[Tuple], sort: bool = True) -> Dict[str, "np.ndarray"]:
+        rows = [row for row in rows if row[1] is not None and row[2] is not None]
+        lat = np.array([row[1] for row in rows], dtype=np.float64)
+        lng = np.array([row[2] for row in rows], dtype=np.float64)
+        arrays = {
+            "id": np.array([row[0] for row in rows], dtype=np.int64),
+            "lat": lat,
+            "lng": lng,
+            "category": np.array([_category_code(row[3]) for row in rows], dtype=np.int16),
+            "min_price": _float_column(rows, 4),
+            "avg_price": _float_column(rows, 5),
+            "fresh_until": np.array([_timestamp(row[6]) for row in rows], dtype=np.float64),
+            "delivery_fee": _float_column(rows, 7),
+            "cell": self._cell_keys(lat, lng),
+        }
+        return self._sorted(arrays) if sort else arrays
+
+    @staticmethod
+    def _sorted(arrays: Dict[str, "np.ndarray"]) -> Dict[str, "np.ndarray"]:
+        order = np.argsort(arrays["cell"], kind="stable")
+        return {name: np.ascontiguousarray(arrays[name][order]) for name in _COLUMNS}
+
+    def _cell_keys(self, lat, lng):
+        rows = np.floor((np.asarray(lat) + 90.0) / self.cell_degrees).astype(np.int64)
+        cols = np.floor((np.asarray(lng) + 180.0) / self.cell_degrees).astype(np.int64)
+        return rows * self._row_stride() + cols
+
+    def _row_stride(self) -> int:
+        return int(math.ceil(360.0 / self.cell_degrees)) + 1
+
+    def _candidate_positions(self, cells, latitude: float, longitude: float, radius: float):
+        south, north, west, east = bounding_box(latitude, longitude, radius)
+        stride = self._row_stride()
+        first_row, first_col = divmod(int(self._cell_keys(south, west)), stride)
+        last_row, last_col = divmod(int(self._cell_keys(north, east)), stride)
+
+        # Cells are sorted row-major, so each grid row of the box is one slice.
+        slices = []
+        for row in range(first_row, last_row + 1):
+            start = np.searchsorted(cells, row * stride + first_col, side="left")
+            end = np.searchsorted(cells, row * stride + last_col, side="right")
+            if end > start:
+                slices.append(np.arange(start, end))
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(slices)
+
+    @staticmethod
+    def _haversine(latitude: float, longitude: float, lat, lng):
+        phi1 = math.radians(latitude)
+        phi2 = np.radians(lat)
+        delta_phi = phi2 - phi1
+        delta_lambda = np.radians(lng) - math.radians(longitude)
+        a = np.sin(delta_phi / 2) ** 2 + math.cos(phi1) * np.cos(phi2) * np.sin(delta_lambda / 2) ** 2
+        return EARTH_RADIUS_METERS * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    def _recent_changes(
+        self, watermark: Optional[datetime]
+    ) -> Tuple[Dict[int, datetime], Optional[datetime]]:
+        """Return ({id: updated_at} inside the lookback window, newest updated_at)."""
+        if watermark is None:
+            watermark = db.session.query(func.max(Restaurant.updated_at)).scalar()
+            if watermark is None:
+                return {}, None
+
+        since = watermark - timedelta(seconds=self.lookback)
+        recent = {
+            row.id: row.updated_at
+            for row in db.session.query(Restaurant.id, Restaurant.updated_at)
+            .filter(Restaurant.updated_at >= since)
+            .all()
+        }
+        return recent, max([watermark, *recent.values()])
+
+
+def init_restaurant_index(app):
+    """
+    Attach an app-lifetime index when RESTAURANT_INDEX is on and NumPy is installed.
+
+    Must run inside an app context, after the tables exist.
+
+    With RESTAURANT_INDEX_PATH set, a saved copy there is mapped instead of
+    reading the table; otherwise the table is loaded and saved to that path.
+    """
+    if not app.config.get("RESTAURANT_INDEX"):
+        return None
+    if not RestaurantIndexService.available():
+        logger.warning("RESTAURANT_INDEX is on but numpy is not installed; using SQL lookups")
+        return None
+
+    path = app.config.get("RESTAURANT_INDEX_PATH")
+    refresh_interval = app.config.get("RESTAURANT_INDEX_REFRESH_SECONDS")
+    index = None
+    if path and os.path.exists(os.path.join(path, "metadata.json")):
+        try:
+            index = RestaurantIndexService.open(path, refresh_interval=refresh_interval)
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("Saved restaurant index at %s is unusable: %s", path, exc)
+
+    try:
+        if index is None:
+            index = RestaurantIndexService(refresh_interval=refresh_interval)
+            index.load()
+            if path:
+                index.save(path)
+        else:
+            index.refresh(force=True)
+    except Exception as exc:
+        logger.warning("Restaurant index disabled: %s", exc)
+        return None
+
+    app.extensions[RESTAURANT_INDEX_KEY] = index
+    return index
+
+
+def _read_metadata(path: str) -> dict:
+    with open(os.path.join(path, "metadata.json"), encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def _map_snapshot(path: str, metadata: dict) -> Dict[str, "np.ndarray"]:
+    directory = os.path.join(path, metadata["version"])
+    arrays = {
+        name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in _COLUMNS
+    }
+    if any(len(array) != metadata["rows"] for array in arrays.values()):
+        raise ValueError(f"restaurant index snapshot {metadata['version']} is incomplete")
+    return arrays
+
+
+def _remove_old_snapshots(path: str, current: str, retention: float):
+    cutoff = time.time() - retention
+    for entry in os.scandir(path):
+        if not entry.is_dir() or entry.name == current:
+            continue
+        try:
+            if entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path)
+        except OSError as exc:
+            # Windows keeps mapped files locked; the next save retries.
+            logger.debug("Could not remove old restaurant index snapshot %s: %s", entry.path, exc)
+
+
+def _category_code(category: Optional[str]) -> int:
+    return _CATEGORY_CODES.get(category_group(category), -1)
+
+
+def _float_column(rows: List[Tuple], position: int):
+    # NaN marks unknown values; every comparison against it is False.
+    return np.array(
+        [math.nan if row[position] is None else row[position] for row in rows], dtype=np.float64
+    )
+
+
+def _timestamp(value: Optional[datetime]) -> float:
+    if value is None:
+        return math.nan
+    # SQLite hands back naive datetimes; they are stored in UTC.
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
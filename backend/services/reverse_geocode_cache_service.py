@@ -0,0 +1,166 @@
+import concurrent.futures
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Set, Tuple
+
+from database import db
+from models.reverse_geocode_cache import ReverseGeocodeCache
+
+logger = logging.getLogger(__name__)
+
+_METERS_PER_DEGREE_LAT = 111320.0
+
+
+class ReverseGeocodeCacheService:
+    """
+    Coordinate -> address cache keyed by a snapped grid cell.
+
+    Every point inside the same roughly `cell_meters`-square cell shares one
+    entry, so repeated searches around the same block reuse one lookup.
+    `lookup()` never waits on the geocoder: misses are filled by a small
+    background pool, and a cell whose lookup failed is not retried for
+    `failure_ttl_seconds`.
+    """
+
+    CELL_METERS = 100
+    TTL_HOURS = 7 * 24
+    FILL_WORKERS = 2
+    FAILURE_TTL_SECONDS = 60
+
+    def __init__(
+        self,
+        cell_meters: float = None,
+        ttl_hours: float = None,
+        failure_ttl_seconds: float = None,
+        clock=time.monotonic,
+    ):
+        self.cell_meters = cell_meters or self.CELL_METERS
+        self.ttl_hours = ttl_hours or self.TTL_HOURS
+        self.failure_ttl_seconds = (
+            self.FAILURE_TTL_SECONDS if failure_ttl_seconds is None else failure_ttl_seconds
+        )
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._filling: Set[str] = set()
+        self._failed_at: Dict[str, float] = {}
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+    def cell_key(self, latitude: float, longitude: float) -> str:
+        row, col = self._cell(latitude, longitude)
+        return f"{self.cell_meters:g}:{row}:{col}"
+
+    def get(self, latitude: float, longitude: float) -> Optional[str]:
+        now = datetime.now(timezone.utc)
+        try:
+            row = ReverseGeocodeCache.query.filter(
+                ReverseGeocodeCache.cell_key == self.cell_key(latitude, longitude),
+                ReverseGeocodeCache.expires_at > now,
+            ).first()
+        except Exception as exc:
+            logger.error("Reverse geocode cache lookup failed: %s", exc)
+            return None
+
+        return row.address if row is not None else None
+
+    def set(self, latitude: float, longitude: float, address: str):
+        if not address:
+            return
+
+        key = self.cell_key(latitude, longitude)
+        expires_at = datetime.now(timezone.utc) + timedelta(hours=self.ttl_hours)
+        try:
+            row = ReverseGeocodeCache.query.filter_by(cell_key=key).first()
+            if row is None:
+                row = ReverseGeocodeCache(cell_key=key)
+                db.session.add(row)
+
+            row.latitude = latitude
+            row.longitude = longitude
+            row.address = address[:300]
+            row.expires_at = expires_at
+            db.session.commit()
+        except Exception as exc:
+            # Another worker may have filled the same cell; the cache is best-effort.
+            db.session.rollback()
+            logger.warning("Failed to store reverse geocode cache entry: %s", exc)
+
+    def resolve(self, latitude: float, longitude: float, geocoder) -> Tuple[Optional[str], str]:
+        """
+        Return (address, source) where source is "cache", "reverse_geocode" or "none".
+
+        Misses are reverse geocoded with `geocoder.coord_to_address` and stored;
+        failed lookups are not cached.
+        """
+        address = self.get(latitude, longitude)
+        if address:
+            return address, "cache"
+
+        address = geocoder.coord_to_address(longitude, latitude)
+        if not address:
+            return None, "none"
+
+        self.set(latitude, longitude, address)
+        return address, "reverse_geocode"
+
+    def lookup(self, app, latitude: float, longitude: float, geocoder) -> Tuple[Optional[str], str]:
+        """
+        Return (address, source) from the cache without waiting on `geocoder`.
+
+        source is "cache" on a hit. On a miss the cell is resolved in the
+        background (inside an app context for `app`) and source is "pending",
+        or "none" while a recent failure for the cell is remembered.
+        """
+        address = self.get(latitude, longitude)
+        if address:
+            return address, "cache"
+
+        key = self.cell_key(latitude, longitude)
+        now = self._clock()
+        with self._lock:
+            if key not in self._filling:
+                failed_at = self._failed_at.get(key)
+                if failed_at is not None and now - failed_at < self.failure_ttl_seconds:
+                    return None, "none"
+                self._filling.add(key)
+                if self._executor is None:
+                    self._executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=self.FILL_WORKERS,
+                        thread_name_prefix="reverse-geocode-fill",
+                    )
+                self._executor.submit(self._fill, app, key, latitude, longitude, geocoder)
+        return None, "pending"
+
+    def _fill(self, app, key: str, latitude: float, longitude: float, geocoder):
+        address = None
+        try:
+            with app.app_context():
+                try:
+                    address, _ = self.resolve(latitude, longitude, geocoder)
+                finally:
+                    db.session.remove()
+        except Exception as exc:
+            logger.warning("Background reverse geocode failed for %s: %s", key, exc)
+
+        now = self._clock()
+        with self._lock:
+            self._filling.discard(key)
+            if address:
+                self._failed_at.pop(key, None)
+                return
+            self._failed_at = {
+                cell: failed_at
+                for cell, failed_at in self._failed_at.items()
+                if now - failed_at < self.failure_ttl_seconds
+            }
+            self._failed_at[key] = now
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        lat_step = self.cell_meters / _METERS_PER_DEGREE_LAT
+        row = math.floor(latitude / lat_step)
+        # Longitude cells are widened by the row's latitude so they stay roughly square.
+        row_center = (row + 0.5) * lat_step
+        lng_step = lat_step / max(math.cos(math.radians(row_center)), 0.01)
+        return row, math.floor(longitude / lng_step)
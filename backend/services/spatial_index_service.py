@@ -0,0 +1,90 @@
+import logging
+from typing import List, Tuple
+
+from sqlalchemy import column, select, table, text
+
+from database import RESTAURANT_RTREE_TABLE, db
+from models.restaurant import Restaurant
+from utils.coordinates import bounding_box, haversine_distance
+
+logger = logging.getLogger(__name__)
+
+_rtree = table(
+    RESTAURANT_RTREE_TABLE,
+    column("id"),
+    column("min_lat"),
+    column("max_lat"),
+    column("min_lng"),
+    column("max_lng"),
+)
+
+
+class SpatialIndexService:
+    """
+    Radius lookups over stored restaurants.
+
+    A bounding box around the circle picks candidates from the SQLite R*Tree
+    (see database.ensure_sqlite_spatial_index) or, on other engines, from the
+    (latitude, longitude) index. Only those candidates get the exact haversine
+    check.
+    """
+
+    def nearby(
+        self,
+        latitude: float,
+        longitude: float,
+        radius: float,
+        query=None,
+    ) -> List[Tuple[Restaurant, float]]:
+        """Return (restaurant, distance) within `radius` meters, nearest first."""
+        query = self.filter_bounding_box(
+            query if query is not None else Restaurant.query,
+            latitude,
+            longitude,
+            radius,
+        )
+
+        rows = []
+        for restaurant in query.all():
+            if restaurant.latitude is None or restaurant.longitude is None:
+                continue
+
+            distance = haversine_distance(latitude, longitude, restaurant.latitude, restaurant.longitude)
+            if distance <= radius:
+                rows.append((restaurant, distance))
+
+        rows.sort(key=lambda row: row[1])
+        return rows
+
+    def filter_bounding_box(self, query, latitude: float, longitude: float, radius: float):
+        return self.filter_bounds(query, *bounding_box(latitude, longitude, radius))
+
+    def filter_bounds(self, query, south: float, north: float, west: float, east: float):
+        if self.has_rtree():
+            candidate_ids = select(_rtree.c.id).where(
+                _rtree.c.max_lat >= south,
+                _rtree.c.min_lat <= north,
+                _rtree.c.max_lng >= west,
+                _rtree.c.min_lng <= east,
+            )
+            return query.filter(Restaurant.id.in_(candidate_ids))
+
+        return query.filter(
+            Restaurant.latitude.between(south, north),
+            Restaurant.longitude.between(west, east),
+        )
+
+    @staticmethod
+    def has_rtree() -> bool:
+        if db.engine.dialect.name != "sqlite":
+            return False
+
+        try:
+            row = db.session.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": RESTAURANT_RTREE_TABLE},
+            ).first()
+        except Exception as exc:
+            logger.warning("Spatial index lookup failed: %s", exc)
+            return False
+        return row is not None
@@ -1,12 +1,19 @@
 import json
+import time
+from datetime import datetime, timedelta, timezone
 from types import SimpleNamespace
 from unittest.mock import patch
 
 import pytest
+from sqlalchemy import event
 
+from api import restaurant as restaurant_api
+from api.restaurant import _build_place_id, get_or_create_restaurants
 from app import create_app
 from database import db
+from models.menu import Menu
 from models.restaurant import Restaurant
+from services.menu_service import MenuService
 
 
 @pytest.fixture
@@ -34,6 +41,18 @@ def client(app):
     return app.test_client()
 
 
+@pytest.fixture(autouse=True)
+def reverse_geocoder():
+    # Searches without location_hint reverse geocode; keep tests off the network.
+    with patch(
+        "api.naver_geocoding.NaverGeocodingClient.coord_to_address", return_value=None
+    ) as mock_reverse:
+        yield mock_reverse
+        # Background fills must not outlive this app, nor its failures leak into other tests.
+        _wait_for_reverse_geocode_fills()
+        restaurant_api.reverse_geocode_cache._failed_at.clear()
+
+
 def test_health_check(client):
     response = client.get("/api/health")
     assert response.status_code == 200
@@ -67,7 +86,8 @@ def test_search_restaurants_budget_filter(client):
     ]
 
     with patch("api.restaurant.NaverMapClient.search_local", return_value=mocked_results), patch(
-        "api.restaurant.menu_service.get_menus", return_value=mocked_menus
+        "api.restaurant.menu_service.get_menus_bulk",
+        side_effect=lambda restaurants, **kwargs: {row.id: mocked_menus for row in restaurants},
     ):
         response = client.post(
             "/api/restaurants/search",
@@ -107,7 +127,8 @@ def test_search_restaurants_excludes_when_budget_and_menu_missing(client):
     ]
 
     with patch("api.restaurant.NaverMapClient.search_local", return_value=mocked_results), patch(
-        "api.restaurant.menu_service.get_menus", return_value=[]
+        "api.restaurant.menu_service.get_menus_bulk",
+        side_effect=lambda restaurants, **kwargs: {row.id: [] for row in restaurants},
     ):
         response = client.post(
             "/api/restaurants/search",
@@ -215,6 +236,39 @@ def test_nearby_restaurants_endpoint(client, app):
     assert data["results"][0]["name"] == "가까운식당"
 
 
+def test_nearby_restaurants_filters_by_stored_price_stats(client, app):
+    with app.app_context():
+        cheap = Restaurant(place_id="cheap-1", name="싼식당", latitude=37.5665, longitude=126.9780)
+        pricey = Restaurant(place_id="pricey-1", name="비싼식당", latitude=37.5667, longitude=126.9782)
+        unpriced = Restaurant(place_id="unpriced-1", name="가격없음", latitude=37.5664, longitude=126.9779)
+        db.session.add_all([cheap, pricey, unpriced])
+        db.session.commit()
+        service = MenuService()
+        for restaurant, prices in ((cheap, (7000, 25000)), (pricey, (13000, 14000))):
+            for price in prices:
+                service.add_user_contribution(restaurant.id, f"메뉴{price}", price)
+
+    response = client.get("/api/restaurants/nearby?lat=37.5665&lng=126.9780&radius=1000&budget=10000")
+    data = response.get_json()
+    assert response.status_code == 200
+    assert [row["name"] for row in data["results"]] == ["싼식당"]
+    assert data["budget_type"] == "menu"
+
+    response = client.get(
+        "/api/restaurants/nearby?lat=37.5665&lng=126.9780&radius=1000&budget=14000&budget_type=average"
+    )
+    assert [row["name"] for row in response.get_json()["results"]] == ["비싼식당"]
+
+    with app.app_context():
+        # Expired prices no longer exclude the restaurant; its menus need a re-check.
+        pricey = Restaurant.query.filter_by(place_id="pricey-1").one()
+        pricey.menus_fresh_until = datetime.now(timezone.utc) - timedelta(hours=1)
+        db.session.commit()
+
+    response = client.get("/api/restaurants/nearby?lat=37.5665&lng=126.9780&radius=1000&budget=10000")
+    assert [row["name"] for row in response.get_json()["results"]] == ["싼식당", "비싼식당"]
+
+
 def test_reverse_geocode_validation(client):
     response = client.get("/api/geocode/reverse")
     assert response.status_code == 400
@@ -222,10 +276,304 @@ def test_reverse_geocode_validation(client):
 
 
 def test_reverse_geocode_success(client):
-    with patch("api.restaurant.NaverGeocodingClient.coord_to_address", return_value="서울시 중구"):
+    with patch("api.naver_geocoding.NaverGeocodingClient.coord_to_address", return_value="서울시 중구"):
         response = client.get("/api/geocode/reverse?lat=37.5665&lng=126.9780")
 
     assert response.status_code == 200
     data = response.get_json()
     assert data["address"] == "서울시 중구"
     assert data["latitude"] == 37.5665
+
+
+def test_geocode_uses_persistent_cache(client):
+    coord = {"address": "서울특별시 중구", "latitude": 37.5665, "longitude": 126.978, "source": "naver"}
+
+    with patch(
+        "api.naver_geocoding.NaverGeocodingClient.address_to_coord", return_value=coord
+    ) as mock_geocode:
+        first = client.get("/api/geocode?query=서울시 중구")
+        second = client.get("/api/geocode?query=서울시  중구")
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert second.get_json()["latitude"] == 37.5665
+    mock_geocode.assert_called_once()
+
+
+def test_geocode_caches_not_found(client):
+    def not_found(query, outcome=None):
+        outcome["answered"] = True
+        return None
+
+    with patch(
+        "api.naver_geocoding.NaverGeocodingClient.address_to_coord", side_effect=not_found
+    ) as mock_geocode:
+        first = client.get("/api/geocode?query=없는주소")
+        second = client.get("/api/geocode?query=없는주소")
+
+    assert first.status_code == 404
+    assert second.status_code == 404
+    mock_geocode.assert_called_once()
+
+
+def test_geocode_does_not_cache_failed_lookups(client):
+    # No upstream answered (timeouts, 5xx, rate limits), so the next request retries.
+    with patch(
+        "api.naver_geocoding.NaverGeocodingClient.address_to_coord", return_value=None
+    ) as mock_geocode:
+        client.get("/api/geocode?query=장애주소")
+        client.get("/api/geocode?query=장애주소")
+
+    assert mock_geocode.call_count == 2
+
+
+def _search_item(title):
+    return {
+        "title": title,
+        "category": "한식",
+        "address": f"서울시 중구 {title}",
+        "road_address": "",
+        "latitude": 37.5665,
+        "longitude": 126.9780,
+        "telephone": "",
+        "link": "",
+    }
+
+
+def test_get_or_create_restaurants_bulk_inserts_missing_rows(app):
+    with app.app_context():
+        existing_item = _search_item("기존식당")
+        db.session.add(
+            Restaurant(
+                place_id=_build_place_id(existing_item),
+                name="기존식당",
+                latitude=37.5665,
+                longitude=126.9780,
+            )
+        )
+        db.session.commit()
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        items = [existing_item, _search_item("새식당1"), _search_item("새식당2"), _search_item("새식당1")]
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            restaurants = get_or_create_restaurants(items)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+
+        assert len(restaurants) == 3
+        assert Restaurant.query.count() == 3
+        assert restaurants[_build_place_id(items[1])].name == "새식당1"
+        assert len([sql for sql in statements if sql.lstrip().upper().startswith("INSERT")]) == 1
+        assert len([sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]) == 2
+
+
+def test_get_or_create_restaurants_skips_rows_inserted_concurrently(app, caplog):
+    with app.app_context():
+        item = _search_item("경쟁식당")
+        place_id = _build_place_id(item)
+
+        db.session.add(Restaurant(place_id=place_id, name="경쟁식당", latitude=37.5, longitude=126.9))
+        db.session.commit()
+
+        # The lookup misses the row another worker just inserted.
+        with patch("api.restaurant.Restaurant.query") as mock_query:
+            mock_query.filter.return_value.all.return_value = []
+            get_or_create_restaurants([item])
+
+        assert Restaurant.query.filter_by(place_id=place_id).count() == 1
+        assert "Failed to create restaurants" not in caplog.text
+
+
+def test_search_deferred_menu_mode_returns_pending_and_resolves_in_background(client, app):
+    cached_item = _search_item("캐시식당")
+    pending_item = _search_item("대기식당")
+    pending_item["link"] = "https://map.naver.com/p/entry/place/654321"
+
+    with app.app_context():
+        cached_row = Restaurant(
+            place_id=_build_place_id(cached_item),
+            name="캐시식당",
+            latitude=37.5665,
+            longitude=126.9780,
+        )
+        db.session.add(cached_row)
+        db.session.commit()
+        db.session.add(Menu(restaurant_id=cached_row.id, name="김치찌개", price=8000, source="user"))
+        db.session.commit()
+
+    crawled = [{"name": "제육볶음", "price": 9000, "is_representative": True, "source": "naver"}]
+
+    with patch(
+        "api.restaurant.NaverMapClient.search_local",
+        return_value=[dict(cached_item), dict(pending_item)],
+    ), patch("api.restaurant.menu_service._crawl_menus", return_value=crawled) as mock_crawl:
+        response = client.post(
+            "/api/restaurants/search",
+            json={
+                "lat": 37.5665,
+                "lng": 126.9780,
+                "budget": 10000,
+                "query": "한식",
+                "menu_mode": "deferred",
+            },
+        )
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert [row["name"] for row in data["results"]] == ["캐시식당"]
+        assert data["results"][0]["menu_status"] == "ready"
+        assert [row["name"] for row in data["pending"]] == ["대기식당"]
+        assert data["pending"][0]["menu_status"] == "pending"
+        assert data["diagnostics"]["pending_menu"] == 1
+
+        token = data["search_token"]
+        status = None
+        for _ in range(100):
+            status = client.get(f"/api/restaurants/search/{token}").get_json()
+            if status["done"]:
+                break
+            time.sleep(0.05)
+
+    assert status["done"] is True
+    assert status["pending"] == 0
+    assert [row["name"] for row in status["results"]] == ["대기식당"]
+    assert status["results"][0]["representative_menus"] == [{"name": "제육볶음", "price": 9000}]
+    mock_crawl.assert_called_once()
+
+    follow_up = client.get(f"/api/restaurants/search/{token}?since={status['next']}").get_json()
+    assert follow_up["results"] == []
+
+
+def test_search_rejects_unknown_menu_mode(client):
+    response = client.post(
+        "/api/restaurants/search",
+        json={"lat": 37.5665, "lng": 126.9780, "menu_mode": "later"},
+    )
+    assert response.status_code == 400
+
+
+def test_poll_unknown_search_token(client):
+    response = client.get("/api/restaurants/search/not-a-token")
+    assert response.status_code == 404
+
+
+def test_search_streams_ndjson_results_with_summary_trailer(client):
+    near = _search_item("스트림식당")
+    far = dict(_search_item("먼식당"), latitude=35.1796, longitude=129.0756)
+
+    with patch(
+        "api.restaurant.NaverMapClient.iter_search_local",
+        return_value=iter([(0, near), (1, far)]),
+    ):
+        response = client.post(
+            "/api/restaurants/search",
+            json={"lat": 37.5665, "lng": 126.9780, "query": "한식", "stream": "ndjson"},
+        )
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [record["type"] for record in records] == ["result", "summary"]
+    assert records[0]["data"]["name"] == "스트림식당"
+    assert records[1]["data"]["count"] == 1
+    assert records[1]["data"]["diagnostics"]["raw_candidates"] == 2
+    assert records[1]["data"]["diagnostics"]["within_radius"] == 1
+
+
+def test_search_stream_resolves_candidates_in_batches(client):
+    items = [(index, _search_item(f"배치식당{index}")) for index in range(7)]
+
+    with patch("api.restaurant.NaverMapClient.iter_search_local", return_value=iter(items)), patch(
+        "api.restaurant._STREAM_BATCH_SECONDS", 60
+    ), patch("api.restaurant._resolve_candidates", wraps=restaurant_api._resolve_candidates) as resolve:
+        response = client.post(
+            "/api/restaurants/search",
+            json={"lat": 37.5665, "lng": 126.9780, "query": "한식", "stream": "ndjson"},
+        )
+        records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert [len(call.args[0]) for call in resolve.call_args_list] == [5, 2]
+    assert [record["data"]["name"] for record in records[:-1]] == [f"배치식당{index}" for index in range(7)]
+    assert records[-1]["data"]["count"] == 7
+
+
+def test_search_streams_server_sent_events_from_accept_header(client):
+    with patch(
+        "api.restaurant.NaverMapClient.iter_search_local",
+        return_value=iter([(0, _search_item("이벤트식당"))]),
+    ):
+        response = client.post(
+            "/api/restaurants/search",
+            json={"lat": 37.5665, "lng": 126.9780, "query": "한식"},
+            headers={"Accept": "text/event-stream"},
+        )
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    events = [chunk for chunk in response.get_data(as_text=True).split("\n\n") if chunk]
+    assert events[0].startswith("event: result\ndata: ")
+    assert json.loads(events[0].split("data: ", 1)[1])["name"] == "이벤트식당"
+    assert events[-1].startswith("event: summary\n")
+
+
+def test_search_rejects_unknown_stream_format(client):
+    response = client.post(
+        "/api/restaurants/search",
+        json={"lat": 37.5665, "lng": 126.9780, "stream": "xml"},
+    )
+    assert response.status_code == 400
+
+
+def test_upstream_clients_are_app_scoped(app):
+    from api.clients import get_geocoding_client, get_naver_map_client
+
+    with app.test_request_context():
+        map_client = get_naver_map_client()
+        assert map_client is get_naver_map_client()
+        assert map_client.geocoder is get_geocoding_client()
+        assert map_client.client_id == "test-id"
+
+
+def test_search_derives_location_hint_from_snapped_reverse_geocode_cache(client, reverse_geocoder):
+    reverse_geocoder.return_value = "서울특별시 중구 태평로1가"
+
+    with patch("api.restaurant.NaverMapClient.search_local", return_value=[]) as mock_search:
+        # The miss does not wait for the geocoder; the cell is filled in the background.
+        first = client.post("/api/restaurants/search", json={"lat": 37.56650, "lng": 126.97800})
+        _wait_for_reverse_geocode_fills()
+        # About 20 m away: same ~100 m cell, so no second reverse geocode.
+        second = client.post("/api/restaurants/search", json={"lat": 37.56665, "lng": 126.97810})
+        explicit = client.post(
+            "/api/restaurants/search",
+            json={"lat": 37.5665, "lng": 126.978, "location_hint": "종로구"},
+        )
+
+    assert reverse_geocoder.call_count == 1
+    assert first.get_json()["diagnostics"]["location_hint_source"] == "pending"
+    assert second.get_json()["diagnostics"]["location_hint_source"] == "cache"
+    assert explicit.get_json()["diagnostics"]["location_hint_source"] == "client"
+    hints = [call.kwargs["location_hint"] for call in mock_search.call_args_list]
+    assert hints == ["", "서울특별시 중구 태평로1가", "종로구"]
+
+
+def test_failed_reverse_geocode_is_not_retried_on_every_search(client, reverse_geocoder):
+    with patch("api.restaurant.NaverMapClient.search_local", return_value=[]):
+        first = client.post("/api/restaurants/search", json={"lat": 35.1796, "lng": 129.0756})
+        _wait_for_reverse_geocode_fills()
+        second = client.post("/api/restaurants/search", json={"lat": 35.1796, "lng": 129.0756})
+
+    assert reverse_geocoder.call_count == 1
+    assert first.get_json()["diagnostics"]["location_hint_source"] == "pending"
+    assert second.get_json()["diagnostics"]["location_hint_source"] == "none"
+
+
+def _wait_for_reverse_geocode_fills(timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while restaurant_api.reverse_geocode_cache._filling and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not restaurant_api.reverse_geocode_cache._filling
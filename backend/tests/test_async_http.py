@@ -0,0 +1,211 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from api import naver_map
+from api.naver_geocoding import NaverGeocodingClient
+from api.naver_map import NaverMapClient
+from utils.async_http import AsyncRequestError, AsyncResponse, AsyncUpstreamEngine
+from utils.rate_limiter import SQLiteTokenBucket, configure_rate_limiters
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    active = 0
+    peak_active = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/slow":
+            with _StubHandler.lock:
+                _StubHandler.active += 1
+                _StubHandler.peak_active = max(_StubHandler.peak_active, _StubHandler.active)
+            time.sleep(0.05)
+            with _StubHandler.lock:
+                _StubHandler.active -= 1
+        elif path == "/hang":
+            time.sleep(1)
+
+        if path == "/chunked":
+            self.send_response(200)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for chunk in (b'{"items": ', b"[1, 2, 3]}"):
+                self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+            return
+
+        body = json.dumps({"path": path, "query": parse_qs(urlsplit(self.path).query)}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    _StubHandler.active = 0
+    _StubHandler.peak_active = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def engine():
+    engine = AsyncUpstreamEngine()
+    yield engine
+    engine.close()
+
+
+def test_sequential_requests_reuse_one_connection(stub_server, engine):
+    for index in range(5):
+        response = engine.run(engine.get(f"{stub_server}/ping", params={"n": index}))
+        assert response.status_code == 200
+        assert response.json()["query"] == {"n": [str(index)]}
+
+    assert engine.transport.connections_opened == 1
+    assert engine.stats()["127.0.0.1"]["requests"] == 5
+
+
+def test_chunked_body_is_decoded(stub_server, engine):
+    response = engine.run(engine.get(f"{stub_server}/chunked"))
+
+    assert response.json() == {"items": [1, 2, 3]}
+
+
+def test_hundreds_of_calls_share_one_thread_under_host_limit(stub_server):
+    engine = AsyncUpstreamEngine(default_host_limit=5)
+    futures = [engine.submit(engine.get(f"{stub_server}/slow")) for _ in range(200)]
+
+    statuses = [future.result(timeout=30).status_code for future in futures]
+    engine.close()
+
+    assert statuses == [200] * 200
+    assert _StubHandler.peak_active <= 5
+    stats = engine.stats()["127.0.0.1"]
+    assert stats["peak_in_flight"] == 5
+    assert stats["in_flight"] == 0
+    assert engine.transport.connections_opened <= 5
+
+
+def test_close_cancels_pending_futures():
+    engine = AsyncUpstreamEngine()
+
+    async def never_finishes():
+        await asyncio.Event().wait()
+
+    future = engine.submit(never_finishes())
+    engine.close()
+
+    assert future.cancelled()
+
+
+def test_shared_limiter_is_acquired_off_the_event_loop(tmp_path, monkeypatch):
+    threads = []
+    original = SQLiteTokenBucket.try_acquire
+
+    def recording_try_acquire(self, tokens=1):
+        threads.append(threading.current_thread().name)
+        return original(self, tokens)
+
+    monkeypatch.setattr(SQLiteTokenBucket, "try_acquire", recording_try_acquire)
+    configure_rate_limiters(str(tmp_path / "limits.db"))
+    engine = AsyncUpstreamEngine(transport=_FakeTransport({"/ok": (200, {})}))
+    try:
+        response = engine.run(engine.get("https://openapi.naver.com/ok"))
+    finally:
+        engine.close()
+        configure_rate_limiters(None)
+
+    assert response.status_code == 200
+    assert threads
+    assert all(name != "upstream-asyncio" for name in threads)
+
+
+def test_timeout_raises_request_error(stub_server, engine):
+    with pytest.raises(AsyncRequestError):
+        engine.run(engine.get(f"{stub_server}/hang", timeout=0.1))
+
+    assert engine.stats()["127.0.0.1"]["errors"] == 1
+
+
+class _FakeTransport:
+    """Canned responses keyed by URL path, recording every request."""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.urls = []
+
+    async def request(self, method, url, headers):
+        self.urls.append(url)
+        status_code, payload = self.routes.get(urlsplit(url).path, (404, {}))
+        return AsyncResponse(status_code, {}, json.dumps(payload).encode())
+
+
+def test_geocoding_falls_back_to_nominatim_over_engine():
+    transport = _FakeTransport(
+        {
+            "/search": (200, [{"display_name": "Seoul", "lat": "37.5", "lon": "127.0"}]),
+        }
+    )
+    engine = AsyncUpstreamEngine(transport=transport)
+    client = NaverGeocodingClient("id", "secret", engine=engine)
+
+    coord = engine.run(client.address_to_coord_async("서울시청"))
+    engine.close()
+
+    assert coord == {"address": "Seoul", "latitude": 37.5, "longitude": 127.0, "source": "nominatim"}
+    hosts = [urlsplit(url).hostname for url in transport.urls]
+    assert hosts[-1] == "nominatim.openstreetmap.org"
+    assert len(hosts) == len(NaverGeocodingClient.GEOCODING_URLS) + 1
+
+
+def test_search_local_runs_pages_and_geocodes_on_engine():
+    naver_map._shared_page_cache.clear()
+    transport = _FakeTransport(
+        {
+            "/v1/search/local.json": (
+                200,
+                {
+                    "items": [
+                        {
+                            "title": "<b>맛집</b> 한식당",
+                            "category": "한식>백반",
+                            "address": "서울시 중구",
+                            "roadAddress": "서울시 중구 세종대로",
+                            "link": "https://map.naver.com/p/entry/place/123456",
+                        }
+                    ]
+                },
+            ),
+            "/map-geocode/v2/geocode": (
+                200,
+                {"addresses": [{"x": "126.978", "y": "37.5665", "roadAddress": "서울시 중구"}]},
+            ),
+        }
+    )
+    engine = AsyncUpstreamEngine(transport=transport)
+    geocoder = NaverGeocodingClient("cloud-id", "cloud-secret", engine=engine)
+    client = NaverMapClient("id", "secret", geocoder=geocoder, engine=engine)
+
+    results = client.search_local("한식", latitude=37.5665, longitude=126.978, radius=1500)
+    engine.close()
+    naver_map._shared_page_cache.clear()
+
+    assert [row["title"] for row in results] == ["맛집 한식당"]
+    assert results[0]["latitude"] == 37.5665
+    assert any("map-geocode" in url for url in transport.urls)
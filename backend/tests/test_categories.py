@@ -0,0 +1,21 @@
+from utils.categories import CategoryMatcher, category_matcher
+
+
+def test_matcher_reports_every_selected_category_in_one_scan():
+    matcher = CategoryMatcher(["일식", "회", "고기"])
+
+    assert matcher.matches("일식>초밥,롤", "스시 오마카세") == {"일식", "회"}
+    assert matcher.matches("한식>육류,고기요리", "") == {"고기"}
+    assert matcher.matches("양식", "파스타 하우스") == set()
+    assert matcher.matches_any("", "동네 삼 겹살")
+    assert not matcher.matches_any("카페>디저트", "")
+
+
+def test_matcher_keeps_alias_and_unknown_selection_semantics():
+    matcher = CategoryMatcher(["짬뽕", " Vegan ", ""])
+
+    # An alias selects its whole group under the canonical name.
+    assert matcher.matches("중식>중국요리", "") == {"중식"}
+    assert matcher.matches("", "vegan kitchen") == {"Vegan"}
+    assert not CategoryMatcher([""])
+    assert category_matcher(["회", "일식"]) is category_matcher(["일식", "회"])
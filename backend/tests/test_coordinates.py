@@ -0,0 +1,48 @@
+from utils.coordinates import (
+    bounding_box,
+    decode_naver_map_coordinates,
+    haversine_distance,
+    is_valid_korea_coordinate,
+    katec_to_wgs84,
+)
+
+
+def test_decode_wgs84_scaled_coordinates():
+    latitude, longitude = decode_naver_map_coordinates("1269780000", "375665000")
+    assert abs(latitude - 37.5665) < 1e-6
+    assert abs(longitude - 126.9780) < 1e-6
+
+
+def test_decode_legacy_katec_coordinates():
+    # Seoul City Hall in KATECH (TM128).
+    latitude, longitude = katec_to_wgs84(309947, 552092)
+    assert abs(latitude - 37.5665) < 0.001
+    assert abs(longitude - 126.9780) < 0.001
+
+    decoded = decode_naver_map_coordinates("309947", "552092")
+    assert decoded is not None
+    assert abs(decoded[0] - latitude) < 1e-9
+
+
+def test_decode_rejects_missing_or_out_of_range_values():
+    assert decode_naver_map_coordinates(None, "375665000") is None
+    assert decode_naver_map_coordinates("", "") is None
+    assert decode_naver_map_coordinates("abc", "375665000") is None
+    assert decode_naver_map_coordinates("0", "0") is None
+    # Valid WGS84 encoding, but far outside Korea.
+    assert decode_naver_map_coordinates("-740060000", "407128000") is None
+
+
+def test_is_valid_korea_coordinate():
+    assert is_valid_korea_coordinate(37.5665, 126.9780)
+    assert not is_valid_korea_coordinate(40.7128, -74.0060)
+    assert not is_valid_korea_coordinate(None, 126.9780)
+
+
+def test_bounding_box_encloses_radius():
+    south, north, west, east = bounding_box(37.5665, 126.9780, 1000)
+
+    for lat, lng in ((south, 126.9780), (north, 126.9780), (37.5665, west), (37.5665, east)):
+        assert haversine_distance(37.5665, 126.9780, lat, lng) >= 999
+    assert haversine_distance(37.5665, 126.9780, north, east) > 1000
+    assert bounding_box(89.999, 0.0, 1000)[2:] == (-180.0, 180.0)
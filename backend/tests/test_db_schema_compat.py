@@ -70,6 +70,8 @@ def test_create_app_upgrades_legacy_sqlite_restaurants_table():
 
         assert "road_address" in columns
         assert "review_count" in columns
+        assert "min_price" in columns
+        assert "menus_fresh_until" in columns
     finally:
         if db_path.exists():
             if app is not None:
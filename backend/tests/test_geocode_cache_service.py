@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import create_app
+from database import db
+from models.geocode_cache import GeocodeCache
+from services.geocode_cache_service import GeocodeCacheService
+
+
+@pytest.fixture
+def app():
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "NAVER_CLIENT_ID": "test-id",
+            "NAVER_CLIENT_SECRET": "test-secret",
+            "NAVER_CLOUD_ID": "test-cloud-id",
+            "NAVER_CLOUD_SECRET": "test-cloud-secret",
+        }
+    )
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_set_and_get_uses_normalized_address(app):
+    with app.app_context():
+        service = GeocodeCacheService()
+        service.set(
+            "서울시  중구 세종대로",
+            {"address": "서울특별시 중구 세종대로", "latitude": 37.5665, "longitude": 126.978, "source": "naver"},
+        )
+
+        hit, coord = service.get(" 서울시 중구   세종대로 ")
+
+        assert hit is True
+        assert coord["latitude"] == 37.5665
+        assert coord["source"] == "naver"
+
+
+def test_negative_entries_are_cached(app):
+    with app.app_context():
+        service = GeocodeCacheService()
+        service.set_many({"없는 주소": None})
+
+        hit, coord = service.get("없는 주소")
+
+        assert hit is True
+        assert coord is None
+        row = GeocodeCache.query.one()
+        assert row.found is False
+
+
+def test_expired_entries_are_ignored(app):
+    with app.app_context():
+        service = GeocodeCacheService()
+        service.set("서울시 중구", {"latitude": 37.5, "longitude": 126.9, "source": "nominatim"})
+
+        row = GeocodeCache.query.one()
+        row.expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+        db.session.commit()
+
+        assert service.get("서울시 중구") == (False, None)
+        assert service.get_many(["서울시 중구", "다른 주소"]) == {}
+
+
+def test_set_many_updates_existing_rows(app):
+    with app.app_context():
+        service = GeocodeCacheService()
+        service.set("서울시 중구", None)
+        # One address already cached does not hold back the rest of the batch.
+        service.set_many(
+            {
+                "서울시 중구": {"latitude": 37.5, "longitude": 126.9, "source": "naver"},
+                "서울시 종로구": {"latitude": 37.57, "longitude": 126.98, "source": "naver"},
+            }
+        )
+
+        assert GeocodeCache.query.count() == 2
+        hit, coord = service.get("서울시 중구")
+        assert hit is True
+        assert coord["longitude"] == 126.9
+        assert service.get("서울시 종로구")[1]["latitude"] == 37.57
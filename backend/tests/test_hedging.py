@@ -0,0 +1,128 @@
+import threading
+from unittest.mock import Mock, patch
+
+from api.naver_geocoding import NaverGeocodingClient
+from utils.hedging import HedgePolicy, Hedger
+from utils.latency import LatencyTracker
+
+
+def _hedger(**policy_kwargs):
+    policy_kwargs.setdefault("initial_delay", 0.05)
+    return Hedger(policies={"geocode": HedgePolicy(enabled=True, **policy_kwargs)})
+
+
+def test_slow_primary_is_hedged_and_backup_wins():
+    hedger = _hedger()
+    release = threading.Event()
+
+    def slow():
+        release.wait(2)
+        return "primary"
+
+    try:
+        assert hedger.call("geocode", [slow, lambda: "backup"]) == "backup"
+    finally:
+        release.set()
+
+    counters = hedger.stats()["call_types"]["geocode"]
+    assert counters["hedges"] == 1
+    assert counters["hedge_wins"] == 1
+
+
+def test_fast_primary_and_disabled_call_types_do_not_hedge():
+    hedger = _hedger()
+    backup = Mock(return_value="backup")
+
+    assert hedger.call("geocode", [lambda: "primary", backup]) == "primary"
+    assert hedger.call("reverse_geocode", [lambda: "primary", backup]) == "primary"
+    backup.assert_not_called()
+
+
+def test_hedges_are_denied_when_budget_is_spent():
+    hedger = Hedger(
+        policies={"geocode": HedgePolicy(enabled=True, initial_delay=0.01)},
+        budget_ratio=0,
+        budget_burst=0,
+    )
+    backup = Mock(return_value="backup")
+    release = threading.Event()
+    spend_budget = hedger._spend_budget
+
+    def spend_then_release(call_type):
+        # The primary only finishes once the hedge decision has been made.
+        try:
+            return spend_budget(call_type)
+        finally:
+            release.set()
+
+    def slow():
+        assert release.wait(2)
+        return "primary"
+
+    with patch.object(hedger, "_spend_budget", side_effect=spend_then_release):
+        assert hedger.call("geocode", [slow, backup]) == "primary"
+    backup.assert_not_called()
+    assert hedger.stats()["call_types"]["geocode"]["hedges_denied"] == 1
+
+
+def test_saturated_pool_runs_primary_on_caller_thread_without_hedging():
+    hedger = Hedger(
+        policies={"geocode": HedgePolicy(enabled=True, initial_delay=0.01)},
+        max_workers=1,
+    )
+    backup = Mock(return_value="backup")
+    threads = []
+
+    def primary():
+        threads.append(threading.current_thread())
+        return "primary"
+
+    # Another hedged call holds the only worker.
+    assert hedger._slots.acquire(blocking=False)
+    try:
+        assert hedger.call("geocode", [primary, backup]) == "primary"
+    finally:
+        hedger._slots.release()
+
+    assert threads == [threading.current_thread()]
+    backup.assert_not_called()
+    counters = hedger.stats()["call_types"]["geocode"]
+    assert counters["saturated"] == 1
+    assert counters["hedges"] == 0
+
+
+def test_hedge_delay_follows_observed_percentile():
+    tracker = LatencyTracker()
+    hedger = Hedger(
+        policies={"geocode": HedgePolicy(enabled=True, initial_delay=1.0, min_samples=10)},
+        tracker=tracker,
+    )
+    assert hedger.hedge_delay("geocode") == 1.0
+
+    for index in range(1, 11):
+        tracker.observe("geocode", index / 10)
+    assert hedger.hedge_delay("geocode") == 0.9
+
+
+def test_geocoding_hedge_goes_to_next_gateway():
+    client = NaverGeocodingClient("id", "secret", hedger=_hedger())
+    primary, secondary, _ = NaverGeocodingClient.GEOCODING_URLS
+    release = threading.Event()
+
+    def fake_get(url, **kwargs):
+        if url == primary:
+            release.wait(2)
+            return Mock(status_code=503, text="")
+        return Mock(
+            status_code=200,
+            json=Mock(return_value={"addresses": [{"x": "127.0", "y": "37.5"}]}),
+        )
+
+    with patch.object(client.http, "get", side_effect=fake_get) as get:
+        try:
+            coord = client.address_to_coord("seoul")
+        finally:
+            release.set()
+
+    assert coord["source"] == "naver"
+    assert [call.args[0] for call in get.call_args_list] == [primary, secondary]
@@ -0,0 +1,120 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock
+
+import pytest
+
+from utils.http_client import PooledHttpClient
+from utils.latency import AdaptiveTimeouts
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_sequential_requests_reuse_one_connection(stub_server):
+    client = PooledHttpClient()
+
+    for _ in range(5):
+        assert client.get(f"{stub_server}/ping", timeout=5).json() == {"ok": True}
+
+    stats = client.stats()["127.0.0.1"]
+    assert stats["requests"] == 5
+    assert stats["errors"] == 0
+    assert stats["in_flight"] == 0
+    assert stats["connections_opened"] == 1
+    client.close()
+
+
+def test_concurrent_requests_are_counted_per_host(stub_server):
+    client = PooledHttpClient(default_pool_maxsize=4)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        statuses = list(
+            executor.map(lambda _: client.get(f"{stub_server}/ping", timeout=5).status_code, range(12))
+        )
+
+    stats = client.stats()["127.0.0.1"]
+    assert statuses == [200] * 12
+    assert stats["requests"] == 12
+    assert 1 <= stats["peak_in_flight"] <= 4
+    client.close()
+
+
+def test_failed_requests_are_counted_as_errors():
+    client = PooledHttpClient()
+
+    with pytest.raises(Exception):
+        client.get("http://127.0.0.1:9/unreachable", timeout=0.5)
+
+    assert client.stats()["127.0.0.1"]["errors"] == 1
+    client.close()
+
+
+def test_adaptive_timeout_tracks_p99_within_bounds():
+    timeouts = AdaptiveTimeouts(host_bounds={"api.example.com": (7.0, 1.5, 7.0)})
+    assert timeouts.timeout_for("api.example.com") == 7.0
+
+    for _ in range(AdaptiveTimeouts.MIN_SAMPLES):
+        timeouts.observe("api.example.com", 0.1)
+    assert timeouts.timeout_for("api.example.com") == 1.5  # 3 x p99 is below the floor
+
+    for _ in range(AdaptiveTimeouts.MIN_SAMPLES):
+        timeouts.observe("api.example.com", 1.0)
+    assert timeouts.timeout_for("api.example.com") == 3.0
+
+    for _ in range(AdaptiveTimeouts.MIN_SAMPLES):
+        timeouts.observe("api.example.com", 5.0)
+    assert timeouts.timeout_for("api.example.com") == 7.0
+
+
+def test_adaptive_timeout_recovers_when_latency_rises_past_it():
+    timeouts = AdaptiveTimeouts(host_bounds={"api.example.com": (7.0, 1.5, 7.0)})
+    for _ in range(AdaptiveTimeouts.MIN_SAMPLES):
+        timeouts.observe("api.example.com", 0.1)
+    assert timeouts.timeout_for("api.example.com") == 1.5
+
+    # Upstream now needs 4s: every call times out at the applied timeout.
+    for _ in range(10):
+        applied = timeouts.timeout_for("api.example.com")
+        if applied >= 4.0:
+            break
+        timeouts.observe_timeout("api.example.com", applied)
+
+    assert timeouts.timeout_for("api.example.com") >= 4.0
+
+
+def test_requests_without_timeout_use_adaptive_value(stub_server):
+    client = PooledHttpClient(host_timeouts={"127.0.0.1": (2.0, 0.5, 2.0)})
+    client.session.get = Mock(wraps=client.session.get)
+
+    client.get(f"{stub_server}/ping")
+
+    assert client.session.get.call_args.kwargs["timeout"] == 2.0
+    stats = client.stats()["127.0.0.1"]
+    assert stats["timeout_seconds"] == 2.0
+    assert stats["samples"] == 1
+    assert stats["p50_ms"] is not None
+    client.close()
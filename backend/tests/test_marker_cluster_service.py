@@ -0,0 +1,200 @@
+from unittest.mock import patch
+
+import pytest
+
+from app import create_app
+from database import db
+from config import Config
+from models.marker_cluster import MarkerCluster
+from models.marker_cluster_dirty_cell import MarkerClusterDirtyCell
+from models.menu import Menu
+from models.restaurant import Restaurant
+from services.marker_cluster_service import MarkerClusterService
+from services.menu_service import MenuService
+from utils.tiles import tile_bounds, world_position
+
+
+@pytest.fixture
+def app():
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "NAVER_CLIENT_ID": "test-id",
+            "NAVER_CLIENT_SECRET": "test-secret",
+            "NAVER_CLOUD_ID": "test-cloud-id",
+            "NAVER_CLOUD_SECRET": "test-cloud-secret",
+        }
+    )
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def _add(place_id, latitude, longitude, category="", prices=()):
+    restaurant = Restaurant(
+        place_id=place_id, name=place_id, category=category, latitude=latitude, longitude=longitude
+    )
+    db.session.add(restaurant)
+    db.session.flush()
+    for price in prices:
+        db.session.add(Menu(restaurant_id=restaurant.id, name=f"{place_id}-{price}", price=price))
+    MenuService()._update_price_stats(restaurant.id)
+    db.session.commit()
+    return restaurant
+
+
+def _snapshot():
+    return sorted(
+        (row.zoom, row.cell_x, row.cell_y, row.count, row.priced_count, row.min_price_sum,
+         row.category_counts, row.price_band_counts)
+        for row in MarkerCluster.query.all()
+    )
+
+
+def test_tile_math_round_trips():
+    x, y = world_position(37.5665, 126.9780, 12)
+    south, north, west, east = tile_bounds(12, int(x), int(y))
+
+    assert south <= 37.5665 <= north
+    assert west <= 126.9780 <= east
+
+
+def test_incremental_refresh_matches_full_rebuild(app):
+    service = MarkerClusterService()
+    added = [
+        _add("a", 37.5665, 126.9780, "한식>백반", prices=(8000, 12000)),
+        _add("b", 37.5670, 126.9790, "중식", prices=(15000,)),
+        _add("c", 37.4979, 127.0276, "한식"),
+        _add("d", 35.1796, 129.0756, "일식>초밥", prices=(35000,)),
+    ]
+    for restaurant in added:
+        service.mark_restaurant_ids([restaurant.id])
+    assert MarkerCluster.query.count() == 0
+    assert service.flush_dirty() == 4
+    assert MarkerClusterDirtyCell.query.count() == 0
+
+    moved = added[2]
+    old_point = (moved.latitude, moved.longitude)
+    moved.latitude, moved.longitude = 37.5668, 126.9785
+    db.session.commit()
+    service.refresh_points([old_point, (moved.latitude, moved.longitude)])
+
+    incremental = _snapshot()
+    assert service.rebuild() == len(incremental)
+    assert _snapshot() == incremental
+
+    world = MarkerCluster.query.filter_by(zoom=0).one()
+    assert world.count == 4
+    assert world.priced_count == 3
+
+
+def test_tile_endpoint_returns_clusters_then_restaurants_with_cache_headers(client, app):
+    with app.app_context():
+        _add("a", 37.5665, 126.9780, "한식>백반", prices=(8000,))
+        _add("b", 37.5670, 126.9790, "한식", prices=(12000,))
+        _add("busan", 35.1796, 129.0756, "일식")
+
+    with app.app_context():
+        MarkerClusterService().rebuild()
+
+    x, y = (int(value) for value in world_position(37.5665, 126.9780, 8))
+    response = client.get(f"/api/tiles/8/{x}/{y}")
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "public, max-age=60"
+    data = response.get_json()
+    assert data["type"] == "clusters"
+    assert [cluster["count"] for cluster in data["clusters"]] == [2]
+    cluster = data["clusters"][0]
+    assert cluster["top_categories"] == {"한식": 2}
+    assert cluster["price"] == {
+        "priced_count": 2,
+        "average_min_price": 10000,
+        "bands": {"0-10000": 1, "10000-20000": 1},
+    }
+
+    cached = client.get(f"/api/tiles/8/{x}/{y}", headers={"If-None-Match": response.headers["ETag"]})
+    assert cached.status_code == 304
+
+    x, y = (int(value) for value in world_position(37.5665, 126.9780, 16))
+    restaurants = client.get(f"/api/tiles/16/{x}/{y}").get_json()
+    assert restaurants["type"] == "restaurants"
+    assert [row["place_id"] for row in restaurants["restaurants"]] == ["a", "b"]
+    assert restaurants["truncated"] is False
+
+    assert client.get("/api/tiles/3/8/0").status_code == 400
+
+
+def test_cluster_tile_read_flushes_cells_marked_dirty(client, app):
+    with app.app_context():
+        restaurant = _add("a", 37.5665, 126.9780, "한식", prices=(8000,))
+        MarkerClusterService().mark_restaurant_ids([restaurant.id])
+        assert MarkerCluster.query.count() == 0
+
+    x, y = (int(value) for value in world_position(37.5665, 126.9780, 8))
+    data = client.get(f"/api/tiles/8/{x}/{y}").get_json()
+
+    assert [cluster["count"] for cluster in data["clusters"]] == [1]
+    with app.app_context():
+        assert MarkerClusterDirtyCell.query.count() == 0
+
+
+def test_restaurant_tiles_are_capped(client, app, monkeypatch):
+    monkeypatch.setattr(Config, "MAX_TILE_RESTAURANTS", 2)
+    with app.app_context():
+        for index in range(3):
+            _add(f"r{index}", 37.5665 + index / 100000, 126.9780)
+
+    x, y = (int(value) for value in world_position(37.5665, 126.9780, 16))
+    data = client.get(f"/api/tiles/16/{x}/{y}").get_json()
+
+    assert [row["place_id"] for row in data["restaurants"]] == ["r0", "r1"]
+    assert data["truncated"] is True
+
+
+def test_delivery_update_and_price_backfill_refresh_clusters(client, app):
+    response = client.post(
+        "/api/restaurants/new-place/delivery",
+        json={"name": "새식당", "latitude": 37.5665, "longitude": 126.9780, "delivery_fee": 1000},
+    )
+    assert response.status_code == 200
+
+    with app.app_context():
+        MarkerClusterService().flush_dirty()
+        world = MarkerCluster.query.filter_by(zoom=0).one()
+        assert (world.count, world.priced_count) == (1, 0)
+
+        restaurant = Restaurant.query.filter_by(place_id="new-place").one()
+        db.session.add(Menu(restaurant_id=restaurant.id, name="백반", price=9000))
+        restaurant.priced_menu_count = None
+        db.session.commit()
+
+        assert MenuService().backfill_price_stats() == 1
+        MarkerClusterService().flush_dirty()
+        world = MarkerCluster.query.filter_by(zoom=0).one()
+        assert (world.priced_count, world.min_price_sum) == (1, 9000)
+
+
+def test_bulk_menu_crawl_refreshes_clusters_once_per_batch(app):
+    restaurants = [_add(f"r{index}", 37.5665 + index / 1000, 126.9780) for index in range(3)]
+    service = MenuService()
+    crawled = {
+        restaurant.id: [{"name": "메뉴", "price": 7000 + restaurant.id, "source": "naver"}]
+        for restaurant in restaurants
+    }
+
+    with patch.object(service, "_crawl_menus_concurrently", return_value=crawled), patch.object(
+        service.marker_clusters, "mark_restaurant_ids"
+    ) as refresh:
+        service.get_menus_bulk(restaurants)
+
+    refresh.assert_called_once()
+    assert sorted(refresh.call_args.args[0]) == sorted(crawled)
@@ -1,3 +1,4 @@
+import threading
 from unittest.mock import patch
 
 import pytest
@@ -132,3 +133,107 @@ def test_get_menus_repairs_broken_cached_menu_name(app, restaurant):
 
         assert len(menus) == 1
         assert menus[0].name == "생삼겹살"
+
+
+def test_get_menus_bulk_loads_cache_with_one_query(app, restaurant):
+    with app.app_context():
+        first = db.session.get(Restaurant, restaurant)
+        second = Restaurant(place_id="other-place", name="Other", latitude=37.5, longitude=126.9)
+        third = Restaurant(place_id="empty-place", name="Empty", latitude=37.5, longitude=126.9)
+        db.session.add_all([second, third])
+        db.session.commit()
+
+        db.session.add_all(
+            [
+                Menu(restaurant_id=first.id, name="First Menu", price=8000, source="user"),
+                Menu(restaurant_id=second.id, name="Second Menu", price=9000, source="user"),
+                Menu(restaurant_id=second.id, name="Second Side", price=3000, source="user"),
+            ]
+        )
+        db.session.commit()
+
+        service = MenuService()
+        with patch.object(service, "_get_cached_menus_bulk", wraps=service._get_cached_menus_bulk) as mock_bulk, patch.object(
+            service, "_crawl_menus"
+        ) as mock_crawl:
+            menus_by_id = service.get_menus_bulk([first, second, third], allow_crawl=False)
+
+        mock_bulk.assert_called_once()
+        mock_crawl.assert_not_called()
+        assert [menu.name for menu in menus_by_id[first.id]] == ["First Menu"]
+        assert [menu.name for menu in menus_by_id[second.id]] == ["Second Menu", "Second Side"]
+        assert menus_by_id[third.id] == []
+
+
+def test_get_menus_bulk_crawls_only_cache_misses(app, restaurant):
+    with app.app_context():
+        cached_row = db.session.get(Restaurant, restaurant)
+        missing_row = Restaurant(place_id="missing-place", name="Missing", latitude=37.5, longitude=126.9)
+        db.session.add(missing_row)
+        db.session.commit()
+        db.session.add(Menu(restaurant_id=cached_row.id, name="Cached Menu", price=8000, source="user"))
+        db.session.commit()
+
+        service = MenuService()
+        fake_menu_data = [{"name": "Crawled Menu", "price": 7000, "source": "naver"}]
+        with patch.object(service, "_crawl_menus", return_value=fake_menu_data) as mock_crawl:
+            menus_by_id = service.get_menus_bulk(
+                [cached_row, missing_row],
+                naver_links={missing_row.id: "https://map.naver.com/p/entry/place/123456"},
+                allow_crawl=True,
+            )
+
+        mock_crawl.assert_called_once()
+        assert mock_crawl.call_args.args[1] == "https://map.naver.com/p/entry/place/123456"
+        assert [menu.name for menu in menus_by_id[missing_row.id]] == ["Crawled Menu"]
+        assert [menu.name for menu in menus_by_id[cached_row.id]] == ["Cached Menu"]
+
+
+def test_get_menus_bulk_crawls_misses_concurrently(app):
+    with app.app_context():
+        rows = [
+            Restaurant(place_id=f"crawl-{index}", name=f"Crawl {index}", latitude=37.5, longitude=126.9)
+            for index in range(3)
+        ]
+        db.session.add_all(rows)
+        db.session.commit()
+
+        service = MenuService()
+        barrier = threading.Barrier(3, timeout=5)
+        seen_threads = set()
+
+        def fake_crawl(snapshot, naver_link=None):
+            seen_threads.add(threading.get_ident())
+            # Every crawl must be in flight at the same time to pass the barrier.
+            barrier.wait()
+            return [{"name": f"{snapshot.name} Menu", "price": 5000, "source": "naver"}]
+
+        with patch.object(service, "_crawl_menus", side_effect=fake_crawl):
+            menus_by_id = service.get_menus_bulk(rows, allow_crawl=True)
+
+        assert len(seen_threads) == 3
+        assert threading.get_ident() not in seen_threads
+        assert [menus_by_id[row.id][0].name for row in rows] == ["Crawl 0 Menu", "Crawl 1 Menu", "Crawl 2 Menu"]
+
+
+def test_saved_and_contributed_menus_refresh_restaurant_price_stats(app, restaurant):
+    with app.app_context():
+        service = MenuService()
+        service._save_menus(
+            restaurant,
+            [
+                {"name": "Kimchi Jjigae", "price": 9000, "source": "naver"},
+                {"name": "Bibimbap", "price": 12000, "source": "naver"},
+                {"name": "Side Dish", "price": None, "source": "naver"},
+            ],
+        )
+
+        row = db.session.get(Restaurant, restaurant)
+        assert (row.min_price, row.avg_price, row.max_price, row.priced_menu_count) == (9000, 10500.0, 12000, 2)
+        assert row.menus_fresh_until is not None
+
+        service.add_user_contribution(restaurant, "Gimbap", 3000)
+
+        row = db.session.get(Restaurant, restaurant)
+        assert (row.min_price, row.avg_price, row.max_price, row.priced_menu_count) == (3000, 8000.0, 12000, 3)
+        assert row.to_dict()["min_price"] == 3000
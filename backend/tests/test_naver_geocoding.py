@@ -0,0 +1,126 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+import requests
+
+from api.naver_geocoding import NaverGeocodingClient
+from utils.circuit_breaker import STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, CircuitBreaker
+
+PRIMARY, SECONDARY, _ = NaverGeocodingClient.GEOCODING_URLS
+
+
+def _geocode_response():
+    return Mock(
+        status_code=200,
+        json=Mock(
+            return_value={"addresses": [{"x": "127.0", "y": "37.5", "roadAddress": "Seoul"}]}
+        ),
+    )
+
+
+def test_circuit_breaker_opens_then_probes_once():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+
+    breaker.record_failure()
+    assert breaker.state == STATE_CLOSED
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+    assert breaker.allow_request() is False
+
+    now[0] = 10
+    assert breaker.state == STATE_HALF_OPEN
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False  # only one probe at a time
+
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+
+    now[0] = 20
+    assert breaker.allow_request() is True
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+
+
+def test_dead_gateway_is_skipped_and_last_good_gateway_tried_first():
+    client = NaverGeocodingClient("id", "secret")
+    calls = []
+
+    def fake_get(url, **kwargs):
+        calls.append(url)
+        if url == PRIMARY:
+            raise requests.exceptions.ConnectTimeout("timed out")
+        return _geocode_response()
+
+    with patch.object(client.http, "get", side_effect=fake_get):
+        for _ in range(4):
+            assert client.address_to_coord("seoul")["source"] == "naver"
+
+    # First call walks primary -> secondary; afterwards secondary is preferred.
+    assert calls == [PRIMARY, SECONDARY, SECONDARY, SECONDARY, SECONDARY]
+
+
+def test_open_circuits_go_straight_to_nominatim():
+    client = NaverGeocodingClient("id", "secret")
+    for url in NaverGeocodingClient.GEOCODING_URLS:
+        breaker = client._breaker(url)
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+
+    osm = Mock(
+        status_code=200,
+        json=Mock(return_value=[{"display_name": "Seoul", "lat": "37.5", "lon": "127.0"}]),
+    )
+    with patch.object(client.http, "get", return_value=osm) as get:
+        coord = client.address_to_coord("seoul")
+
+    assert coord["source"] == "nominatim"
+    assert [call.args[0] for call in get.call_args_list] == [NaverGeocodingClient.OSM_SEARCH_URL]
+    assert client.endpoint_health()[PRIMARY] == STATE_OPEN
+
+
+def test_unexpected_errors_release_the_half_open_probe():
+    now = [0.0]
+    client = NaverGeocodingClient("id", "secret")
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    client._breakers[PRIMARY] = breaker
+    breaker.record_failure()
+    now[0] = 10
+
+    with patch.object(client.http, "get", side_effect=RuntimeError("boom")), pytest.raises(RuntimeError):
+        client._request_endpoint(PRIMARY, NaverGeocodingClient.GEOCODING_URLS, {}, set())
+
+    # The failed probe re-opened the circuit instead of holding the slot forever.
+    assert breaker.state == STATE_OPEN
+    now[0] = 20
+    assert breaker.allow_request() is True
+
+
+def test_cancelled_async_request_is_not_a_breaker_failure():
+    now = [0.0]
+    engine = Mock()
+    engine.get = AsyncMock(side_effect=asyncio.CancelledError())
+    client = NaverGeocodingClient("id", "secret", engine=engine)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    client._breakers[PRIMARY] = breaker
+    breaker.record_failure()
+    now[0] = 10
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(client._request_with_fallback_async(NaverGeocodingClient.GEOCODING_URLS, {}))
+
+    # The cancelled probe neither re-opened the circuit nor kept the slot.
+    assert breaker.state == STATE_HALF_OPEN
+    assert breaker.allow_request() is True
+
+
+def test_invalid_json_counts_as_endpoint_failure():
+    client = NaverGeocodingClient("id", "secret")
+    invalid = Mock(status_code=200, json=Mock(side_effect=ValueError("not json")))
+    breaker = client._breaker(PRIMARY)
+
+    with patch.object(client.http, "get", return_value=invalid):
+        assert client._request_endpoint(PRIMARY, NaverGeocodingClient.GEOCODING_URLS, {}, set()) is None
+
+    assert breaker._failures == 1
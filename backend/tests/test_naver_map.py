@@ -1,8 +1,20 @@
+import concurrent.futures
+import threading
 from unittest.mock import Mock, patch
 
+import pytest
 import requests
 
+from api import naver_map
 from api.naver_map import NaverMapClient
+from utils.ttl_cache import TTLCache
+
+
+@pytest.fixture(autouse=True)
+def clear_page_cache():
+    naver_map._shared_page_cache.clear()
+    yield
+    naver_map._shared_page_cache.clear()
 
 
 def _mock_response(status_code, payload):
@@ -34,7 +46,7 @@ def test_search_local_success_with_geocoding():
     }
 
     with patch(
-        "api.naver_map.requests.get",
+        "utils.http_client.PooledHttpClient.get",
         side_effect=[
             _mock_response(200, api_payload),
             _mock_response(200, {"items": []}),
@@ -60,7 +72,7 @@ def test_search_local_success_with_geocoding():
 def test_search_local_network_error_returns_empty():
     client = NaverMapClient(client_id="test-client-id", client_secret="test-client-secret")
 
-    with patch("api.naver_map.requests.get", side_effect=requests.exceptions.RequestException("boom")):
+    with patch("utils.http_client.PooledHttpClient.get", side_effect=requests.exceptions.RequestException("boom")):
         results = client.search_local("한식")
 
     assert results == []
@@ -88,7 +100,7 @@ def test_search_local_returns_fallback_when_out_of_radius():
     }
 
     with patch(
-        "api.naver_map.requests.get",
+        "utils.http_client.PooledHttpClient.get",
         side_effect=[
             _mock_response(200, api_payload),
             _mock_response(200, {"items": []}),
@@ -107,3 +119,524 @@ def test_search_local_returns_fallback_when_out_of_radius():
     assert len(results) == 1
     assert results[0]["title"] == "거리먼 식당"
     assert results[0]["distance"] > 100
+
+
+def test_search_local_uses_mapxy_without_geocoding():
+    client = NaverMapClient(
+        client_id="test-client-id",
+        client_secret="test-client-secret",
+        geocoding_client_id="test-cloud-id",
+        geocoding_client_secret="test-cloud-secret",
+    )
+
+    api_payload = {
+        "items": [
+            {
+                "title": "좌표 식당",
+                "category": "한식",
+                "address": "서울시 중구",
+                "roadAddress": "서울시 중구 세종대로",
+                "telephone": "",
+                "link": "",
+                "mapx": "1269780000",
+                "mapy": "375665000",
+            },
+            {
+                "title": "좌표없는 식당",
+                "category": "한식",
+                "address": "서울시 중구 을지로",
+                "roadAddress": "",
+                "telephone": "",
+                "link": "",
+                "mapx": "",
+                "mapy": "",
+            },
+        ]
+    }
+
+    with patch(
+        "utils.http_client.PooledHttpClient.get",
+        side_effect=[
+            _mock_response(200, api_payload),
+            _mock_response(200, {"items": []}),
+        ],
+    ), patch(
+        "api.naver_geocoding.NaverGeocodingClient.address_to_coord",
+        return_value={"latitude": 37.5660, "longitude": 126.9910, "address": "서울시 중구 을지로"},
+    ) as mock_geocode:
+        results = client.search_local(
+            "한식",
+            latitude=37.5665,
+            longitude=126.9780,
+            radius=2000,
+        )
+
+    assert len(results) == 2
+    assert [call.args for call in mock_geocode.call_args_list] == [("서울시 중구 을지로",)]
+    by_title = {row["title"]: row for row in results}
+    assert abs(by_title["좌표 식당"]["latitude"] - 37.5665) < 1e-6
+    assert by_title["좌표 식당"]["distance"] == 0
+
+
+class _FakeGeocodeCache:
+    def __init__(self, entries):
+        self.entries = dict(entries)
+        self.stored = {}
+
+    def get_many(self, addresses):
+        return {address: self.entries[address] for address in addresses if address in self.entries}
+
+    def set_many(self, results):
+        self.stored.update(results)
+
+
+def test_search_local_consults_geocode_cache_before_geocoding():
+    cache = _FakeGeocodeCache(
+        {"서울시 중구 세종대로": {"latitude": 37.5665, "longitude": 126.9780, "source": "naver"}}
+    )
+    client = NaverMapClient(
+        client_id="test-client-id",
+        client_secret="test-client-secret",
+        geocoding_client_id="test-cloud-id",
+        geocoding_client_secret="test-cloud-secret",
+        geocode_cache=cache,
+    )
+
+    api_payload = {
+        "items": [
+            {
+                "title": "캐시 식당",
+                "category": "한식",
+                "address": "서울시 중구",
+                "roadAddress": "서울시 중구 세종대로",
+            },
+            {
+                "title": "새 식당",
+                "category": "한식",
+                "address": "서울시 중구 을지로",
+                "roadAddress": "",
+            },
+            {
+                "title": "장애 식당",
+                "category": "한식",
+                "address": "서울시 중구 명동",
+                "roadAddress": "",
+            },
+        ]
+    }
+
+    def geocode(address, outcome=None):
+        # Upstream answers "not found" for 을지로; the 명동 lookup fails outright.
+        if address == "서울시 중구 을지로":
+            outcome["answered"] = True
+        return None
+
+    with patch(
+        "utils.http_client.PooledHttpClient.get",
+        side_effect=[
+            _mock_response(200, api_payload),
+            _mock_response(200, {"items": []}),
+        ],
+    ), patch(
+        "api.naver_geocoding.NaverGeocodingClient.address_to_coord",
+        side_effect=geocode,
+    ) as mock_geocode:
+        results = client.search_local("한식")
+
+    assert len(results) == 3
+    assert sorted(call.args[0] for call in mock_geocode.call_args_list) == [
+        "서울시 중구 명동",
+        "서울시 중구 을지로",
+    ]
+    # Only the definitive "not found" is cached; the failed lookup is retried later.
+    assert cache.stored == {"서울시 중구 을지로": None}
+    by_title = {row["title"]: row for row in results}
+    assert by_title["캐시 식당"]["latitude"] == 37.5665
+    assert by_title["새 식당"]["latitude"] is None
+
+
+def _paged_side_effect(pages, calls):
+    def fake_get(url, headers=None, params=None, timeout=None):
+        calls.append((params["query"], params["start"]))
+        items = pages.get((params["query"], params["start"]), [])
+        return _mock_response(200, {"items": items})
+
+    return fake_get
+
+
+def _place(name):
+    return {"title": name, "category": "한식", "address": f"서울시 {name}", "roadAddress": ""}
+
+
+def test_search_local_parallel_fetch_keeps_serial_order():
+    client = NaverMapClient(client_id="test-client-id", client_secret="test-client-secret")
+    pages = {
+        ("중구 한식", 1): [_place(f"a{i}") for i in range(5)],
+        ("중구 한식", 6): [_place("a5"), _place("a6")],
+        ("한식", 1): [_place("a0"), _place("b0"), _place("b1")],
+    }
+    calls = []
+
+    with patch("utils.http_client.PooledHttpClient.get", side_effect=_paged_side_effect(pages, calls)), patch(
+        "api.naver_geocoding.NaverGeocodingClient.address_to_coord", return_value=None
+    ):
+        results = client.search_local("한식", display=20, location_hint="중구")
+
+    assert [row["title"] for row in results] == [
+        "a0", "a1", "a2", "a3", "a4", "a5", "a6", "b0", "b1",
+    ]
+    # Short pages end a variant; prefetch never runs past PREFETCH_PAGES beyond it.
+    assert ("중구 한식", 16) not in calls
+    assert ("한식", 6) not in calls
+
+
+def test_search_local_parallel_fetch_respects_max_items():
+    client = NaverMapClient(client_id="test-client-id", client_secret="test-client-secret")
+    pages = {
+        ("중구 한식", start): [_place(f"a{start + i}") for i in range(5)]
+        for start in range(1, 100, 5)
+    }
+    pages[("한식", 1)] = [_place("b0")]
+    calls = []
+
+    with patch("utils.http_client.PooledHttpClient.get", side_effect=_paged_side_effect(pages, calls)), patch(
+        "api.naver_geocoding.NaverGeocodingClient.address_to_coord", return_value=None
+    ):
+        pages = list(client._iter_search_pages(["중구 한식", "한식"], max_items=7))
+        items = [item for page in pages for item in page]
+
+    assert [item["title"] for item in items] == ["a1", "a2", "a3", "a4", "a5", "a6", "a7"]
+    # Prefetching is bounded by how many items are still needed.
+    assert all(start <= 6 for query, start in calls if query == "중구 한식")
+
+
+def test_iter_search_local_yields_ready_items_while_geocoding_runs():
+    client = NaverMapClient(
+        client_id="test-client-id",
+        client_secret="test-client-secret",
+        geocoding_client_id="test-cloud-id",
+        geocoding_client_secret="test-cloud-secret",
+    )
+    api_payload = {
+        "items": [
+            {"title": "느린 식당", "category": "한식", "address": "서울시 중구 을지로", "roadAddress": ""},
+            {
+                "title": "좌표 식당",
+                "category": "한식",
+                "address": "서울시 중구",
+                "roadAddress": "",
+                "mapx": "1269780000",
+                "mapy": "375665000",
+            },
+        ]
+    }
+    release = threading.Event()
+
+    def slow_geocode(address, outcome=None):
+        release.wait(timeout=5)
+        return {"latitude": 37.5660, "longitude": 126.9910}
+
+    with patch(
+        "utils.http_client.PooledHttpClient.get",
+        side_effect=[_mock_response(200, api_payload)],
+    ), patch(
+        "api.naver_geocoding.NaverGeocodingClient.address_to_coord",
+        side_effect=slow_geocode,
+    ):
+        stream = client.iter_search_local("한식", latitude=37.5665, longitude=126.9780)
+        first_position, first = next(stream)
+        assert not release.is_set()
+        release.set()
+        rest = list(stream)
+
+    assert (first_position, first["title"], first["distance"]) == (1, "좌표 식당", 0)
+    assert [(position, row["title"]) for position, row in rest] == [(0, "느린 식당")]
+    assert rest[0][1]["latitude"] == 37.5660
+
+
+def test_search_page_cache_canonicalizes_query_and_reports_diagnostics():
+    client = NaverMapClient(client_id="test-client-id", client_secret="test-client-secret")
+    pages = {("중구 초밥", 1): [_place("c0")]}
+    calls = []
+    first_diagnostics = {}
+    second_diagnostics = {}
+
+    with patch("utils.http_client.PooledHttpClient.get", side_effect=_paged_side_effect(pages, calls)), patch(
+        "api.naver_geocoding.NaverGeocodingClient.address_to_coord", return_value=None
+    ):
+        first = client.search_local("초밥", location_hint="중구", diagnostics=first_diagnostics)
+        second = client.search_local("  스시 ", location_hint="중구", diagnostics=second_diagnostics)
+
+    assert [row["title"] for row in first] == ["c0"]
+    assert [row["title"] for row in second] == ["c0"]
+    assert first_diagnostics["page_cache_misses"] == len(calls)
+    assert first_diagnostics["page_cache_hits"] == 0
+    assert second_diagnostics["page_cache_misses"] == 0
+    assert second_diagnostics["page_cache_hits"] == first_diagnostics["page_cache_misses"]
+
+
+def test_search_page_cache_key_never_folds_terms_into_their_category():
+    keys = {
+        NaverMapClient._canonical_query(query)
+        for query in ("국밥", "한식", "국밥 한식", "중국집", "중식", "한식 한식")
+    }
+
+    assert len(keys) == 6
+    assert NaverMapClient._canonical_query("  서울  국밥 ") == NaverMapClient._canonical_query("서울 국밥")
+
+
+def test_search_page_cache_does_not_store_failures():
+    client = NaverMapClient(client_id="test-client-id", client_secret="test-client-secret")
+
+    with patch(
+        "utils.http_client.PooledHttpClient.get",
+        side_effect=[
+            _mock_response(500, {}),
+            _mock_response(200, {"items": [_place("d0")]}),
+        ],
+    ):
+        assert client._search_page("한식", start=1, display=5) == []
+        assert [item["title"] for item in client._search_page("한식", start=1, display=5)] == ["d0"]
+
+
+def test_ttl_cache_serves_stale_entries_while_refreshing():
+    now = [0.0]
+    cache = TTLCache(ttl=10, stale_ttl=20, clock=lambda: now[0])
+    refreshed = threading.Event()
+
+    def loader():
+        refreshed.set()
+        return "fresh"
+
+    cache.set("key", "old")
+    assert cache.get_or_load("key", loader) == ("old", "hit")
+
+    now[0] = 15.0
+    assert cache.get_or_load("key", loader) == ("old", "stale")
+    assert refreshed.wait(timeout=5)
+
+    now[0] = 100.0
+    assert cache.get("key") == ("miss", None)
+
+
+def test_search_local_stops_variant_after_pages_outside_radius():
+    client = NaverMapClient(client_id="test-client-id", client_secret="test-client-secret")
+
+    def far_place(name):
+        # Busan, far outside a 1 km radius around Seoul City Hall.
+        return dict(_place(name), mapx="1291604000", mapy="351587000")
+
+    pages = {
+        ("한식", 1): [dict(_place("near"), mapx="1269780000", mapy="375665000")]
+        + [far_place(f"f{i}") for i in range(4)],
+    }
+    for start in range(6, 100, 5):
+        pages[("한식", start)] = [far_place(f"f{start + i}") for i in range(5)]
+    calls = []
+    diagnostics = {}
+
+    with patch("utils.http_client.PooledHttpClient.get", side_effect=_paged_side_effect(pages, calls)):
+        results = client.search_local(
+            "한식",
+            latitude=37.5665,
+            longitude=126.9780,
+            radius=1000,
+            display=60,
+            diagnostics=diagnostics,
+        )
+
+    assert [row["title"] for row in results] == ["near"]
+    assert diagnostics["variant_stops"]["한식"] == "out_of_radius"
+    # Page 1 contributes, pages 2 and 3 do not; only prefetch may run past them.
+    assert max(start for _, start in calls) <= 21
+
+
+class _FakeVariantStats:
+    def __init__(self, yields):
+        self.yields = yields
+        self.recorded = []
+
+    def get_yields(self, kinds):
+        return {kind: self.yields[kind] for kind in kinds if kind in self.yields}
+
+    def record(self, observations):
+        self.recorded.append(observations)
+
+
+def test_query_plan_orders_variants_by_learned_yield():
+    stats = _FakeVariantStats({"hint+query": (20, 2), "query": (20, 80)})
+    client = NaverMapClient(
+        client_id="test-client-id",
+        client_secret="test-client-secret",
+        variant_stats=stats,
+    )
+
+    plan = client._order_query_plan(client._build_query_plan("한식", "중구", ["국밥"]))
+
+    assert plan[0] == ("query", "한식")
+    assert plan[-1] == ("hint+query", "중구 한식")
+    # Kinds without history keep their default relative order.
+    unseen = [kind for kind, _ in plan if kind not in stats.yields]
+    assert unseen == ["hint+category", "category", "query+category", "hint+query+category"]
+
+
+def test_search_skips_duplicate_variants_and_reports_spend():
+    stats = _FakeVariantStats({})
+    client = NaverMapClient(
+        client_id="test-client-id",
+        client_secret="test-client-secret",
+        variant_stats=stats,
+    )
+    first = [_place(f"a{i}") for i in range(5)]
+    pages = {
+        ("중구 한식", 1): first,
+        ("중구 한식", 6): [_place("a5")],
+        # The broader variant's first page repeats what the hinted one found.
+        ("한식", 1): first,
+        ("한식", 6): [_place(f"b{i}") for i in range(1, 6)],
+    }
+    calls = []
+    diagnostics = {}
+
+    with patch("utils.http_client.PooledHttpClient.get", side_effect=_paged_side_effect(pages, calls)), patch(
+        "api.naver_geocoding.NaverGeocodingClient.address_to_coord", return_value=None
+    ):
+        results = client.search_local("한식", display=40, location_hint="중구", diagnostics=diagnostics)
+
+    assert [row["title"] for row in results] == ["a0", "a1", "a2", "a3", "a4", "a5"]
+    by_query = {row["query"]: row for row in diagnostics["variants"]}
+    assert by_query["한식"]["stop"] == "duplicates"
+    assert by_query["한식"]["new_items"] == 0
+    assert by_query["중구 한식"]["new_items"] == 6
+    assert diagnostics["upstream_calls"] == sum(row["upstream_calls"] for row in diagnostics["variants"])
+    hinted_calls = by_query["중구 한식"]["calls"]
+    assert stats.recorded == [
+        {
+            "hint+query@중구": (hinted_calls, 6),
+            "hint+query": (hinted_calls, 6),
+            "query@중구": (by_query["한식"]["calls"], 0),
+            "query": (by_query["한식"]["calls"], 0),
+        }
+    ]
+
+
+def test_page_requests_stop_at_call_budget():
+    client = NaverMapClient(client_id="test-client-id", client_secret="test-client-secret")
+    pages = {("한식", start): [_place(f"a{start + i}") for i in range(5)] for start in range(1, 100, 5)}
+    calls = []
+    report = {}
+
+    with patch("utils.http_client.PooledHttpClient.get", side_effect=_paged_side_effect(pages, calls)):
+        items = [
+            item
+            for page in client._iter_search_pages(["한식"], max_items=100, report=report, max_calls=3)
+            for item in page
+        ]
+
+    assert len(items) == 15
+    assert len(calls) == 3
+    assert report[0] == {"calls": 3, "upstream_calls": 3, "new_items": 15, "stop": "budget"}
+
+
+def test_cached_pages_do_not_spend_the_call_budget():
+    client = NaverMapClient(client_id="test-client-id", client_secret="test-client-secret")
+    pages = {("한식", start): [_place(f"a{start + i}") for i in range(5)] for start in range(1, 100, 5)}
+    calls = []
+
+    with patch("utils.http_client.PooledHttpClient.get", side_effect=_paged_side_effect(pages, calls)):
+        list(client._iter_search_pages(["한식"], max_items=15, max_calls=3))
+        calls.clear()
+        report = {}
+        items = [
+            item
+            for page in client._iter_search_pages(["한식"], max_items=30, report=report, max_calls=3)
+            for item in page
+        ]
+
+    # Three pages come from the cache, three more from upstream within the budget.
+    assert len(items) == 30
+    assert len(calls) == 3
+    assert report[0]["calls"] == 6
+    assert report[0]["upstream_calls"] == 3
+
+
+def test_cancelled_prefetches_are_not_charged():
+    client = NaverMapClient(client_id="test-client-id", client_secret="test-client-secret")
+    pending = []
+
+    def submit_page(executor, query, start, diagnostics):
+        future = concurrent.futures.Future()
+        if query == "한식":
+            future.set_running_or_notify_cancel()
+            future.set_result([_place(f"a{i}") for i in range(5)])
+        else:
+            # Still queued behind the workers when the search has enough items.
+            pending.append(future)
+        return future
+
+    report = {}
+    with patch.object(client, "_submit_page", side_effect=submit_page):
+        items = [
+            item
+            for page in client._iter_search_pages(["한식", "중식"], max_items=5, report=report)
+            for item in page
+        ]
+
+    assert len(items) == 5
+    assert all(future.cancelled() for future in pending)
+    assert report[0]["upstream_calls"] == 1
+    assert report[1]["calls"] == report[1]["upstream_calls"] == 0
+
+
+def test_variant_stops_when_its_first_page_reaches_the_duplicate_ratio():
+    client = NaverMapClient(client_id="test-client-id", client_secret="test-client-secret")
+    first = [_place(f"a{i}") for i in range(5)]
+    pages = {
+        ("중구 한식", 1): first,
+        # 4 of 5 already seen: exactly DUPLICATE_SKIP_RATIO.
+        ("한식", 1): first[:4] + [_place("b0")],
+        ("한식", 6): [_place("b1")],
+        # 3 of 5 already seen: below the ratio, so the variant keeps paging.
+        ("음식점", 1): first[:3] + [_place("c0"), _place("c1")],
+        ("음식점", 6): [_place("c2")],
+    }
+    report = {}
+
+    with patch("utils.http_client.PooledHttpClient.get", side_effect=_paged_side_effect(pages, [])):
+        titles = [
+            item["title"]
+            for page in client._iter_search_pages(["중구 한식", "한식", "음식점"], max_items=50, report=report)
+            for item in page
+        ]
+
+    assert titles == ["a0", "a1", "a2", "a3", "a4", "b0", "c0", "c1", "c2"]
+    assert report[1]["stop"] == "duplicates"
+    assert report[2]["stop"] == "exhausted"
+
+
+def test_query_plan_ranks_by_in_radius_yield_per_area():
+    stats = _FakeVariantStats({})
+    client = NaverMapClient(
+        client_id="test-client-id",
+        client_secret="test-client-secret",
+        variant_stats=stats,
+    )
+    # The nationwide variant finds more new items, but only the hinted ones are nearby.
+    pages = {
+        ("중구 한식", 1): [{**_place("near"), "mapx": "1269780000", "mapy": "375665000"}],
+        ("한식", 1): [{**_place(f"far{i}"), "mapx": "1290756000", "mapy": "351796000"} for i in range(4)],
+    }
+
+    with patch("utils.http_client.PooledHttpClient.get", side_effect=_paged_side_effect(pages, [])), patch(
+        "api.naver_geocoding.NaverGeocodingClient.address_to_coord", return_value=None
+    ):
+        client.search_local("한식", latitude=37.5665, longitude=126.9780, radius=1000, location_hint="중구")
+
+    recorded = stats.recorded[0]
+    assert recorded["hint+query@37.5,126.9"] == (1, 1)
+    assert recorded["query@37.5,126.9"] == (1, 0)
+
+    stats.yields = {key: counts for key, counts in recorded.items() if "@" in key}
+    stats.yields["query"] = (1, 50)
+    plan = client._order_query_plan(client._build_query_plan("한식", "중구", None), "37.5,126.9")
+    assert plan[0] == ("hint+query", "중구 한식")
@@ -1,3 +1,8 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
 from crawlers import naver_place
 from crawlers.naver_place import NaverPlaceCrawler
 
@@ -27,3 +32,31 @@ def test_extract_menus_fallback_without_bs4(monkeypatch):
     assert len(menus) >= 2
     assert menus[0]["name"] in {"Kimchi Jjigae", "Pork Cutlet"}
     assert menus[0]["price"] in {9000, 11000}
+
+
+def test_requests_are_limited_per_host():
+    crawler = NaverPlaceCrawler(delay=0, max_concurrency_per_host=2, rate_limit=False)
+    lock = threading.Lock()
+    active = {}
+    peak = {}
+
+    def fake_get(url, timeout=None):
+        host = url.split("/")[2]
+        with lock:
+            active[host] = active.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), active[host])
+        time.sleep(0.02)
+        with lock:
+            active[host] -= 1
+        return Mock(status_code=200, text="")
+
+    crawler.session.get = fake_get
+    urls = ["https://pcmap.place.naver.com/restaurant/1/menu"] * 6 + [
+        "https://m.map.naver.com/search2/search.naver?query=a"
+    ] * 6
+
+    with ThreadPoolExecutor(max_workers=12) as executor:
+        list(executor.map(lambda url: crawler._get(url, 0), urls))
+
+    assert peak["pcmap.place.naver.com"] == 2
+    assert peak["m.map.naver.com"] == 2
@@ -0,0 +1,47 @@
+import pytest
+
+from app import create_app
+from database import db
+from services.query_variant_stats_service import QueryVariantStatsService
+
+
+@pytest.fixture
+def app():
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "NAVER_CLIENT_ID": "test-id",
+            "NAVER_CLIENT_SECRET": "test-secret",
+            "NAVER_CLOUD_ID": "test-cloud-id",
+            "NAVER_CLOUD_SECRET": "test-cloud-secret",
+        }
+    )
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_record_accumulates_per_kind(app):
+    with app.app_context():
+        service = QueryVariantStatsService()
+        service.record({"query": (2, 8), "category": (1, 0)})
+        service.record({"query": (1, 3), "hint+query": (0, 0)})
+
+        assert service.get_yields(["query", "category", "hint+query"]) == {
+            "query": (3, 11),
+            "category": (1, 0),
+        }
+
+
+def test_counts_decay_after_threshold(app):
+    with app.app_context():
+        service = QueryVariantStatsService()
+        service.DECAY_AFTER_CALLS = 10
+        service.record({"query": (8, 40)})
+        service.record({"query": (4, 4)})
+
+        assert service.get_yields(["query"]) == {"query": (6, 22)}
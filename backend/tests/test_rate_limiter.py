@@ -0,0 +1,89 @@
+import pytest
+
+from utils import rate_limiter
+from utils.rate_limiter import (
+    RateLimitExceeded,
+    SQLiteTokenBucket,
+    TokenBucket,
+    acquire_for_host,
+    configure_rate_limiters,
+    rate_limiter_for_host,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture(autouse=True)
+def reset_registry():
+    configure_rate_limiters(None)
+    yield
+    configure_rate_limiters(None)
+
+
+def test_try_acquire_spends_burst_then_fails_fast():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=3, clock=clock, sleep=clock.sleep)
+
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+    clock.now += 0.5
+    assert bucket.try_acquire() is True
+    assert bucket.try_acquire() is False
+
+
+def test_acquire_waits_for_refill_and_honours_timeout():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, capacity=1, clock=clock, sleep=clock.sleep)
+
+    assert bucket.acquire() is True
+    assert bucket.acquire(timeout=2) is True
+    assert clock.now == pytest.approx(101.0)
+
+    assert bucket.acquire(timeout=0.5) is False
+    assert clock.now == pytest.approx(101.0)
+
+
+def test_sqlite_bucket_is_shared_between_instances(tmp_path):
+    clock = FakeClock()
+    path = str(tmp_path / "limits.sqlite3")
+    first = SQLiteTokenBucket("nominatim", 1, 1, path, clock=clock, sleep=clock.sleep)
+    second = SQLiteTokenBucket("nominatim", 1, 1, path, clock=clock, sleep=clock.sleep)
+
+    assert first.try_acquire() is True
+    assert second.try_acquire() is False
+
+    clock.now += 1
+    assert second.try_acquire() is True
+    assert first.try_acquire() is False
+
+
+def test_hosts_map_to_shared_upstream_limiters(tmp_path):
+    geocoding = rate_limiter_for_host("maps.apigw.ntruss.com")
+    assert geocoding is rate_limiter_for_host("naveropenapi.apigw.ntruss.com")
+    assert rate_limiter_for_host("nominatim.openstreetmap.org").rate == 1
+    assert rate_limiter_for_host("127.0.0.1") is None
+
+    configure_rate_limiters(str(tmp_path / "limits.sqlite3"))
+    assert isinstance(rate_limiter_for_host("openapi.naver.com"), SQLiteTokenBucket)
+
+
+def test_acquire_for_host_raises_when_no_token(monkeypatch):
+    monkeypatch.setitem(rate_limiter.UPSTREAM_RATE_LIMITS, "nominatim", (0.001, 1))
+
+    acquire_for_host("nominatim.openstreetmap.org", block=False)
+    with pytest.raises(RateLimitExceeded):
+        acquire_for_host("nominatim.openstreetmap.org", block=False)
+    with pytest.raises(RateLimitExceeded):
+        acquire_for_host("nominatim.openstreetmap.org", timeout=0.01)
+
+    # Unknown hosts are never limited.
+    acquire_for_host("example.com", block=False)
@@ -0,0 +1,199 @@
+import json
+import os
+import time
+from datetime import timedelta
+
+import pytest
+
+from app import create_app
+from database import db
+from models.menu import Menu
+from models.restaurant import Restaurant
+from services import restaurant_index_service
+from services.menu_service import MenuService
+from services.restaurant_index_service import RESTAURANT_INDEX_KEY, RestaurantIndexService, init_restaurant_index
+
+np = pytest.importorskip("numpy")
+
+
+def _create_app(**overrides):
+    return create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "NAVER_CLIENT_ID": "test-id",
+            "NAVER_CLIENT_SECRET": "test-secret",
+            "NAVER_CLOUD_ID": "test-cloud-id",
+            "NAVER_CLOUD_SECRET": "test-cloud-secret",
+            **overrides,
+        }
+    )
+
+
+@pytest.fixture
+def app():
+    app = _create_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _add(place_id, latitude, longitude, category="", delivery_fee=None, prices=()):
+    restaurant = Restaurant(
+        place_id=place_id,
+        name=place_id,
+        category=category,
+        latitude=latitude,
+        longitude=longitude,
+        delivery_fee=delivery_fee,
+    )
+    db.session.add(restaurant)
+    db.session.flush()
+    for price in prices:
+        db.session.add(Menu(restaurant_id=restaurant.id, name=f"{place_id}-{price}", price=price))
+    MenuService()._update_price_stats(restaurant.id)
+    db.session.commit()
+    return restaurant
+
+
+def _place_ids(index, matches):
+    return [restaurant.place_id for restaurant, _ in index.restaurants(matches)]
+
+
+def test_query_applies_radius_fee_budget_and_category_in_one_pass(app):
+    _add("near-korean", 37.5665, 126.9780, "한식>백반", delivery_fee=2000, prices=(8000, 12000))
+    _add("near-chinese", 37.5670, 126.9790, "중식>중식당", delivery_fee=4000, prices=(15000,))
+    _add("edge", 37.5665 + 0.0085, 126.9780 + 0.011, "한식", delivery_fee=0)  # ~1.4 km
+    _add("busan", 35.1796, 129.0756, "한식")
+    index = RestaurantIndexService()
+    index.load()
+
+    assert len(index) == 4
+    assert _place_ids(index, index.query(37.5665, 126.9780, 1000)) == ["near-korean", "near-chinese"]
+    assert _place_ids(index, index.query(37.5665, 126.9780, 2000)) == [
+        "near-korean",
+        "near-chinese",
+        "edge",
+    ]
+    assert _place_ids(index, index.query(37.5665, 126.9780, 2000, max_delivery_fee=3000)) == [
+        "near-korean",
+        "edge",
+    ]
+    assert _place_ids(index, index.query(37.5665, 126.9780, 2000, budget=10000)) == ["near-korean"]
+    # Once the cached menus expire, prices no longer exclude anything priced.
+    later = time.time() + 365 * 24 * 3600
+    assert _place_ids(index, index.query(37.5665, 126.9780, 2000, budget=10000, now=later)) == [
+        "near-korean",
+        "near-chinese",
+    ]
+    assert _place_ids(index, index.query(37.5665, 126.9780, 2000, categories=["중식"])) == [
+        "near-chinese"
+    ]
+
+
+def test_refresh_merges_changed_restaurants_and_menus(app):
+    moved = _add("moved", 35.1796, 129.0756)
+    priced = _add("priced", 37.5665, 126.9780)
+    index = RestaurantIndexService(refresh_interval=0)
+    index.load()
+    assert index.query(37.5665, 126.9780, 500, budget=9000) == []
+
+    moved.latitude, moved.longitude = 37.5668, 126.9782
+    db.session.commit()
+    MenuService().add_user_contribution(priced.id, "김밥", 4000)
+    _add("added", 37.5660, 126.9775)
+
+    assert index.refresh() >= 3
+    assert len(index) == 3
+    assert _place_ids(index, index.query(37.5665, 126.9780, 500)) == ["priced", "moved", "added"]
+    assert _place_ids(index, index.query(37.5665, 126.9780, 500, budget=9000)) == ["priced"]
+    assert index.refresh() == 0
+
+
+def test_refresh_without_changes_returns_zero(app):
+    _add("a", 37.5665, 126.9780)
+    _add("b", 37.5666, 126.9781)
+    index = RestaurantIndexService(refresh_interval=0)
+    index.load()
+
+    assert index.refresh() == 0
+    assert index.refresh() == 0
+
+
+def test_refresh_merges_rows_committed_late_with_an_older_timestamp(app):
+    newest = _add("newest", 37.5665, 126.9780)
+    index = RestaurantIndexService(refresh_interval=0)
+    index.load()
+
+    late = _add("late", 37.5666, 126.9781)
+    # Stamped before the newest row but committed after the index loaded.
+    late.updated_at = newest.updated_at - timedelta(seconds=30)
+    db.session.commit()
+
+    assert index.refresh() == 1
+    assert _place_ids(index, index.query(37.5665, 126.9780, 100)) == ["newest", "late"]
+    assert index.refresh() == 0
+
+
+def test_saved_index_is_memory_mapped_and_still_refreshes(app, tmp_path):
+    _add("a", 37.5665, 126.9780)
+    index = RestaurantIndexService()
+    index.load()
+    index.save(str(tmp_path))
+
+    mapped = RestaurantIndexService.open(str(tmp_path), refresh_interval=0)
+    assert isinstance(mapped._arrays["lat"], np.memmap)
+    assert mapped.query(37.5665, 126.9780, 100) == index.query(37.5665, 126.9780, 100)
+
+    _add("b", 37.5666, 126.9781)
+    assert mapped.refresh() == 1
+    assert mapped.refresh() == 0
+    assert _place_ids(mapped, mapped.query(37.5665, 126.9780, 100)) == ["a", "b"]
+    # The merge is published as a new snapshot, which stays shared.
+    assert isinstance(mapped._arrays["lat"], np.memmap)
+    other = RestaurantIndexService.open(str(tmp_path), refresh_interval=0)
+    assert _place_ids(other, other.query(37.5665, 126.9780, 100)) == ["a", "b"]
+    assert other.refresh() == 0
+
+    # The stale worker switches to the newer snapshot instead of merging again.
+    assert index.refresh(force=True) == 0
+    assert _place_ids(index, index.query(37.5665, 126.9780, 100)) == ["a", "b"]
+
+
+def test_incomplete_snapshot_is_rejected(app, tmp_path):
+    _add("a", 37.5665, 126.9780)
+    index = RestaurantIndexService()
+    index.load()
+    index.save(str(tmp_path))
+
+    metadata_path = os.path.join(str(tmp_path), "metadata.json")
+    with open(metadata_path, encoding="utf-8") as handle:
+        metadata = json.load(handle)
+    metadata["rows"] += 1
+    with open(metadata_path, "w", encoding="utf-8") as handle:
+        json.dump(metadata, handle)
+
+    with pytest.raises(ValueError):
+        RestaurantIndexService.open(str(tmp_path))
+
+
+def test_nearby_endpoint_uses_index_and_falls_back_without_numpy(tmp_path, monkeypatch):
+    app = _create_app(RESTAURANT_INDEX=True, RESTAURANT_INDEX_REFRESH_SECONDS=0)
+    with app.app_context():
+        db.create_all()
+        _add("near", 37.5665, 126.9780, delivery_fee=1000)
+        _add("far", 37.7000, 127.1000, delivery_fee=1000)
+
+        response = app.test_client().get("/api/restaurants/nearby?lat=37.5665&lng=126.9780&radius=3000")
+        assert isinstance(app.extensions[RESTAURANT_INDEX_KEY], RestaurantIndexService)
+        assert [row["name"] for row in response.get_json()["results"]] == ["near"]
+
+        monkeypatch.setattr(restaurant_index_service, "np", None)
+        app.extensions.pop(RESTAURANT_INDEX_KEY)
+        assert init_restaurant_index(app) is None
+        response = app.test_client().get("/api/restaurants/nearby?lat=37.5665&lng=126.9780&radius=3000")
+        assert [row["name"] for row in response.get_json()["results"]] == ["near"]
+        db.session.remove()
+        db.drop_all()
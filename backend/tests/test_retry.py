@@ -0,0 +1,76 @@
+from unittest.mock import Mock
+
+import pytest
+import requests
+
+from utils.retry import RetryPolicy
+
+
+def _response(status_code, headers=None):
+    return Mock(status_code=status_code, headers=headers or {})
+
+
+def _policy(**kwargs):
+    sleeps = []
+    kwargs.setdefault("jitter", lambda: 1.0)
+    return RetryPolicy(sleep=sleeps.append, **kwargs), sleeps
+
+
+def test_retryable_statuses_back_off_exponentially():
+    policy, sleeps = _policy(base_delay=0.1)
+    send = Mock(side_effect=[_response(503), _response(502), _response(200)])
+
+    assert policy.run(send).status_code == 200
+    assert sleeps == [0.1, 0.2]
+    assert policy.stats()["retries"] == 2
+
+
+def test_non_retryable_status_is_returned_immediately():
+    policy, sleeps = _policy()
+    send = Mock(return_value=_response(404))
+
+    assert policy.run(send).status_code == 404
+    assert send.call_count == 1
+    assert sleeps == []
+
+
+def test_retry_after_is_honoured_and_long_waits_give_up():
+    policy, sleeps = _policy(max_total_delay=3)
+    send = Mock(side_effect=[_response(429, {"Retry-After": "1.5"}), _response(200)])
+    assert policy.run(send).status_code == 200
+    assert sleeps == [1.5]
+
+    policy, sleeps = _policy(max_total_delay=3)
+    send = Mock(return_value=_response(429, {"Retry-After": "30"}))
+    assert policy.run(send).status_code == 429
+    assert send.call_count == 1
+
+
+def test_connection_errors_are_retried_then_raised():
+    policy, sleeps = _policy(max_retries=2)
+    send = Mock(side_effect=requests.exceptions.ConnectionError("reset"))
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        policy.run(send)
+    assert send.call_count == 3
+
+
+def test_read_timeouts_are_not_retried():
+    policy, _ = _policy()
+    send = Mock(side_effect=requests.exceptions.ReadTimeout("slow"))
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        policy.run(send)
+    assert send.call_count == 1
+
+
+def test_shared_budget_stops_retry_amplification():
+    policy, _ = _policy(budget_ratio=0, budget_burst=1)
+    send = Mock(return_value=_response(503))
+
+    policy.run(send)
+    policy.run(send)
+
+    # One retry for the first request, none left for the second.
+    assert send.call_count == 3
+    assert policy.stats()["retries_denied"] == 2
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import create_app
+from database import db
+from models.reverse_geocode_cache import ReverseGeocodeCache
+from services.reverse_geocode_cache_service import ReverseGeocodeCacheService
+
+
+@pytest.fixture
+def app():
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "NAVER_CLIENT_ID": "test-id",
+            "NAVER_CLIENT_SECRET": "test-secret",
+            "NAVER_CLOUD_ID": "test-cloud-id",
+            "NAVER_CLOUD_SECRET": "test-cloud-secret",
+        }
+    )
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_nearby_points_share_a_cell_and_distant_points_do_not():
+    service = ReverseGeocodeCacheService(cell_meters=100)
+    base = service.cell_key(37.56650, 126.97800)
+
+    assert service.cell_key(37.56660, 126.97810) == base
+    assert service.cell_key(37.56650 + 0.003, 126.97800) != base  # ~330 m north
+    assert service.cell_key(37.56650, 126.97800 + 0.004) != base  # ~350 m east
+    assert ReverseGeocodeCacheService(cell_meters=1000).cell_key(37.56650, 126.97800) != base
+
+
+def test_expired_entries_are_ignored(app):
+    with app.app_context():
+        service = ReverseGeocodeCacheService()
+        service.set(37.5665, 126.978, "서울특별시 중구")
+        assert service.get(37.5665, 126.978) == "서울특별시 중구"
+
+        row = ReverseGeocodeCache.query.one()
+        row.expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+        db.session.commit()
+
+        assert service.get(37.5665, 126.978) is None
@@ -0,0 +1,103 @@
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import text
+
+from app import create_app
+from database import RESTAURANT_RTREE_TABLE, db, ensure_sqlite_spatial_index
+from models.restaurant import Restaurant
+from services.spatial_index_service import SpatialIndexService
+
+
+@pytest.fixture
+def app():
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "NAVER_CLIENT_ID": "test-id",
+            "NAVER_CLIENT_SECRET": "test-secret",
+            "NAVER_CLOUD_ID": "test-cloud-id",
+            "NAVER_CLOUD_SECRET": "test-cloud-secret",
+        }
+    )
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _add(place_id, latitude, longitude):
+    restaurant = Restaurant(place_id=place_id, name=place_id, latitude=latitude, longitude=longitude)
+    db.session.add(restaurant)
+    db.session.commit()
+    return restaurant
+
+
+def _indexed_ids():
+    rows = db.session.execute(text(f"SELECT id FROM {RESTAURANT_RTREE_TABLE} ORDER BY id"))
+    return [row[0] for row in rows]
+
+
+def test_triggers_keep_rtree_in_sync_and_nearby_refines_by_distance(app):
+    service = SpatialIndexService()
+    near = _add("near", 37.5665, 126.9780)
+    corner = _add("corner", 37.5665 + 0.0085, 126.9780 + 0.011)  # inside the box, ~1.4 km away
+    far = _add("far", 37.7000, 127.1000)
+
+    assert service.has_rtree()
+    assert _indexed_ids() == [near.id, corner.id, far.id]
+    assert [r.place_id for r, _ in service.nearby(37.5665, 126.9780, 1000)] == ["near"]
+
+    far.latitude, far.longitude = 37.5670, 126.9785
+    db.session.commit()
+    db.session.delete(near)
+    db.session.commit()
+
+    assert _indexed_ids() == [corner.id, far.id]
+    rows = service.nearby(37.5665, 126.9780, 1000)
+    assert [r.place_id for r, _ in rows] == ["far"]
+    assert rows[0][1] < 100
+
+
+def test_existing_rows_are_backfilled_and_range_fallback_matches(app):
+    service = SpatialIndexService()
+    _add("a", 37.5665, 126.9780)
+    _add("b", 37.5700, 126.9800)
+    _add("c", 35.1796, 129.0756)
+    db.session.execute(text(f"DROP TABLE {RESTAURANT_RTREE_TABLE}"))
+    db.session.commit()
+
+    ensure_sqlite_spatial_index()
+
+    assert len(_indexed_ids()) == 3
+    indexed = [r.place_id for r, _ in service.nearby(37.5665, 126.9780, 3000)]
+    with patch.object(SpatialIndexService, "has_rtree", return_value=False):
+        ranged = [r.place_id for r, _ in service.nearby(37.5665, 126.9780, 3000)]
+
+    assert indexed == ranged == ["a", "b"]
+
+
+def test_rows_without_coordinates_stay_out_of_the_rtree(app):
+    # Legacy schemas allow NULL coordinates; the R*Tree would store them as (0, 0).
+    db.drop_all()
+    db.session.execute(text(f"DROP TABLE IF EXISTS {RESTAURANT_RTREE_TABLE}"))
+    db.session.execute(text("CREATE TABLE restaurants (id INTEGER PRIMARY KEY, latitude FLOAT, longitude FLOAT)"))
+    db.session.execute(text("INSERT INTO restaurants VALUES (1, 37.5665, 126.9780), (2, NULL, NULL)"))
+    db.session.commit()
+    ensure_sqlite_spatial_index()
+    assert _indexed_ids() == [1]
+
+    db.session.execute(text("INSERT INTO restaurants VALUES (3, NULL, 126.9780), (4, 37.5, 127.0)"))
+    db.session.execute(text("UPDATE restaurants SET latitude = NULL WHERE id = 1"))
+    db.session.execute(text("UPDATE restaurants SET latitude = 37.6, longitude = 127.1 WHERE id = 2"))
+    db.session.commit()
+    assert _indexed_ids() == [2, 4]
+
+    # Entries left at (0, 0) by the old unguarded triggers are cleaned up on start.
+    db.session.execute(text(f"INSERT INTO {RESTAURANT_RTREE_TABLE} VALUES (3, 0, 0, 0, 0)"))
+    db.session.commit()
+    ensure_sqlite_spatial_index()
+    assert _indexed_ids() == [2, 4]
@@ -1,3 +1,8 @@
+from utils.coordinates import (
+    decode_naver_map_coordinates,
+    is_valid_korea_coordinate,
+    katec_to_wgs84,
+)
 from utils.text_normalizer import (
     looks_like_mojibake,
     normalize_menu_name,
@@ -5,6 +10,9 @@ from utils.text_normalizer import (
 )
 
 __all__ = [
+    "decode_naver_map_coordinates",
+    "is_valid_korea_coordinate",
+    "katec_to_wgs84",
     "looks_like_mojibake",
     "normalize_menu_name",
     "repair_mojibake_text",
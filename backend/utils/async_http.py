@@ -0,0 +1,331 @@
+import asyncio
+import concurrent.futures
+import json
+import logging
+import ssl
+import threading
+from typing import Awaitable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+import requests
+
+from utils.latency import AdaptiveTimeouts
+from utils.rate_limiter import (
+    DEFAULT_ACQUIRE_TIMEOUT_SECONDS,
+    RateLimitExceeded,
+    SQLiteTokenBucket,
+    rate_limiter_for_host,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRequestError(requests.exceptions.RequestException):
+    """Transport failure in the asyncio engine (connect, protocol or timeout)."""
+
+
+class AsyncResponse:
+    """Buffered response with the subset of the requests.Response API we use."""
+
+    def __init__(self, status_code: int, headers: Dict[str, str], body: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = body
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content.decode("utf-8"))
+
+
+class StreamTransport:
+    """
+    Minimal HTTP/1.1 client over asyncio streams with per-origin keep-alive.
+
+    Supports Content-Length, chunked and read-until-close bodies. Responses are
+    requested uncompressed. Connections belong to the event loop they were
+    opened on, so one transport must only be used from one loop.
+    """
+
+    MAX_IDLE_PER_ORIGIN = 16
+
+    def __init__(self, max_idle_per_origin: int = None):
+        self.max_idle_per_origin = max_idle_per_origin or self.MAX_IDLE_PER_ORIGIN
+        self._idle: Dict[Tuple[str, str, int], List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+        self._ssl_context: Optional[ssl.SSLContext] = None
+        self.connections_opened = 0
+
+    async def request(self, method: str, url: str, headers: Dict[str, str]) -> AsyncResponse:
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        port = parts.port or (443 if scheme == "https" else 80)
+        origin = (scheme, parts.hostname, port)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+        host_header = parts.hostname if parts.port is None else f"{parts.hostname}:{parts.port}"
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {host_header}"]
+        lowered = {name.lower() for name in headers}
+        for name, value in headers.items():
+            lines.append(f"{name}: {value}")
+        if "accept-encoding" not in lowered:
+            lines.append("Accept-Encoding: identity")
+        if "connection" not in lowered:
+            lines.append("Connection: keep-alive")
+        payload = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+        reused = self._pop_idle(origin)
+        if reused is not None:
+            try:
+                return await self._exchange(origin, reused, payload)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # The server closed the idle connection; retry once on a fresh one.
+                pass
+
+        return await self._exchange(origin, await self._connect(origin), payload)
+
+    async def close(self):
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle.clear()
+
+    async def _connect(self, origin: Tuple[str, str, int]):
+        scheme, host, port = origin
+        ssl_context = None
+        if scheme == "https":
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            ssl_context = self._ssl_context
+        connection = await asyncio.open_connection(host, port, ssl=ssl_context)
+        self.connections_opened += 1
+        return connection
+
+    async def _exchange(self, origin, connection, payload: bytes) -> AsyncResponse:
+        reader, writer = connection
+        try:
+            writer.write(payload)
+            await writer.drain()
+
+            status_line = await reader.readline()
+            if not status_line:
+                raise ConnectionResetError("connection closed before response")
+            parts = status_line.decode("latin-1").split(" ", 2)
+            if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+                raise AsyncRequestError(f"malformed status line: {status_line!r}")
+            status_code = int(parts[1])
+
+            headers: Dict[str, str] = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().title()] = value.strip()
+
+            keep_alive = headers.get("Connection", "").lower() != "close"
+            if headers.get("Transfer-Encoding", "").lower() == "chunked":
+                body = await self._read_chunked(reader)
+            elif "Content-Length" in headers:
+                body = await reader.readexactly(int(headers["Content-Length"]))
+            else:
+                body = await reader.read()
+                keep_alive = False
+        except BaseException:
+            writer.close()
+            raise
+
+        if keep_alive:
+            self._push_idle(origin, connection)
+        else:
+            writer.close()
+        return AsyncResponse(status_code, headers, body)
+
+    @staticmethod
+    async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+        chunks = []
+        while True:
+            size_line = await reader.readline()
+            size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+            if size == 0:
+                # Skip optional trailers up to the blank line.
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+    def _pop_idle(self, origin):
+        connections = self._idle.get(origin)
+        while connections:
+            reader, writer = connections.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer
+            writer.close()
+        return None
+
+    def _push_idle(self, origin, connection):
+        connections = self._idle.setdefault(origin, [])
+        if len(connections) < self.max_idle_per_origin:
+            connections.append(connection)
+        else:
+            connection[1].close()
+
+
+class AsyncUpstreamEngine:
+    """
+    Run upstream GETs as coroutines on one background event loop.
+
+    Each host gets an asyncio.Semaphore, so hundreds of calls can be in flight
+    on a single thread while any one upstream sees at most its limit. Requests
+    still take tokens from the shared rate limiter and use adaptive per-host
+    timeouts. `submit()` and `run()` are the sync bridge for Flask views and
+    worker threads; `submit()` returns a concurrent.futures.Future.
+    """
+
+    DEFAULT_HOST_LIMIT = 32
+
+    def __init__(
+        self,
+        transport=None,
+        host_limits: Optional[Dict[str, int]] = None,
+        default_host_limit: int = None,
+        host_timeouts: Optional[Dict[str, Tuple[float, float, float]]] = None,
+        rate_limit_timeout: float = DEFAULT_ACQUIRE_TIMEOUT_SECONDS,
+    ):
+        self.transport = transport or StreamTransport()
+        self.host_limits = dict(host_limits or {})
+        self.default_host_limit = default_host_limit or self.DEFAULT_HOST_LIMIT
+        self.timeouts = AdaptiveTimeouts(host_bounds=host_timeouts)
+        self.rate_limit_timeout = rate_limit_timeout
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncResponse:
+        host = urlsplit(url).hostname or ""
+        if params:
+            url = f"{url}{'&' if urlsplit(url).query else '?'}{urlencode(params)}"
+
+        await self._acquire_rate_limit(host)
+        timeout = timeout or self.timeouts.timeout_for(host)
+        counters = self._counters.setdefault(
+            host,
+            {"requests": 0, "errors": 0, "in_flight": 0, "peak_in_flight": 0},
+        )
+
+        async with self._semaphore(host):
+            counters["requests"] += 1
+            counters["in_flight"] += 1
+            counters["peak_in_flight"] = max(counters["peak_in_flight"], counters["in_flight"])
+            started_at = asyncio.get_running_loop().time()
+            try:
+                response = await asyncio.wait_for(
+                    self.transport.request("GET", url, headers or {}),
+                    timeout,
+                )
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as exc:
+                counters["errors"] += 1
+                if isinstance(exc, asyncio.TimeoutError):
+                    self.timeouts.observe_timeout(host, timeout)
+                raise AsyncRequestError(f"GET {host} failed: {exc!r}") from exc
+            except AsyncRequestError:
+                counters["errors"] += 1
+                raise
+            finally:
+                counters["in_flight"] -= 1
+
+        self.timeouts.observe(host, asyncio.get_running_loop().time() - started_at)
+        return response
+
+    def submit(self, coro: Awaitable) -> concurrent.futures.Future:
+        """Schedule a coroutine on the engine loop from any thread."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None):
+        """Block the calling thread until the coroutine finishes."""
+        return self.submit(coro).result(timeout)
+
+    def stats(self) -> Dict[str, Dict]:
+        snapshot = {host: dict(counters) for host, counters in list(self._counters.items())}
+        for host, timing in self.timeouts.snapshot().items():
+            snapshot.setdefault(host, {}).update(timing)
+        for host, counters in snapshot.items():
+            counters["limit"] = self.host_limits.get(host, self.default_host_limit)
+        return snapshot
+
+    def close(self):
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+        if loop is None:
+            return
+
+        # Cancel what is still running so submit() callers are not left waiting
+        # on futures that would never resolve once the loop stops.
+        asyncio.run_coroutine_threadsafe(self._cancel_pending(), loop).result(5)
+        close = getattr(self.transport, "close", None)
+        if close is not None:
+            asyncio.run_coroutine_threadsafe(close(), loop).result(5)
+        asyncio.run_coroutine_threadsafe(loop.shutdown_default_executor(), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        loop.close()
+
+    @staticmethod
+    async def _cancel_pending():
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.host_limits.get(host, self.default_host_limit))
+            self._semaphores[host] = semaphore
+        return semaphore
+
+    async def _acquire_rate_limit(self, host: str):
+        limiter = rate_limiter_for_host(host)
+        if limiter is None:
+            return
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.rate_limit_timeout
+        while not await self._try_acquire(limiter):
+            if loop.time() >= deadline:
+                raise RateLimitExceeded(f"Rate limit exceeded for {host}")
+            await asyncio.sleep(1.0 / limiter.rate)
+
+    @staticmethod
+    async def _try_acquire(limiter) -> bool:
+        if isinstance(limiter, SQLiteTokenBucket):
+            # Shared buckets do blocking SQLite I/O; keep it off the event loop.
+            return await asyncio.get_running_loop().run_in_executor(None, limiter.try_acquire)
+        return limiter.try_acquire()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever,
+                    name="upstream-asyncio",
+                    daemon=True,
+                )
+                thread.start()
+                self._loop = loop
+                self._thread = thread
+            return self._loop
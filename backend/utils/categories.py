@@ -0,0 +1,122 @@
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, Iterator, Optional, Set
+
+CATEGORY_ALIASES = {
+    "한식": {"한식", "국밥", "찌개", "백반", "분식"},
+    "중식": {"중식", "중국", "중국집", "짬뽕", "짜장", "마라"},
+    "일식": {"일식", "일본식", "초밥", "스시", "라멘", "돈카츠", "돈까스"},
+    "양식": {"양식", "파스타", "스테이크", "브런치"},
+    "아시안": {"아시안", "동남아", "태국", "베트남", "인도", "쌀국수"},
+    "치킨": {"치킨", "닭", "통닭", "후라이드"},
+    "피자": {"피자"},
+    "카페": {"카페", "디저트", "베이커리", "커피"},
+    "회": {"회", "해산물", "초밥", "스시"},
+    "고기": {"고기", "구이", "삼겹살", "갈비", "곱창"},
+    "패스트푸드": {"패스트푸드", "햄버거", "버거", "샌드위치"},
+    "족발": {"족발", "보쌈"},
+}
+
+# Spellings of the same dish, safe to share one search cache entry. Unlike
+# CATEGORY_ALIASES this never maps a term to its broader category.
+QUERY_SYNONYMS = {
+    "돈카츠": "돈까스",
+    "스시": "초밥",
+    "일본식": "일식",
+}
+
+
+def _build_canonical_terms() -> Dict[str, str]:
+    canonical = {}
+    for alias_key, alias_values in CATEGORY_ALIASES.items():
+        canonical.setdefault(alias_key.lower(), alias_key)
+        for alias in alias_values:
+            # Shared aliases (e.g. 초밥) resolve to the first category that lists them.
+            canonical.setdefault(alias.lower(), alias_key)
+    return canonical
+
+
+_CANONICAL_TERMS = _build_canonical_terms()
+
+
+def canonical_category(term: str) -> str:
+    """Map a category alias to its canonical category name (or return it as-is)."""
+    value = (term or "").strip()
+    return _CANONICAL_TERMS.get(value.lower(), value)
+
+
+def category_group(category: str) -> Optional[str]:
+    """Canonical category whose name or alias appears in a category path like '한식>백반'."""
+    text = category or ""
+    for name, aliases in CATEGORY_ALIASES.items():
+        if name in text or any(alias in text for alias in aliases):
+            return name
+    return None
+
+
+def normalize_category_text(value: str) -> str:
+    """Lowercase and drop all whitespace, the form category terms are matched in."""
+    return "".join((value or "").lower().split())
+
+
+def _category_terms(selected: str) -> Set[str]:
+    value = normalize_category_text(selected)
+    if not value:
+        return set()
+
+    for alias_key, alias_values in CATEGORY_ALIASES.items():
+        terms = {normalize_category_text(term) for term in (alias_key, *alias_values)}
+        if value in terms:
+            return terms
+    return {value}
+
+
+class CategoryMatcher:
+    """
+    Reverse alias index for one category selection.
+
+    Every alias of every selected category maps to the selections it stands
+    for, so one pass over the text finds all of them: each position is
+    checked against the few distinct alias lengths instead of every alias
+    being searched for separately. Overlapping aliases (초밥 under both 일식
+    and 회) are all reported.
+    """
+
+    def __init__(self, categories: Iterable[str]):
+        self.terms: Dict[str, Set[str]] = {}
+        for selected in categories:
+            canonical = canonical_category(selected)
+            for term in _category_terms(selected):
+                self.terms.setdefault(term, set()).add(canonical)
+        self.lengths = sorted({len(term) for term in self.terms}, reverse=True)
+
+    def __bool__(self) -> bool:
+        return bool(self.terms)
+
+    def matches(self, *texts: str) -> Set[str]:
+        """Canonical selected categories whose name or alias appears in any of the texts."""
+        found: Set[str] = set()
+        for canonicals in self._scan(texts):
+            found |= canonicals
+        return found
+
+    def matches_any(self, *texts: str) -> bool:
+        return next(self._scan(texts), None) is not None
+
+    def _scan(self, texts: Iterable[str]) -> Iterator[Set[str]]:
+        for text in texts:
+            text = normalize_category_text(text)
+            for start in range(len(text)):
+                for length in self.lengths:
+                    canonicals = self.terms.get(text[start:start + length])
+                    if canonicals:
+                        yield canonicals
+
+
+def category_matcher(categories: Iterable[str]) -> CategoryMatcher:
+    """Matcher for a category selection, compiled once per distinct selection."""
+    return _compiled_matcher(frozenset(category for category in categories if category))
+
+
+@lru_cache(maxsize=256)
+def _compiled_matcher(categories: FrozenSet[str]) -> CategoryMatcher:
+    return CategoryMatcher(categories)
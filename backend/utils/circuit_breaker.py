@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls are
+    refused for `reset_timeout` seconds. It then goes half-open and lets a single
+    probe through: success closes it, failure opens it again.
+
+    Wrap the work done after allow_request() in `attempt()`, so an unexpected
+    exception still counts as a failure and never leaves the probe slot taken.
+    A cancelled task says nothing about the endpoint: it only frees the slot.
+    """
+
+    FAILURE_THRESHOLD = 3
+    RESET_TIMEOUT_SECONDS = 30
+
+    def __init__(
+        self,
+        failure_threshold: int = None,
+        reset_timeout: float = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold or self.FAILURE_THRESHOLD
+        self.reset_timeout = reset_timeout or self.RESET_TIMEOUT_SECONDS
+        self._clock = clock
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state_locked()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            state = self._current_state_locked()
+            if state == STATE_CLOSED:
+                return True
+            if state == STATE_OPEN or self._probe_in_flight:
+                return False
+
+            self._state = STATE_HALF_OPEN
+            self._probe_in_flight = True
+            return True
+
+    @contextmanager
+    def attempt(self):
+        try:
+            yield self
+        except asyncio.CancelledError:
+            self.release()
+            raise
+        except BaseException:
+            self.record_failure()
+            raise
+
+    def record_success(self):
+        with self._lock:
+            self._state = STATE_CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def release(self):
+        """Give back a probe slot without recording an outcome."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == STATE_HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = STATE_OPEN
+                self._opened_at = self._clock()
+
+    def _current_state_locked(self) -> str:
+        if self._state == STATE_OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            return STATE_HALF_OPEN
+        return self._state
@@ -0,0 +1,188 @@
+import math
+from typing import Optional, Tuple
+
+# Rough bounding box for South Korea (WGS84). Used to reject garbage coordinates.
+KOREA_LAT_RANGE = (32.5, 39.5)
+KOREA_LNG_RANGE = (123.5, 132.5)
+
+# Mean Earth radius, the same one haversine_distance uses.
+EARTH_RADIUS_METERS = 6371000
+
+# KATECH (TM128) projection on the Bessel 1841 ellipsoid.
+_BESSEL_A = 6377397.155
+_BESSEL_F = 1 / 299.1528128
+_WGS84_A = 6378137.0
+_WGS84_F = 1 / 298.257223563
+_KATEC_LAT0 = math.radians(38.0)
+_KATEC_LON0 = math.radians(128.0)
+_KATEC_SCALE = 0.9999
+_KATEC_FALSE_EASTING = 400000.0
+_KATEC_FALSE_NORTHING = 600000.0
+# Bessel (Tokyo datum) -> WGS84 translation commonly used for Korean data.
+_BESSEL_TO_WGS84_SHIFT = (-146.43, 507.89, 681.46)
+
+# mapx/mapy are WGS84 degrees scaled by 1e7 in the current local search API.
+_WGS84_SCALE = 10_000_000
+
+
+def is_valid_korea_coordinate(latitude: Optional[float], longitude: Optional[float]) -> bool:
+    if latitude is None or longitude is None:
+        return False
+
+    if not (math.isfinite(latitude) and math.isfinite(longitude)):
+        return False
+
+    return (
+        KOREA_LAT_RANGE[0] <= latitude <= KOREA_LAT_RANGE[1]
+        and KOREA_LNG_RANGE[0] <= longitude <= KOREA_LNG_RANGE[1]
+    )
+
+
+def haversine_distance(lat1, lon1, lat2, lon2):
+    """Return distance in meters between two WGS84 coordinates."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    delta_phi = math.radians(lat2 - lat1)
+    delta_lambda = math.radians(lon2 - lon1)
+
+    a = (
+        math.sin(delta_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2) ** 2
+    )
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+    return EARTH_RADIUS_METERS * c
+
+
+def bounding_box(
+    latitude: float,
+    longitude: float,
+    radius_meters: float,
+) -> Tuple[float, float, float, float]:
+    """
+    (south, north, west, east) degrees enclosing a circle of `radius_meters`.
+
+    Slightly larger than the circle, so callers refine with an exact distance.
+    Longitudes are clamped rather than wrapped at the antimeridian.
+    """
+    delta_lat = math.degrees(radius_meters / EARTH_RADIUS_METERS)
+    south = max(-90.0, latitude - delta_lat)
+    north = min(90.0, latitude + delta_lat)
+
+    # The widest longitude span is at the latitude closest to a pole.
+    cos_lat = math.cos(math.radians(max(abs(south), abs(north))))
+    if cos_lat <= 1e-9:
+        return south, north, -180.0, 180.0
+
+    delta_lng = min(180.0, delta_lat / cos_lat)
+    return south, north, max(-180.0, longitude - delta_lng), min(180.0, longitude + delta_lng)
+
+
+def _meridian_arc(phi: float, a: float, e2: float) -> float:
+    e4 = e2 * e2
+    e6 = e4 * e2
+    return a * (
+        (1 - e2 / 4 - 3 * e4 / 64 - 5 * e6 / 256) * phi
+        - (3 * e2 / 8 + 3 * e4 / 32 + 45 * e6 / 1024) * math.sin(2 * phi)
+        + (15 * e4 / 256 + 45 * e6 / 1024) * math.sin(4 * phi)
+        - (35 * e6 / 3072) * math.sin(6 * phi)
+    )
+
+
+def _inverse_katec(x: float, y: float) -> Tuple[float, float]:
+    """Inverse transverse mercator on the Bessel ellipsoid (radians)."""
+    a = _BESSEL_A
+    e2 = 2 * _BESSEL_F - _BESSEL_F**2
+    ep2 = e2 / (1 - e2)
+
+    m = _meridian_arc(_KATEC_LAT0, a, e2) + (y - _KATEC_FALSE_NORTHING) / _KATEC_SCALE
+    mu = m / (a * (1 - e2 / 4 - 3 * e2**2 / 64 - 5 * e2**3 / 256))
+    e1 = (1 - math.sqrt(1 - e2)) / (1 + math.sqrt(1 - e2))
+
+    phi1 = (
+        mu
+        + (3 * e1 / 2 - 27 * e1**3 / 32) * math.sin(2 * mu)
+        + (21 * e1**2 / 16 - 55 * e1**4 / 32) * math.sin(4 * mu)
+        + (151 * e1**3 / 96) * math.sin(6 * mu)
+        + (1097 * e1**4 / 512) * math.sin(8 * mu)
+    )
+
+    sin_phi1 = math.sin(phi1)
+    cos_phi1 = math.cos(phi1)
+    tan_phi1 = math.tan(phi1)
+
+    c1 = ep2 * cos_phi1**2
+    t1 = tan_phi1**2
+    n1 = a / math.sqrt(1 - e2 * sin_phi1**2)
+    r1 = a * (1 - e2) / (1 - e2 * sin_phi1**2) ** 1.5
+    d = (x - _KATEC_FALSE_EASTING) / (n1 * _KATEC_SCALE)
+
+    phi = phi1 - (n1 * tan_phi1 / r1) * (
+        d**2 / 2
+        - (5 + 3 * t1 + 10 * c1 - 4 * c1**2 - 9 * ep2) * d**4 / 24
+        + (61 + 90 * t1 + 298 * c1 + 45 * t1**2 - 252 * ep2 - 3 * c1**2) * d**6 / 720
+    )
+    lam = _KATEC_LON0 + (
+        d
+        - (1 + 2 * t1 + c1) * d**3 / 6
+        + (5 - 2 * c1 + 28 * t1 - 3 * c1**2 + 8 * ep2 + 24 * t1**2) * d**5 / 120
+    ) / cos_phi1
+
+    return phi, lam
+
+
+def _shift_bessel_to_wgs84(phi: float, lam: float) -> Tuple[float, float]:
+    """Datum shift through geocentric coordinates (radians in, degrees out)."""
+    e2_bessel = 2 * _BESSEL_F - _BESSEL_F**2
+    n = _BESSEL_A / math.sqrt(1 - e2_bessel * math.sin(phi) ** 2)
+    x = n * math.cos(phi) * math.cos(lam) + _BESSEL_TO_WGS84_SHIFT[0]
+    y = n * math.cos(phi) * math.sin(lam) + _BESSEL_TO_WGS84_SHIFT[1]
+    z = n * (1 - e2_bessel) * math.sin(phi) + _BESSEL_TO_WGS84_SHIFT[2]
+
+    e2_wgs = 2 * _WGS84_F - _WGS84_F**2
+    p = math.hypot(x, y)
+    lat = math.atan2(z, p * (1 - e2_wgs))
+    for _ in range(5):
+        n_wgs = _WGS84_A / math.sqrt(1 - e2_wgs * math.sin(lat) ** 2)
+        lat = math.atan2(z + e2_wgs * n_wgs * math.sin(lat), p)
+
+    return math.degrees(lat), math.degrees(math.atan2(y, x))
+
+
+def katec_to_wgs84(x: float, y: float) -> Tuple[float, float]:
+    """Convert KATECH (TM128) x/y meters to WGS84 (latitude, longitude)."""
+    phi, lam = _inverse_katec(float(x), float(y))
+    return _shift_bessel_to_wgs84(phi, lam)
+
+
+def decode_naver_map_coordinates(mapx, mapy) -> Optional[Tuple[float, float]]:
+    """
+    Decode mapx/mapy from the Naver local search API into (latitude, longitude).
+
+    The API currently returns WGS84 degrees scaled by 1e7, while older responses
+    carried KATECH (TM128) meters. Returns None when the values are missing or do
+    not land inside Korea.
+    """
+    if mapx in (None, "") or mapy in (None, ""):
+        return None
+
+    try:
+        x = float(str(mapx).strip())
+        y = float(str(mapy).strip())
+    except (TypeError, ValueError):
+        return None
+
+    if not (math.isfinite(x) and math.isfinite(y)) or x <= 0 or y <= 0:
+        return None
+
+    if x >= 1_000_000_000 or y >= 100_000_000:
+        latitude, longitude = y / _WGS84_SCALE, x / _WGS84_SCALE
+    elif x <= 180 and y <= 90:
+        latitude, longitude = y, x
+    else:
+        latitude, longitude = katec_to_wgs84(x, y)
+
+    if not is_valid_korea_coordinate(latitude, longitude):
+        return None
+
+    return latitude, longitude
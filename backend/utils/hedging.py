@@ -0,0 +1,221 @@
+import concurrent.futures
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Sequence
+
+from utils.latency import LatencyTracker
+
+logger = logging.getLogger(__name__)
+
+
+class HedgePolicy:
+    """When to send a backup request for one call type."""
+
+    PERCENTILE = 0.9
+    INITIAL_DELAY_SECONDS = 1.0
+    MIN_DELAY_SECONDS = 0.05
+    MAX_DELAY_SECONDS = 3.0
+    # Below this many observations the initial delay is used instead of the percentile.
+    MIN_SAMPLES = 20
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        percentile: float = None,
+        initial_delay: float = None,
+        min_delay: float = None,
+        max_delay: float = None,
+        min_samples: int = None,
+    ):
+        self.enabled = enabled
+        self.percentile = percentile or self.PERCENTILE
+        self.initial_delay = self.INITIAL_DELAY_SECONDS if initial_delay is None else initial_delay
+        self.min_delay = self.MIN_DELAY_SECONDS if min_delay is None else min_delay
+        self.max_delay = self.MAX_DELAY_SECONDS if max_delay is None else max_delay
+        self.min_samples = self.MIN_SAMPLES if min_samples is None else min_samples
+
+
+class Hedger:
+    """
+    Send a backup request when the primary is slower than its usual p90.
+
+    The first attempt that returns a non-None result wins. The slower attempt
+    is cancelled if it has not started yet, and otherwise left to finish in
+    the background with its result discarded. Every primary call earns
+    `budget_ratio` hedge tokens (capped at `budget_burst`) and each hedge
+    spends one, so hedging adds at most roughly that fraction of extra load.
+
+    Attempts only go to the pool when a worker is free. A primary that would
+    have to queue runs on the caller thread without a hedge instead, so the
+    pool never caps upstream concurrency and queueing never triggers a hedge.
+    """
+
+    MAX_WORKERS = 16
+    BUDGET_RATIO = 0.1
+    BUDGET_BURST = 5.0
+
+    def __init__(
+        self,
+        policies: Optional[Dict[str, HedgePolicy]] = None,
+        tracker: Optional[LatencyTracker] = None,
+        budget_ratio: float = None,
+        budget_burst: float = None,
+        max_workers: int = None,
+    ):
+        self.policies = dict(policies or {})
+        self.tracker = tracker or LatencyTracker()
+        self.budget_ratio = self.BUDGET_RATIO if budget_ratio is None else budget_ratio
+        self.budget_burst = self.BUDGET_BURST if budget_burst is None else budget_burst
+        self.max_workers = max_workers or self.MAX_WORKERS
+        self._budget = self.budget_burst
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+    @classmethod
+    def from_call_types(cls, call_types: Iterable[str], **kwargs) -> "Hedger":
+        """Build a hedger with the default policy enabled for `call_types`."""
+        policies = {call_type: HedgePolicy(enabled=True) for call_type in call_types if call_type}
+        return cls(policies=policies, **kwargs)
+
+    def enabled(self, call_type: Optional[str]) -> bool:
+        policy = self.policies.get(call_type)
+        return bool(policy and policy.enabled)
+
+    def hedge_delay(self, call_type: str) -> float:
+        policy = self.policies.get(call_type) or HedgePolicy()
+        delay = policy.initial_delay
+        if self.tracker.count(call_type) >= policy.min_samples:
+            observed = self.tracker.percentile(call_type, policy.percentile)
+            if observed is not None:
+                delay = observed
+        return min(policy.max_delay, max(policy.min_delay, delay))
+
+    def call(self, call_type: str, attempts: Sequence[Callable[[], object]]):
+        """
+        Run attempts[0] and, if it is slow and budget allows, attempts[1].
+
+        Returns the first non-None result, or None when every started attempt
+        failed. Without an enabled policy only the primary runs, inline.
+        """
+        if not attempts:
+            return None
+        if not self.enabled(call_type) or len(attempts) < 2:
+            return self._timed(call_type, attempts[0])
+
+        self._earn_budget(call_type)
+        if not self._slots.acquire(blocking=False):
+            self._count(call_type, "saturated")
+            return self._timed(call_type, attempts[0])
+        started = threading.Event()
+        primary = self._submit(call_type, attempts[0], started)
+
+        # The hedge delay counts from when the primary starts, not from when
+        # it was handed to the pool.
+        started.wait()
+        try:
+            return primary.result(timeout=self.hedge_delay(call_type))
+        except concurrent.futures.TimeoutError:
+            pass
+
+        if not self._slots.acquire(blocking=False):
+            self._count(call_type, "saturated")
+            return primary.result()
+        if not self._spend_budget(call_type):
+            self._slots.release()
+            return primary.result()
+
+        backup = self._submit(call_type, attempts[1])
+        pending = {primary, backup}
+        while pending:
+            done, pending = concurrent.futures.wait(
+                pending,
+                return_when=concurrent.futures.FIRST_COMPLETED,
+            )
+            for future in done:
+                result = future.result()
+                if result is not None:
+                    if future is backup:
+                        self._count(call_type, "hedge_wins")
+                    for loser in pending:
+                        loser.cancel()
+                    return result
+        return None
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            snapshot = {call_type: dict(counters) for call_type, counters in self._stats.items()}
+            budget = self._budget
+        for call_type, counters in snapshot.items():
+            counters["hedge_delay"] = round(self.hedge_delay(call_type), 3)
+        return {"budget_tokens": round(budget, 2), "call_types": snapshot}
+
+    def _timed(self, call_type: str, attempt: Callable[[], object]):
+        started_at = time.monotonic()
+        try:
+            result = attempt()
+        except Exception as exc:
+            logger.warning("Hedged %s attempt failed: %s", call_type, exc)
+            return None
+
+        if result is not None:
+            self.tracker.observe(call_type, time.monotonic() - started_at)
+        return result
+
+    def _submit(
+        self,
+        call_type: str,
+        attempt: Callable[[], object],
+        started: Optional[threading.Event] = None,
+    ) -> concurrent.futures.Future:
+        """Run `attempt` on the pool; the caller already holds a worker slot."""
+
+        def run():
+            if started is not None:
+                started.set()
+            return self._timed(call_type, attempt)
+
+        try:
+            future = self._get_executor().submit(run)
+        except Exception:
+            self._slots.release()
+            raise
+        # Also fires when a loser is cancelled before it starts.
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _earn_budget(self, call_type: str):
+        with self._lock:
+            self._budget = min(self.budget_burst, self._budget + self.budget_ratio)
+            self._count_locked(call_type, "calls")
+
+    def _spend_budget(self, call_type: str) -> bool:
+        with self._lock:
+            if self._budget < 1:
+                self._count_locked(call_type, "hedges_denied")
+                return False
+            self._budget -= 1
+            self._count_locked(call_type, "hedges")
+            return True
+
+    def _count(self, call_type: str, name: str):
+        with self._lock:
+            self._count_locked(call_type, name)
+
+    def _count_locked(self, call_type: str, name: str):
+        counters = self._stats.setdefault(
+            call_type,
+            {"calls": 0, "hedges": 0, "hedges_denied": 0, "hedge_wins": 0, "saturated": 0},
+        )
+        counters[name] += 1
+
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="hedged-request",
+                )
+            return self._executor
@@ -0,0 +1,135 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.latency import AdaptiveTimeouts
+from utils.rate_limiter import DEFAULT_ACQUIRE_TIMEOUT_SECONDS, acquire_for_host
+from utils.retry import RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+
+class PooledHttpClient:
+    """
+    Long-lived requests.Session with keep-alive pools sized per upstream host.
+
+    Safe to share between threads: the urllib3 pools are thread-safe and the
+    usage counters are guarded by a lock. Requests to known upstream hosts take
+    a token from the shared per-upstream rate limiter first. Calls that do not
+    pass `timeout` get an adaptive per-host timeout from observed latency. With
+    a `retry_policy`, retryable failures are retried and every attempt takes
+    its own rate-limit token.
+    """
+
+    DEFAULT_POOL_MAXSIZE = 10
+
+    def __init__(
+        self,
+        host_pool_sizes: Optional[Dict[str, int]] = None,
+        default_pool_maxsize: int = None,
+        headers: Optional[Dict[str, str]] = None,
+        rate_limit_timeout: float = DEFAULT_ACQUIRE_TIMEOUT_SECONDS,
+        host_timeouts: Optional[Dict[str, Tuple[float, float, float]]] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        self.rate_limit_timeout = rate_limit_timeout
+        self.retry_policy = retry_policy
+        # host -> (default, floor, ceiling) seconds for adaptive timeouts.
+        self.timeouts = AdaptiveTimeouts(host_bounds=host_timeouts)
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+
+        default_size = default_pool_maxsize or self.DEFAULT_POOL_MAXSIZE
+        for prefix in ("https://", "http://"):
+            self.session.mount(
+                prefix,
+                HTTPAdapter(pool_connections=default_size, pool_maxsize=default_size),
+            )
+
+        # Longer prefixes win in requests, so each host gets its own tuned adapter.
+        for host, size in (host_pool_sizes or {}).items():
+            self.session.mount(
+                f"https://{host}/",
+                HTTPAdapter(pool_connections=1, pool_maxsize=size),
+            )
+
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        host = urlsplit(url).hostname or ""
+        if self.retry_policy is None:
+            return self._send(url, host, kwargs)
+        return self.retry_policy.run(lambda: self._send(url, host, kwargs))
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-host request counters, pool usage and current adaptive timeouts."""
+        with self._lock:
+            snapshot = {host: dict(counters) for host, counters in self._counters.items()}
+
+        for host, timing in self.timeouts.snapshot().items():
+            snapshot.setdefault(host, {}).update(timing)
+
+        for adapter in self.session.adapters.values():
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                counters = snapshot.setdefault(key.key_host, {})
+                counters["connections_opened"] = (
+                    counters.get("connections_opened", 0) + pool.num_connections
+                )
+                counters["pool_maxsize"] = key.key_maxsize
+
+        return snapshot
+
+    def close(self):
+        self.session.close()
+
+    def _send(self, url: str, host: str, kwargs: Dict) -> requests.Response:
+        # Raises RateLimitExceeded (a RequestException) when no token arrives in time.
+        acquire_for_host(host, timeout=self.rate_limit_timeout)
+        timeout = kwargs.get("timeout") or self.timeouts.timeout_for(host)
+        self._begin(host)
+        failed = True
+        started_at = time.monotonic()
+        try:
+            try:
+                response = self.session.get(url, **{**kwargs, "timeout": timeout})
+            except requests.exceptions.Timeout:
+                self.timeouts.observe_timeout(host, self._timeout_seconds(timeout))
+                raise
+            failed = False
+            self.timeouts.observe(host, time.monotonic() - started_at)
+            return response
+        finally:
+            self._finish(host, failed)
+
+    @staticmethod
+    def _timeout_seconds(timeout) -> float:
+        # requests also accepts a (connect, read) tuple.
+        return max(timeout) if isinstance(timeout, tuple) else timeout
+
+    def _begin(self, host: str):
+        with self._lock:
+            counters = self._counters.setdefault(
+                host,
+                {"requests": 0, "errors": 0, "in_flight": 0, "peak_in_flight": 0},
+            )
+            counters["requests"] += 1
+            counters["in_flight"] += 1
+            counters["peak_in_flight"] = max(counters["peak_in_flight"], counters["in_flight"])
+
+    def _finish(self, host: str, failed: bool):
+        with self._lock:
+            counters = self._counters[host]
+            counters["in_flight"] -= 1
+            if failed:
+                counters["errors"] += 1
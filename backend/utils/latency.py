@@ -0,0 +1,100 @@
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, Hashable, List, Optional, Tuple
+
+
+class LatencyTracker:
+    """Thread-safe rolling window of recent latencies (seconds) per key."""
+
+    WINDOW_SIZE = 256
+
+    def __init__(self, window_size: int = None):
+        self.window_size = window_size or self.WINDOW_SIZE
+        self._samples: Dict[Hashable, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, key: Hashable, seconds: float):
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = deque(maxlen=self.window_size)
+                self._samples[key] = samples
+            samples.append(max(0.0, seconds))
+
+    def keys(self) -> List[Hashable]:
+        with self._lock:
+            return list(self._samples.keys())
+
+    def count(self, key: Hashable) -> int:
+        with self._lock:
+            return len(self._samples.get(key, ()))
+
+    def percentile(self, key: Hashable, quantile: float) -> Optional[float]:
+        """Nearest-rank percentile of the window, or None without samples."""
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if not samples:
+            return None
+
+        rank = max(1, math.ceil(quantile * len(samples)))
+        return samples[min(rank, len(samples)) - 1]
+
+
+class AdaptiveTimeouts:
+    """
+    Per-host request timeouts derived from observed latency.
+
+    Once a host has `MIN_SAMPLES` successful responses, its timeout becomes
+    `MULTIPLIER` times the rolling p99, clamped to that host's floor and
+    ceiling. A timed-out request is recorded as a censored sample equal to
+    the timeout it was given (its true latency is at least that), so when a
+    host slows down past the current timeout the p99 climbs and the timeout
+    backs off toward the ceiling instead of staying pinned. Other failures
+    are not observed.
+    """
+
+    PERCENTILE = 0.99
+    MULTIPLIER = 3.0
+    MIN_SAMPLES = 20
+    DEFAULT_BOUNDS = (10.0, 1.0, 10.0)
+
+    def __init__(
+        self,
+        host_bounds: Optional[Dict[str, Tuple[float, float, float]]] = None,
+        default_bounds: Optional[Tuple[float, float, float]] = None,
+        tracker: Optional[LatencyTracker] = None,
+    ):
+        # host -> (default, floor, ceiling) in seconds.
+        self.host_bounds = dict(host_bounds or {})
+        self.default_bounds = default_bounds or self.DEFAULT_BOUNDS
+        self.tracker = tracker or LatencyTracker()
+
+    def observe(self, host: str, seconds: float):
+        self.tracker.observe(host, seconds)
+
+    def observe_timeout(self, host: str, timeout: float):
+        self.tracker.observe(host, timeout)
+
+    def timeout_for(self, host: str) -> float:
+        default, floor, ceiling = self.host_bounds.get(host, self.default_bounds)
+        if self.tracker.count(host) < self.MIN_SAMPLES:
+            return default
+
+        observed = self.tracker.percentile(host, self.PERCENTILE)
+        return round(min(ceiling, max(floor, observed * self.MULTIPLIER)), 3)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Current timeout and latency percentiles for every known host."""
+        hosts = set(self.host_bounds) | set(self.tracker.keys())
+        snapshot = {}
+        for host in sorted(hosts):
+            row = {
+                "timeout_seconds": self.timeout_for(host),
+                "samples": self.tracker.count(host),
+            }
+            for name, quantile in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+                value = self.tracker.percentile(host, quantile)
+                row[f"{name}_ms"] = None if value is None else round(value * 1000, 1)
+            snapshot[host] = row
+        return snapshot
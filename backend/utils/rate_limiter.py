@@ -0,0 +1,202 @@
+import logging
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Upstream name -> (tokens per second, burst capacity).
+UPSTREAM_RATE_LIMITS: Dict[str, Tuple[float, float]] = {
+    "naver_openapi": (10.0, 10.0),
+    "ncp_geocoding": (10.0, 10.0),
+    # Nominatim usage policy: at most one request per second.
+    "nominatim": (1.0, 1.0),
+    "naver_place": (3.0, 3.0),
+}
+
+UPSTREAM_HOSTS: Dict[str, str] = {
+    "openapi.naver.com": "naver_openapi",
+    "maps.apigw.ntruss.com": "ncp_geocoding",
+    "naveropenapi.apigw.ntruss.com": "ncp_geocoding",
+    "nominatim.openstreetmap.org": "nominatim",
+    "pcmap.place.naver.com": "naver_place",
+    "map.naver.com": "naver_place",
+    "m.map.naver.com": "naver_place",
+}
+
+DEFAULT_ACQUIRE_TIMEOUT_SECONDS = 5.0
+
+
+class RateLimitExceeded(requests.exceptions.RequestException):
+    """Raised when a request could not get a rate-limit token in time."""
+
+
+class TokenBucket:
+    """Thread-safe in-process token bucket."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(capacity)
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take tokens if available right now; never waits."""
+        return self._take(tokens) == 0
+
+    def acquire(self, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """Wait until tokens are available; False if `timeout` seconds pass first."""
+        deadline = None if timeout is None else self._clock() + timeout
+        while True:
+            wait = self._take(tokens)
+            if wait == 0:
+                return True
+
+            if deadline is not None:
+                remaining = deadline - self._clock()
+                if remaining <= 0 or wait > remaining:
+                    return False
+            self._sleep(wait)
+
+    def _take(self, tokens: float) -> float:
+        """Take tokens and return 0, or return the seconds until they would be available."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0
+            return (tokens - self._tokens) / self.rate
+
+
+class SQLiteTokenBucket(TokenBucket):
+    """
+    Token bucket whose state lives in a SQLite file, shared by every process
+    (e.g. WSGI workers) that points at the same path.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        capacity: float,
+        path: str,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        super().__init__(rate, capacity, clock=clock, sleep=sleep)
+        self.name = name
+        self.path = path
+        connection = self._connect()
+        try:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS token_buckets ("
+                "name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+        finally:
+            connection.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5, isolation_level=None)
+
+    def _take(self, tokens: float) -> float:
+        with self._lock:
+            connection = self._connect()
+            try:
+                # BEGIN IMMEDIATE takes the file's write lock, serializing processes.
+                connection.execute("BEGIN IMMEDIATE")
+                now = self._clock()
+                row = connection.execute(
+                    "SELECT tokens, updated_at FROM token_buckets WHERE name = ?",
+                    (self.name,),
+                ).fetchone()
+                if row is None:
+                    available = self.capacity
+                else:
+                    available = min(self.capacity, row[0] + max(0.0, now - row[1]) * self.rate)
+
+                wait = 0.0
+                if available >= tokens:
+                    available -= tokens
+                else:
+                    wait = (tokens - available) / self.rate
+
+                connection.execute(
+                    "INSERT INTO token_buckets (name, tokens, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET tokens = excluded.tokens, "
+                    "updated_at = excluded.updated_at",
+                    (self.name, available, now),
+                )
+                connection.execute("COMMIT")
+                return wait
+            except sqlite3.Error as exc:
+                if connection.in_transaction:
+                    connection.rollback()
+                # Fail open: a broken limiter file must not take the app down.
+                logger.warning("SQLite rate limiter failed for %s: %s", self.name, exc)
+                return 0
+            finally:
+                connection.close()
+
+
+_registry: Dict[str, TokenBucket] = {}
+_registry_lock = threading.Lock()
+_backend_path: Optional[str] = None
+
+
+def configure_rate_limiters(db_path: Optional[str] = None):
+    """
+    Select the limiter backend. With `db_path` the buckets are shared across
+    processes through that SQLite file; otherwise they are per process.
+    """
+    global _backend_path
+    with _registry_lock:
+        _backend_path = db_path or None
+        _registry.clear()
+
+
+def get_rate_limiter(upstream: str) -> Optional[TokenBucket]:
+    limits = UPSTREAM_RATE_LIMITS.get(upstream)
+    if limits is None:
+        return None
+
+    with _registry_lock:
+        limiter = _registry.get(upstream)
+        if limiter is None:
+            rate, capacity = limits
+            if _backend_path:
+                limiter = SQLiteTokenBucket(upstream, rate, capacity, _backend_path)
+            else:
+                limiter = TokenBucket(rate, capacity)
+            _registry[upstream] = limiter
+        return limiter
+
+
+def rate_limiter_for_host(host: str) -> Optional[TokenBucket]:
+    upstream = UPSTREAM_HOSTS.get((host or "").lower())
+    return get_rate_limiter(upstream) if upstream else None
+
+
+def acquire_for_host(host: str, timeout: float = DEFAULT_ACQUIRE_TIMEOUT_SECONDS, block: bool = True):
+    """Take a token for `host` or raise RateLimitExceeded. Unknown hosts are unlimited."""
+    limiter = rate_limiter_for_host(host)
+    if limiter is None:
+        return
+
+    acquired = limiter.acquire(timeout=timeout) if block else limiter.try_acquire()
+    if not acquired:
+        raise RateLimitExceeded(f"Rate limit exceeded for {host}")
@@ -0,0 +1,143 @@
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class RetryPolicy:
+    """
+    Retry idempotent GETs on 429/5xx responses and connection failures.
+
+    Backoff is capped exponential with full jitter, and `Retry-After` replaces
+    it when the upstream sends one. Each request gets at most `max_retries`
+    retries and `max_total_delay` seconds of waiting. Retries also spend from
+    a budget shared by everything using this policy: every request earns
+    `budget_ratio` tokens (up to `budget_burst`), so during an outage retries
+    add at most about that fraction of extra load.
+
+    Read timeouts are not retried: the host is already slow, and adaptive
+    timeouts plus hedging cover that case.
+    """
+
+    MAX_RETRIES = 2
+    BASE_DELAY_SECONDS = 0.2
+    MAX_DELAY_SECONDS = 2.0
+    MAX_TOTAL_DELAY_SECONDS = 4.0
+    BUDGET_RATIO = 0.2
+    BUDGET_BURST = 10.0
+
+    def __init__(
+        self,
+        max_retries: int = None,
+        base_delay: float = None,
+        max_delay: float = None,
+        max_total_delay: float = None,
+        budget_ratio: float = None,
+        budget_burst: float = None,
+        sleep: Callable[[float], None] = time.sleep,
+        jitter: Callable[[], float] = random.random,
+    ):
+        self.max_retries = self.MAX_RETRIES if max_retries is None else max_retries
+        self.base_delay = self.BASE_DELAY_SECONDS if base_delay is None else base_delay
+        self.max_delay = self.MAX_DELAY_SECONDS if max_delay is None else max_delay
+        self.max_total_delay = (
+            self.MAX_TOTAL_DELAY_SECONDS if max_total_delay is None else max_total_delay
+        )
+        self.budget_ratio = self.BUDGET_RATIO if budget_ratio is None else budget_ratio
+        self.budget_burst = self.BUDGET_BURST if budget_burst is None else budget_burst
+        self._sleep = sleep
+        self._jitter = jitter
+        self._budget = self.budget_burst
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.retries_denied = 0
+
+    def run(self, send: Callable[[], requests.Response]) -> requests.Response:
+        """Call `send` until it returns a non-retryable response or retries run out."""
+        self._earn_budget()
+        waited = 0.0
+        attempt = 0
+        while True:
+            try:
+                response = send()
+            except requests.exceptions.ConnectionError as exc:
+                delay = self._backoff(attempt)
+                if not self._may_retry(attempt, waited, delay):
+                    raise
+                logger.info("Retrying after connection error (attempt %s): %s", attempt + 1, exc)
+            else:
+                if response.status_code not in RETRYABLE_STATUSES:
+                    return response
+
+                delay = self.retry_after_seconds(response)
+                if delay is None:
+                    delay = self._backoff(attempt)
+                if not self._may_retry(attempt, waited, delay):
+                    return response
+                logger.info(
+                    "Retrying after status %s (attempt %s, wait %.2fs)",
+                    response.status_code,
+                    attempt + 1,
+                    delay,
+                )
+                response.close()
+
+            self._sleep(delay)
+            waited += delay
+            attempt += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "retries": self.retries,
+                "retries_denied": self.retries_denied,
+                "budget_tokens": round(self._budget, 2),
+            }
+
+    @staticmethod
+    def retry_after_seconds(response: requests.Response) -> Optional[float]:
+        """Parse `Retry-After` as delta-seconds or an HTTP date."""
+        value = (response.headers.get("Retry-After") or "").strip()
+        if not value:
+            return None
+
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+    def _backoff(self, attempt: int) -> float:
+        return self._jitter() * min(self.max_delay, self.base_delay * (2 ** attempt))
+
+    def _may_retry(self, attempt: int, waited: float, delay: float) -> bool:
+        if attempt >= self.max_retries or waited + delay > self.max_total_delay:
+            return False
+
+        with self._lock:
+            if self._budget < 1:
+                self.retries_denied += 1
+                return False
+            self._budget -= 1
+            self.retries += 1
+            return True
+
+    def _earn_budget(self):
+        with self._lock:
+            self._budget = min(self.budget_burst, self._budget + self.budget_ratio)
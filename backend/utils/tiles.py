@@ -0,0 +1,36 @@
+import math
+from typing import Tuple
+
+# Web Mercator cannot represent the poles; slippy-map tiles stop here.
+MAX_MERCATOR_LATITUDE = 85.05112878
+
+
+def world_position(latitude: float, longitude: float, zoom: int) -> Tuple[float, float]:
+    """Fractional slippy-map tile coordinates (x, y) of a point at `zoom`."""
+    latitude = max(-MAX_MERCATOR_LATITUDE, min(MAX_MERCATOR_LATITUDE, latitude))
+    scale = 2 ** zoom
+    x = (longitude + 180.0) / 360.0 * scale
+    phi = math.radians(latitude)
+    y = (1.0 - math.log(math.tan(phi) + 1.0 / math.cos(phi)) / math.pi) / 2.0 * scale
+    return min(max(x, 0.0), scale - 1e-9), min(max(y, 0.0), scale - 1e-9)
+
+
+def tile_bounds(zoom: int, x: float, y: float) -> Tuple[float, float, float, float]:
+    """(south, north, west, east) degrees of tile (x, y), or of a grid cell when x/y are scaled."""
+    scale = 2 ** zoom
+    west = x / scale * 360.0 - 180.0
+    east = (x + 1) / scale * 360.0 - 180.0
+    north = _tile_latitude(y, scale)
+    south = _tile_latitude(y + 1, scale)
+    return south, north, west, east
+
+
+def is_valid_tile(zoom: int, x: int, y: int, max_zoom: int) -> bool:
+    if zoom < 0 or zoom > max_zoom:
+        return False
+    scale = 2 ** zoom
+    return 0 <= x < scale and 0 <= y < scale
+
+
+def _tile_latitude(y: float, scale: int) -> float:
+    return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / scale))))
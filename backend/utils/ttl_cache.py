@@ -0,0 +1,114 @@
+import concurrent.futures
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_HIT = "hit"
+CACHE_STALE = "stale"
+CACHE_MISS = "miss"
+
+
+class TTLCache:
+    """
+    Thread-safe in-process LRU cache with TTL and stale-while-revalidate.
+
+    Entries are fresh for `ttl` seconds. For a further `stale_ttl` seconds they are
+    still served, while a single background refresh replaces them.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        stale_ttl: float = 0,
+        max_entries: int = 1000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, object]]" = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._refresher: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+    def get(self, key: Hashable) -> Tuple[str, object]:
+        """Return (status, value) where status is hit, stale or miss."""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return CACHE_MISS, None
+
+            stored_at, value = entry
+            age = now - stored_at
+            if age <= self.ttl:
+                self._entries.move_to_end(key)
+                return CACHE_HIT, value
+            if age <= self.ttl + self.stale_ttl:
+                return CACHE_STALE, value
+
+            del self._entries[key]
+            return CACHE_MISS, None
+
+    def set(self, key: Hashable, value):
+        with self._lock:
+            self._entries[key] = (self._clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], object]) -> Tuple[object, str]:
+        """
+        Return (value, status). Misses call `loader` inline; stale entries are served
+        immediately and refreshed in the background. `None` results are not cached.
+        """
+        status, value = self.get(key)
+        if status == CACHE_HIT:
+            return value, status
+
+        if status == CACHE_STALE:
+            self._schedule_refresh(key, loader)
+            return value, status
+
+        value = loader()
+        if value is not None:
+            self.set(key, value)
+        return value, status
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def _schedule_refresh(self, key: Hashable, loader: Callable[[], object]):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            if self._refresher is None:
+                self._refresher = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=2,
+                    thread_name_prefix="ttl-cache-refresh",
+                )
+            refresher = self._refresher
+
+        def refresh():
+            try:
+                value = loader()
+                if value is not None:
+                    self.set(key, value)
+            except Exception as exc:
+                logger.warning("Background cache refresh failed for %s: %s", key, exc)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        refresher.submit(refresh)